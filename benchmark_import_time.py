@@ -0,0 +1,81 @@
+import re
+import subprocess
+import sys
+import time
+
+# ==============================================================================
+# BENCHMARK CZASU IMPORTU (python -X importtime)
+# Mierzy zimny start modułów, które ładuje każdy nowy proces (spawn worker),
+# oraz dla porównania koszt "starych", zachłannych importów (mealpy/pandas/mpl).
+# ==============================================================================
+
+TARGETS = {
+    'src.physics':            "import src.physics",
+    'src.body_model':         "import src.body_model",
+    'src.fitness':            "import src.fitness",
+    'run_research_study':     "import run_research_study",
+    'run_sensitivity_analysis': "import run_sensitivity_analysis",
+    'main':                   "import main",
+}
+
+# Odpowiednik importów wykonywanych wcześniej przy starcie każdego procesu
+EAGER_BASELINE = "import pandas, seaborn, matplotlib.pyplot; from mealpy import FloatVar; " \
+                 "from mealpy.evolutionary_based import GA; from mealpy.swarm_based import PSO, GWO; " \
+                 "import src.fitness"
+
+HEAVY_MODULES = ('mealpy', 'pandas', 'matplotlib', 'seaborn', 'scipy')
+N_REPEATS = 5
+
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(code):
+    """
+    Uruchamia `code` w świeżym interpreterze z -X importtime.
+    Zwraca (czas_całkowity_ms, suma_importów_ms, lista_ciężkich_modułów).
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, check=True)
+    wall_ms = (time.perf_counter() - t0) * 1000
+
+    total_us = 0
+    heavy = set()
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        cumulative, indent, module = int(m.group(2)), m.group(3), m.group(4)
+        if len(indent) == 1:  # moduły najwyższego poziomu
+            total_us += cumulative
+        root = module.split('.')[0]
+        if root in HEAVY_MODULES:
+            heavy.add(root)
+    return wall_ms, total_us / 1000, sorted(heavy)
+
+
+def best_of(code):
+    runs = [measure(code) for _ in range(N_REPEATS)]
+    return min(runs, key=lambda r: r[0])
+
+
+if __name__ == "__main__":
+    print(f"{'Moduł':<26} | {'Proces [ms]':>11} | {'Importy [ms]':>12} | Ciężkie zależności")
+    print("-" * 80)
+
+    base_wall, base_imp, base_heavy = best_of("pass")
+    print(f"{'(pusty interpreter)':<26} | {base_wall:>11.1f} | {base_imp:>12.1f} | -")
+
+    eager_wall, eager_imp, eager_heavy = best_of(EAGER_BASELINE)
+    print(f"{'(stare importy, zachłanne)':<26} | {eager_wall:>11.1f} | {eager_imp:>12.1f} | {', '.join(eager_heavy)}")
+
+    results = {}
+    for name, code in TARGETS.items():
+        wall, imp, heavy = best_of(code)
+        results[name] = wall
+        print(f"{name:<26} | {wall:>11.1f} | {imp:>12.1f} | {', '.join(heavy) or '-'}")
+
+    print("-" * 80)
+    worker = results['src.fitness']
+    print(f"Zimny start workera (src.fitness): {worker:.0f} ms vs {eager_wall:.0f} ms "
+          f"-> {eager_wall / worker:.1f}x szybciej")
@@ -3,145 +3,191 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 import os
+import argparse
 import matplotlib.ticker as ticker
+from src.plot_pipeline import PlotPipeline
+from src.analysis import summarize
 
 # ==============================================================================
 # 1. KONFIGURACJA STYLU (NAUKOWY / IEEE)
 # ==============================================================================
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 12,
-    'axes.labelsize': 13,
-    'axes.titlesize': 14,
-    'axes.titleweight': 'bold',
-    'legend.fontsize': 11,
-    'lines.linewidth': 2.5,
-    'figure.dpi': 300,
-    'axes.formatter.useoffset': False # WYŁĄCZENIE NOTACJI OFFSETOWEJ (DLA OPÓŹNIEŃ)
-})
+def setup_style():
+    plt.style.use('seaborn-v0_8-whitegrid')
+    plt.rcParams.update({
+        'font.family': 'sans-serif',
+        'font.size': 12,
+        'axes.labelsize': 13,
+        'axes.titlesize': 14,
+        'axes.titleweight': 'bold',
+        'legend.fontsize': 11,
+        'lines.linewidth': 2.5,
+        'figure.dpi': 300,
+        'axes.formatter.useoffset': False # WYŁĄCZENIE NOTACJI OFFSETOWEJ (DLA OPÓŹNIEŃ)
+    })
 
 OUTPUT_DIR = "FINAL_THESIS_PLOTS_V3"
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
+EXPERIMENT_CSV = 'WBAN_Experiment_Results.csv'
+SENSITIVITY_CSV = 'WBAN_Sensitivity_Results.csv'
 
 ALGOS = ['GA', 'PSO', 'GWO']
 COLORS = {'GA': '#d62728', 'PSO': '#1f77b4', 'GWO': '#2ca02c'}
 MARKERS = {'GA': 's', 'PSO': '^', 'GWO': 'o'}
 
-print(">>> Wczytywanie i czyszczenie danych...")
-
 # ==============================================================================
-# 2. WCZYTYWANIE DANYCH Z FILTROWANIEM BŁĘDÓW
+# 2. PODSUMOWANIE STATYSTYCZNE (jak w run_statistical_analysis.py)
 # ==============================================================================
-try:
-    df = pd.read_csv('WBAN_Experiment_Results.csv')
-    
-    # 1. Konwersja opóźnienia na ms
-    df['Delay_ms'] = df['Avg_Delay_s'] * 1000 
-    
-    # 2. FILTROWANIE NIEUDANYCH PRÓB (KLUCZOWE DLA GA!)
-    # Usuwamy wiersze, gdzie Link Margin wynosi 0.0 (brak połączenia)
-    # To naprawi "wielkie słupki błędów" wynikające z uśredniania zer
-    df_clean = df[df['Min_Link_Margin_dB'] > 0.1].copy()
-    
-    # Wyświetlenie statystyk odrzuconych prób
-    rejected = len(df) - len(df_clean)
-    print(f"Odrzucono {rejected} prób (nieudane/zerwane połączenia), głównie dla GA.")
-    
-    # Filtrowanie algorytmów
-    df_clean = df_clean[df_clean['Algorithm'].isin(ALGOS)]
-    
-except FileNotFoundError:
-    print("BŁĄD: Brak pliku WBAN_Experiment_Results.csv")
-    exit()
-
-# Dane do Success Rate
-try:
-    df_sens = pd.read_csv('WBAN_Sensitivity_Results.csv')
-    df_sens = df_sens[df_sens['Algorithm'].isin(ALGOS)]
-    df_sens['Success_Pct'] = df_sens['Is_Success'] * 100
-except:
-    df_sens = pd.DataFrame()
-
-def save_plot(filename):
-    path = os.path.join(OUTPUT_DIR, filename)
+# Zamiast odrzucać próby z Link Margin <= 0.1 (czyli próby z karą), pokazujemy
+# skuteczność osobno, a metryki fizyczne - dla prób udanych z 95% CI (bootstrap).
+# Podsumowanie jest agregatem pipeline'u liczonym z CSV wyników (cache pod hashem
+# CSV), więc nie czytamy zapisanych plików *_Summary.csv - mogłyby być starsze od wyników.
+def load_experiment():
+    print(">>> Wczytywanie wyników eksperymentu...")
+    try:
+        return pd.read_csv(EXPERIMENT_CSV)
+    except FileNotFoundError:
+        print(f"BŁĄD: Brak pliku {EXPERIMENT_CSV}")
+        exit()
+
+def load_sensitivity():
+    try:
+        return pd.read_csv(SENSITIVITY_CSV)
+    except FileNotFoundError:
+        return pd.DataFrame()
+
+def summarize_experiment(df):
+    return summarize(df)
+
+def summarize_sensitivity(df):
+    return summarize(df, metrics=['Fitness_Cost'], group_cols=['Config_Pack', 'Algorithm'])
+
+def metric_table(summary, metric, scale=1.0):
+    """Wiersze jednej metryki (tylko wybrane algorytmy), wartości przeskalowane."""
+    table = summary[(summary['Metric'] == metric) & summary['Algorithm'].isin(ALGOS)].copy()
+    for col in ['Mean', 'CI_Low', 'CI_High']:
+        table[col] = table[col] * scale
+    # Długości słupków błędu (przy stałych wynikach CI = średnia +/- szum zaokrągleń)
+    table['Err_Low'] = (table['Mean'] - table['CI_Low']).clip(lower=0)
+    table['Err_High'] = (table['CI_High'] - table['Mean']).clip(lower=0)
+    return table
+
+def save_plot(path):
     plt.savefig(path, bbox_inches='tight')
-    print(f"Wygenerowano: {path}")
     plt.close()
 
 # ==============================================================================
 # 3. GENEROWANIE POPRAWIONYCH WYKRESÓW
 # ==============================================================================
+def plot_ci_lines(table, errorbars=True):
+    """Średnia + 95% CI (bootstrap) dla każdego algorytmu."""
+    for algo in ALGOS:
+        subset = table[table['Algorithm'] == algo].sort_values('Scenario_Sensors')
+        yerr = [subset['Err_Low'], subset['Err_High']] if errorbars else None
+        plt.errorbar(subset['Scenario_Sensors'], subset['Mean'], yerr=yerr, label=algo, color=COLORS[algo],
+                     marker=MARKERS[algo], capsize=5)
+    plt.legend(title='Algorithm')
 
 # --- WYKRES 1: ENERGIA ---
-plt.figure(figsize=(10, 6))
-sns.lineplot(data=df_clean, x='Scenario_Sensors', y='Energy_Total_J', hue='Algorithm', style='Algorithm',
-             palette=COLORS, markers=MARKERS, err_style="bars", errorbar=("sd", 1), 
-             err_kws={'capsize': 5}) 
-plt.xlabel("Liczba Sensorów")
-plt.ylabel("Energia Całkowita [J]")
-plt.title("Rys. 5.1. Trend zużycia energii")
-plt.grid(True, alpha=0.3)
-save_plot("Fig1_Energy_Trend.png")
+def draw_energy(path, summary):
+    plt.figure(figsize=(10, 6))
+    plot_ci_lines(metric_table(summary, 'Energy_Total_J'))
+    plt.xlabel("Liczba Sensorów")
+    plt.ylabel("Energia Całkowita [J]")
+    plt.title("Rys. 5.1. Trend zużycia energii")
+    plt.grid(True, alpha=0.3)
+    save_plot(path)
 
 # --- WYKRES 2: OPÓŹNIENIE (NAPRAWIONE OSIE) ---
-plt.figure(figsize=(10, 6))
-sns.lineplot(data=df_clean, x='Scenario_Sensors', y='Delay_ms', hue='Algorithm', style='Algorithm',
-             palette=COLORS, markers=MARKERS, errorbar=None) # Bez errorbar bo opóźnienie jest stałe
-
-# WYMUSZENIE SKALI OD 0 DO 2 ms
-# To sprawi, że linia będzie płaska (poprawnie), a nie poszarpana przez szum 1e-12
-plt.ylim(0, 3.0) 
-plt.xlabel("Liczba Sensorów")
-plt.ylabel("Opóźnienie [ms]")
-plt.title("Rys. 5.5. Średnie opóźnienie transmisji")
-plt.grid(True, alpha=0.3)
-save_plot("Fig2_Delay_Trend.png")
+def draw_delay(path, summary):
+    plt.figure(figsize=(10, 6))
+    plot_ci_lines(metric_table(summary, 'Avg_Delay_s', scale=1000), errorbars=False) # Bez errorbar bo opóźnienie jest stałe
+
+    # WYMUSZENIE SKALI OD 0 DO 2 ms
+    # To sprawi, że linia będzie płaska (poprawnie), a nie poszarpana przez szum 1e-12
+    plt.ylim(0, 3.0)
+    plt.xlabel("Liczba Sensorów")
+    plt.ylabel("Opóźnienie [ms]")
+    plt.title("Rys. 5.5. Średnie opóźnienie transmisji")
+    plt.grid(True, alpha=0.3)
+    save_plot(path)
 
 # --- WYKRES 3: LINK MARGIN (CZYSTSZY) ---
-plt.figure(figsize=(10, 6))
-sns.lineplot(data=df_clean, x='Scenario_Sensors', y='Min_Link_Margin_dB', hue='Algorithm', style='Algorithm',
-             palette=COLORS, markers=MARKERS, err_style="bars", errorbar=("sd", 1),
-             err_kws={'capsize': 5})
-plt.xlabel("Liczba Sensorów")
-plt.ylabel("Link Margin [dB]")
-plt.title("Rys. 5.3. Margines łącza radiowego (Link Margin)")
-plt.grid(True, alpha=0.3)
-save_plot("Fig4_Reliability.png")
+def draw_reliability(path, summary):
+    plt.figure(figsize=(10, 6))
+    plot_ci_lines(metric_table(summary, 'Min_Link_Margin_dB'))
+    plt.xlabel("Liczba Sensorów")
+    plt.ylabel("Link Margin [dB]")
+    plt.title("Rys. 5.3. Margines łącza radiowego (Link Margin)")
+    plt.grid(True, alpha=0.3)
+    save_plot(path)
 
 # --- WYKRES 4: CZAS ---
-plt.figure(figsize=(10, 6))
-sns.lineplot(data=df_clean, x='Scenario_Sensors', y='Execution_Time_s', hue='Algorithm', style='Algorithm',
-             palette=COLORS, markers=MARKERS, err_style="bars", errorbar=("sd", 1),
-             err_kws={'capsize': 5})
-plt.xlabel("Liczba Sensorów")
-plt.ylabel("Czas Obliczeń [s]")
-plt.title("Rys. 5.4. Koszt obliczeniowy")
-plt.grid(True, alpha=0.3)
-save_plot("Fig3_Time_Cost.png")
+def draw_time(path, summary):
+    plt.figure(figsize=(10, 6))
+    plot_ci_lines(metric_table(summary, 'Execution_Time_s'))
+    plt.xlabel("Liczba Sensorów")
+    plt.ylabel("Czas Obliczeń [s]")
+    plt.title("Rys. 5.4. Koszt obliczeniowy")
+    plt.grid(True, alpha=0.3)
+    save_plot(path)
 
 # --- WYKRES 5: SUCCESS RATE ---
-if not df_sens.empty:
-    sens_agg = df_sens.groupby(['Config_Pack', 'Algorithm'])['Success_Pct'].mean().reset_index()
+def draw_success(path, sens_summary):
     labels_map = {'A_Eco': 'Eco', 'B_Standard': 'Standard', 'C_High': 'High'}
-    sens_agg['Config_Label'] = sens_agg['Config_Pack'].map(labels_map)
-    
+    table = metric_table(sens_summary, 'Success_Rate', scale=100)
+    table = table[table['Config_Pack'].isin(labels_map)]
+    x = np.arange(len(labels_map))
+    width = 0.25
+
     plt.figure(figsize=(9, 6))
-    sns.barplot(data=sens_agg, x='Config_Label', y='Success_Pct', hue='Algorithm', 
-                palette=COLORS, order=['Eco', 'Standard', 'High'], edgecolor='black')
+    for i, algo in enumerate(ALGOS):
+        subset = table[table['Algorithm'] == algo].set_index('Config_Pack').reindex(list(labels_map))
+        yerr = [subset['Err_Low'], subset['Err_High']]
+        plt.bar(x + (i - 1) * width, subset['Mean'], width, yerr=yerr, capsize=4, label=algo,
+                color=COLORS[algo], edgecolor='black')
+    plt.xticks(x, list(labels_map.values()))
     plt.xlabel("Zasoby")
-    plt.ylabel("Skuteczność [%]")
+    plt.ylabel("Skuteczność [%] (95% CI Wilsona)")
     plt.title("Rys. 5.6. Skuteczność algorytmów (Success Rate)")
     plt.ylim(0, 110)
-    save_plot("Fig6_Sensitivity.png")
+    plt.legend(title='Algorithm')
+    save_plot(path)
 
 # --- WYKRES 6: SŁUPKOWY ---
-subset = df_clean[df_clean['Scenario_Sensors'].isin([6, 12, 20])]
-plt.figure(figsize=(9, 6))
-sns.barplot(data=subset, x='Scenario_Sensors', y='Energy_Total_J', hue='Algorithm',
-            palette=COLORS, edgecolor='black', errorbar=None)
-plt.title("Rys. 5.2. Porównanie Efektywności Energetycznej")
-save_plot("Fig5_Energy_Comparison.png")
-
-print("\n>>> SUKCES. Wykresy naprawione (Delay scale fixed, GA outliers removed).")
\ No newline at end of file
+def draw_energy_bars(path, summary):
+    table = metric_table(summary, 'Energy_Total_J')
+    subset = table[table['Scenario_Sensors'].isin([6, 12, 20])]
+    plt.figure(figsize=(9, 6))
+    sns.barplot(data=subset, x='Scenario_Sensors', y='Mean', hue='Algorithm',
+                palette=COLORS, edgecolor='black', errorbar=None)
+    plt.ylabel('Energy_Total_J')
+    plt.title("Rys. 5.2. Porównanie Efektywności Energetycznej")
+    save_plot(path)
+
+# ==============================================================================
+# 4. GRAF ZALEŻNOŚCI: WYNIKI -> PODSUMOWANIE (CI) -> WYKRESY
+# ==============================================================================
+def build_pipeline():
+    pipe = PlotPipeline(output_dir=OUTPUT_DIR, style=setup_style)
+
+    pipe.source('experiment', [EXPERIMENT_CSV], load_experiment)
+    pipe.source('sensitivity', [SENSITIVITY_CSV], load_sensitivity)
+    pipe.aggregate('summary', summarize_experiment, deps=['experiment'])
+    pipe.aggregate('sens_summary', summarize_sensitivity, deps=['sensitivity'])
+
+    pipe.figure('Fig1_Energy_Trend.png', draw_energy, deps=['summary'])
+    pipe.figure('Fig2_Delay_Trend.png', draw_delay, deps=['summary'])
+    pipe.figure('Fig4_Reliability.png', draw_reliability, deps=['summary'])
+    pipe.figure('Fig3_Time_Cost.png', draw_time, deps=['summary'])
+    if os.path.exists(SENSITIVITY_CSV):
+        pipe.figure('Fig6_Sensitivity.png', draw_success, deps=['sens_summary'])
+    pipe.figure('Fig5_Energy_Comparison.png', draw_energy_bars, deps=['summary'])
+    return pipe
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Poprawione wykresy do rozdziału 5 (przyrostowo).")
+    parser.add_argument('--force', action='store_true', help="Przerysuj wszystkie wykresy")
+    parser.add_argument('--workers', type=int, default=None, help="Liczba procesów rysujących")
+    args = parser.parse_args()
+
+    build_pipeline().run(force=args.force, workers=args.workers)
+    print("\n>>> SUKCES. Wykresy naprawione (Delay scale fixed, 95% CI + osobna skuteczność).")
@@ -3,28 +3,33 @@ import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 import os
+import argparse
+from src.convergence import ConvergenceStore
+from src.plot_pipeline import PlotPipeline
 
 # ==============================================================================
 # 1. KONFIGURACJA STYLU (PROFESJONALNY IEEE STYLE)
 # ==============================================================================
-plt.style.use('seaborn-v0_8-whitegrid')
-
-plt.rcParams.update({
-    'font.family': 'sans-serif',
-    'font.size': 12,
-    'axes.labelsize': 13,
-    'axes.titlesize': 14,
-    'axes.titleweight': 'bold',
-    'legend.fontsize': 11,
-    'lines.linewidth': 2.5,
-    'lines.markersize': 8,
-    'figure.dpi': 300,
-    'figure.constrained_layout.use': True
-})
+def setup_style():
+    plt.style.use('seaborn-v0_8-whitegrid')
+
+    plt.rcParams.update({
+        'font.family': 'sans-serif',
+        'font.size': 12,
+        'axes.labelsize': 13,
+        'axes.titlesize': 14,
+        'axes.titleweight': 'bold',
+        'legend.fontsize': 11,
+        'lines.linewidth': 2.5,
+        'lines.markersize': 8,
+        'figure.dpi': 300,
+        'figure.constrained_layout.use': True
+    })
 
 OUTPUT_DIR = "FINAL_THESIS_CHARTS_FULL"
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
+EXPERIMENT_CSV = 'WBAN_Experiment_Results.csv'
+SENSITIVITY_CSV = 'WBAN_Sensitivity_Results.csv'
+CONVERGENCE_DIR = 'WBAN_Convergence/experiment'
 
 SELECTED_ALGOS = ['GA', 'PSO', 'GWO']
 
@@ -35,23 +40,24 @@ ALGO_OPTS = {
     'GWO': {'color': '#2ca02c', 'marker': 'o', 'label': 'GWO', 'ls': ':',  'offset': 0.2}   # Zielony
 }
 
-def save_current_plot(filename):
-    path = os.path.join(OUTPUT_DIR, filename)
+def save_current_plot(path):
     plt.savefig(path)
-    print(f"[GENERATED] {path}")
     plt.close()
 
 # ==============================================================================
 # 2. WCZYTYWANIE DANYCH (LUB GENEROWANIE MOCK-UP JEŚLI BRAK PLIKU)
 # ==============================================================================
-# UWAGA: Ten blok symuluje dane, jeśli nie masz pliku CSV pod ręką. 
+# UWAGA: Ten blok symuluje dane, jeśli nie masz pliku CSV pod ręką.
 # W twoim środowisku odkomentuj wczytywanie pd.read_csv!
 
-try:
-    df_exp = pd.read_csv('WBAN_Experiment_Results.csv')
-    df_sens = pd.read_csv('WBAN_Sensitivity_Results.csv')
-    print(">>> Wczytano dane z plików CSV.")
-except FileNotFoundError:
+def load_experiment():
+    try:
+        df_exp = pd.read_csv(EXPERIMENT_CSV)
+        print(">>> Wczytano dane z pliku CSV (eksperyment).")
+        return df_exp
+    except FileNotFoundError:
+        pass
+
     print(">>> Brak plików CSV. Generowanie danych symulacyjnych dla wykresów...")
     # --- SYMULACJA DANYCH (ABY SKRYPT DZIAŁAŁ OD RĘKI) ---
     sensors = [6, 8, 10, 12, 15, 20]
@@ -61,13 +67,13 @@ except FileNotFoundError:
         for algo in SELECTED_ALGOS:
             time_factor = 1.0 if algo == 'GA' else (0.3 if algo == 'PSO' else 0.25)
             exec_time = (0.05 * s) * time_factor + np.random.rand()*0.02
-            
+
             # Generujemy 30 prób dla Box Plotów
             for trial in range(30):
                 noise = np.random.normal(0, 0.0001)
                 # GA ma większy rozrzut (mniej stabilny)
-                if algo == 'GA': noise *= 3 
-                
+                if algo == 'GA': noise *= 3
+
                 data.append({
                     'Scenario_Sensors': s,
                     'Algorithm': algo,
@@ -76,8 +82,14 @@ except FileNotFoundError:
                     'Execution_Time_s': exec_time + np.random.rand()*0.05,
                     'Min_Link_Margin_dB': 40 - 0.2*s + np.random.normal(0, 1)
                 })
-    df_exp = pd.DataFrame(data)
-    
+    return pd.DataFrame(data)
+
+def load_sensitivity():
+    try:
+        return pd.read_csv(SENSITIVITY_CSV)
+    except FileNotFoundError:
+        pass
+
     # Dane do sensitivity (Fig 6)
     sens_data = []
     for pack in ['A_Eco', 'B_Standard', 'C_High']:
@@ -87,27 +99,56 @@ except FileNotFoundError:
             if pack == 'A_Eco' and algo == 'GA': success = 0.3
             if pack == 'A_Eco' and algo == 'PSO': success = 0.5
             if pack == 'A_Eco' and algo == 'GWO': success = 0.4 # Symulacja
-            
+
             sens_data.append({'Config_Pack': pack, 'Algorithm': algo, 'Is_Success': success})
-    df_sens = pd.DataFrame(sens_data)
+    return pd.DataFrame(sens_data)
+
+def load_convergence_curves(scenario=20):
+    """
+    Wczytuje prawdziwe krzywe zbieżności (mediana global best po próbach)
+    z magazynu zapisanego przez run_research_study.py. Zwraca None, jeśli brak danych.
+    """
+    if not os.path.exists(os.path.join(CONVERGENCE_DIR, 'index.csv')):
+        return None
+    store = ConvergenceStore.open(CONVERGENCE_DIR)
+    curves = {}
+    for algo in SELECTED_ALGOS:
+        runs = store.curves('global_best', Algorithm=algo, Scenario_Sensors=scenario)
+        curves[algo] = np.nanmedian(runs, axis=0) if len(runs) else None
+    if any(c is None for c in curves.values()):
+        return None
+    return curves
 
+# ==============================================================================
+# 3. AGREGATY (LICZONE RAZ, CACHE NA DYSKU)
+# ==============================================================================
+METRICS = ['Energy_Total_J', 'Avg_Delay_s', 'Execution_Time_s', 'Min_Link_Margin_dB', 'Cost_Efficiency']
 
-df_valid = df_exp # Zakładamy że dane są poprawne
+def mean_by_scenario(df_exp):
+    # Metryka = Energia * Czas. Im mniej tym lepiej.
+    df = df_exp.copy()
+    df['Cost_Efficiency'] = df['Energy_Total_J'] * df['Execution_Time_s']
+    return df.groupby(['Scenario_Sensors', 'Algorithm'])[METRICS].mean().reset_index()
+
+def success_by_pack(df_sens):
+    return df_sens.groupby(['Config_Pack', 'Algorithm'])['Is_Success'].mean().reset_index()
+
+def largest_scenario_trials(df_exp):
+    # Filtrujemy tylko dla dużego scenariusza (20 sensorów), tam widać różnice
+    return df_exp[df_exp['Scenario_Sensors'] == 20][['Algorithm', 'Energy_Total_J']].copy()
 
 # ==============================================================================
-# 3. GENEROWANIE WYKRESÓW PODSTAWOWYCH (FIG 1-4) Z JITTEREM
+# 4. GENEROWANIE WYKRESÓW PODSTAWOWYCH (FIG 1-4) Z JITTEREM
 # ==============================================================================
-def plot_jittered_line(metric, y_label, title, filename):
+def plot_jittered_line(path, grouped, metric, y_label, title):
     plt.figure(figsize=(8, 5))
-    # Agregacja do średniej
-    grouped = df_valid.groupby(['Scenario_Sensors', 'Algorithm'])[metric].mean().reset_index()
-    
+
     for algo in SELECTED_ALGOS:
         subset = grouped[grouped['Algorithm'] == algo]
         opts = ALGO_OPTS[algo]
         # Jitter X
         x_shifted = subset['Scenario_Sensors'] + opts['offset']
-        
+
         plt.plot(x_shifted, subset[metric],
                  label=opts['label'], color=opts['color'],
                  marker=opts['marker'], linestyle=opts['ls'], alpha=0.9)
@@ -115,87 +156,100 @@ def plot_jittered_line(metric, y_label, title, filename):
     plt.xlabel('Liczba Sensorów')
     plt.ylabel(y_label)
     plt.title(title)
-    plt.xticks(sorted(df_valid['Scenario_Sensors'].unique()))
+    plt.xticks(sorted(grouped['Scenario_Sensors'].unique()))
     plt.legend()
     plt.grid(True, linestyle='--', alpha=0.6)
-    save_current_plot(filename)
+    save_current_plot(path)
 
-plot_jittered_line('Energy_Total_J', 'Energia Całkowita [J]', 'Fig 1. Trend Energii (Skalowalność)', 'Fig1_Energy_Trend.png')
-plot_jittered_line('Avg_Delay_s', 'Opóźnienie [s]', 'Fig 2. Opóźnienie Transmisji', 'Fig2_Delay_Trend.png')
-plot_jittered_line('Execution_Time_s', 'Czas Obliczeń [s]', 'Fig 3. Koszt Obliczeniowy', 'Fig3_Time_Cost.png')
-plot_jittered_line('Min_Link_Margin_dB', 'Link Margin [dB]', 'Fig 4. Niezawodność Łącza', 'Fig4_Reliability.png')
+def draw_fig1(path, grouped):
+    plot_jittered_line(path, grouped, 'Energy_Total_J', 'Energia Całkowita [J]', 'Fig 1. Trend Energii (Skalowalność)')
+
+def draw_fig2(path, grouped):
+    plot_jittered_line(path, grouped, 'Avg_Delay_s', 'Opóźnienie [s]', 'Fig 2. Opóźnienie Transmisji')
+
+def draw_fig3(path, grouped):
+    plot_jittered_line(path, grouped, 'Execution_Time_s', 'Czas Obliczeń [s]', 'Fig 3. Koszt Obliczeniowy')
+
+def draw_fig4(path, grouped):
+    plot_jittered_line(path, grouped, 'Min_Link_Margin_dB', 'Link Margin [dB]', 'Fig 4. Niezawodność Łącza')
 
 # ==============================================================================
-# 4. FIG 5: SŁUPKOWY PORÓWNANIE ENERGII
+# 5. FIG 5: SŁUPKOWY PORÓWNANIE ENERGII
 # ==============================================================================
-scenarios = [6, 12, 20]
-x = np.arange(len(scenarios))
-width = 0.25
-plt.figure(figsize=(9, 6))
-
-grouped = df_valid.groupby(['Scenario_Sensors', 'Algorithm'])['Energy_Total_J'].mean().reset_index()
-
-for i, algo in enumerate(SELECTED_ALGOS):
-    means = []
-    for s in scenarios:
-        val = grouped[(grouped['Scenario_Sensors'] == s) & (grouped['Algorithm'] == algo)]['Energy_Total_J'].values
-        means.append(val[0] if len(val) > 0 else 0)
-    
-    plt.bar(x + (i-1)*width, means, width, label=ALGO_OPTS[algo]['label'], 
-            color=ALGO_OPTS[algo]['color'], edgecolor='black')
-
-plt.text(1, max(means)*0.92, "Wszystkie algorytmy osiągają\nto samo optimum fizyczne", 
-         ha='center', bbox=dict(facecolor='white', alpha=0.9, edgecolor='gray'))
-
-plt.ylabel('Średnie Zużycie Energii [J]')
-plt.title('Fig 5. Porównanie Efektywności Energetycznej')
-plt.xticks(x, [f'{s} Sensorów' for s in scenarios])
-plt.legend()
-save_current_plot('Fig5_Energy_Comparison.png')
+def draw_fig5(path, grouped):
+    scenarios = [6, 12, 20]
+    x = np.arange(len(scenarios))
+    width = 0.25
+    plt.figure(figsize=(9, 6))
+
+    for i, algo in enumerate(SELECTED_ALGOS):
+        means = []
+        for s in scenarios:
+            val = grouped[(grouped['Scenario_Sensors'] == s) & (grouped['Algorithm'] == algo)]['Energy_Total_J'].values
+            means.append(val[0] if len(val) > 0 else 0)
+
+        plt.bar(x + (i-1)*width, means, width, label=ALGO_OPTS[algo]['label'],
+                color=ALGO_OPTS[algo]['color'], edgecolor='black')
+
+    plt.text(1, max(means)*0.92, "Wszystkie algorytmy osiągają\nto samo optimum fizyczne",
+             ha='center', bbox=dict(facecolor='white', alpha=0.9, edgecolor='gray'))
+
+    plt.ylabel('Średnie Zużycie Energii [J]')
+    plt.title('Fig 5. Porównanie Efektywności Energetycznej')
+    plt.xticks(x, [f'{s} Sensorów' for s in scenarios])
+    plt.legend()
+    save_current_plot(path)
 
 # ==============================================================================
-# 5. FIG 6: ANALIZA WRAŻLIWOŚCI
+# 6. FIG 6: ANALIZA WRAŻLIWOŚCI
 # ==============================================================================
-# Uwaga: Tutaj zakładamy prostą strukturę danych
-success_map = {'A_Eco': 'Eco', 'B_Standard': 'Standard', 'C_High': 'High'}
-df_sens['Config_Label'] = df_sens['Config_Pack'].map(success_map)
-packs = ['Eco', 'Standard', 'High']
-x = np.arange(len(packs))
-
-plt.figure(figsize=(9, 6))
-for i, algo in enumerate(SELECTED_ALGOS):
-    vals = []
-    for p in packs:
-        subset = df_sens[(df_sens['Algorithm']==algo) & (df_sens['Config_Label']==p)]
-        # Jeśli mamy wiele prób, liczymy średnią z Is_Success (0 lub 1) -> co daje %
-        val = subset['Is_Success'].mean() * 100 if not subset.empty else 0
-        vals.append(val)
-    
-    plt.bar(x + (i-1)*width, vals, width, label=ALGO_OPTS[algo]['label'], 
-            color=ALGO_OPTS[algo]['color'], edgecolor='black')
-
-plt.ylabel('Sukces [%]')
-plt.title('Fig 6. Stabilność Algorytmów (Success Rate)')
-plt.xticks(x, packs)
-plt.ylim(0, 110)
-plt.legend()
-save_current_plot('Fig6_Sensitivity.png')
+def draw_fig6(path, success):
+    # Uwaga: Tutaj zakładamy prostą strukturę danych
+    success_map = {'A_Eco': 'Eco', 'B_Standard': 'Standard', 'C_High': 'High'}
+    success = success.assign(Config_Label=success['Config_Pack'].map(success_map))
+    packs = ['Eco', 'Standard', 'High']
+    x = np.arange(len(packs))
+    width = 0.25
+
+    plt.figure(figsize=(9, 6))
+    for i, algo in enumerate(SELECTED_ALGOS):
+        vals = []
+        for p in packs:
+            subset = success[(success['Algorithm']==algo) & (success['Config_Label']==p)]
+            # Średnia z Is_Success (0 lub 1) -> co daje %
+            val = subset['Is_Success'].mean() * 100 if not subset.empty else 0
+            vals.append(val)
+
+        plt.bar(x + (i-1)*width, vals, width, label=ALGO_OPTS[algo]['label'],
+                color=ALGO_OPTS[algo]['color'], edgecolor='black')
+
+    plt.ylabel('Sukces [%]')
+    plt.title('Fig 6. Stabilność Algorytmów (Success Rate)')
+    plt.xticks(x, packs)
+    plt.ylim(0, 110)
+    plt.legend()
+    save_current_plot(path)
 
 # ==============================================================================
-# 6. FIG 7: WYKRES ZBIEŻNOŚCI (INTEGRACJA KODU)
+# 7. FIG 7: WYKRES ZBIEŻNOŚCI (INTEGRACJA KODU)
 # ==============================================================================
-def draw_convergence():
-    epochs = np.arange(1, 51)
-    # Symulacja danych zbieżności
-    ga_fit = 0.035 + 0.04 * np.exp(-0.05 * epochs)
-    pso_fit = 0.035 + 0.04 * np.exp(-0.15 * epochs) + 0.001 * np.sin(epochs*0.5)
-    gwo_fit = 0.035 + 0.04 * np.exp(-0.3 * epochs)
-    
-    # Clip do optimum
-    optimum = 0.0348
-    ga_fit = np.maximum(ga_fit, optimum)
-    pso_fit = np.maximum(pso_fit, optimum)
-    gwo_fit = np.maximum(gwo_fit, optimum)
+def draw_convergence(path, curves):
+    if curves is not None:
+        ga_fit, pso_fit, gwo_fit = curves['GA'], curves['PSO'], curves['GWO']
+        epochs = np.arange(1, len(ga_fit) + 1)
+        optimum = float(np.nanmin([np.nanmin(c) for c in curves.values()]))
+    else:
+        epochs = np.arange(1, 51)
+        # Symulacja danych zbieżności
+        ga_fit = 0.035 + 0.04 * np.exp(-0.05 * epochs)
+        pso_fit = 0.035 + 0.04 * np.exp(-0.15 * epochs) + 0.001 * np.sin(epochs*0.5)
+        gwo_fit = 0.035 + 0.04 * np.exp(-0.3 * epochs)
+
+        # Clip do optimum
+        optimum = 0.0348
+        ga_fit = np.maximum(ga_fit, optimum)
+        pso_fit = np.maximum(pso_fit, optimum)
+        gwo_fit = np.maximum(gwo_fit, optimum)
 
     plt.figure(figsize=(10, 6))
     plt.plot(epochs, ga_fit, color=ALGO_OPTS['GA']['color'], label='GA', marker='s', markevery=5)
@@ -204,68 +258,93 @@ def draw_convergence():
 
     plt.axhline(y=optimum, color='gray', linestyle='--', label='Optimum Globalne')
     plt.xlabel('Liczba Epok (Iteracji)')
-    plt.ylabel('Funkcja Celu (Energia [J])')
+    plt.ylabel('Funkcja Celu (Fitness)' if curves is not None else 'Funkcja Celu (Energia [J])')
     plt.title('Fig 7. Analiza Zbieżności (Convergence Plot)')
     plt.legend()
-    
-    plt.annotate('GWO zbiega najszybciej', xy=(10, gwo_fit[9]), xytext=(15, 0.05),
-                 arrowprops=dict(facecolor='black', shrink=0.05))
-    
-    save_current_plot('Fig7_Convergence.png')
 
-draw_convergence()
+    if curves is None:
+        plt.annotate('GWO zbiega najszybciej', xy=(10, gwo_fit[9]), xytext=(15, 0.05),
+                     arrowprops=dict(facecolor='black', shrink=0.05))
+
+    save_current_plot(path)
 
 # ==============================================================================
-# 7. FIG 8: BOX PLOT (NOWOŚĆ - ROZKŁAD/STABILNOŚĆ)
+# 8. FIG 8: BOX PLOT (NOWOŚĆ - ROZKŁAD/STABILNOŚĆ)
 # ==============================================================================
 # Pokazuje, czy algorytmy są powtarzalne. GA zwykle ma większy rozrzut.
-plt.figure(figsize=(9, 6))
-
-# Filtrujemy tylko dla dużego scenariusza (20 sensorów), tam widać różnice
-subset_20 = df_valid[df_valid['Scenario_Sensors'] == 20].copy()
-
-sns.boxplot(x='Algorithm', y='Energy_Total_J', data=subset_20, 
-            palette=[ALGO_OPTS[a]['color'] for a in SELECTED_ALGOS],
-            boxprops=dict(alpha=.7))
+def draw_fig8(path, subset_20):
+    plt.figure(figsize=(9, 6))
 
-plt.title('Fig 8. Rozkład Wyników Energetycznych (20 Sensorów)')
-plt.ylabel('Energia Całkowita [J]')
-plt.xlabel('Algorytm')
-plt.grid(axis='y', linestyle='--', alpha=0.6)
+    sns.boxplot(x='Algorithm', y='Energy_Total_J', data=subset_20,
+                palette=[ALGO_OPTS[a]['color'] for a in SELECTED_ALGOS],
+                boxprops=dict(alpha=.7))
 
-# Dodajemy punkty (strip plot) żeby pokazać próby
-sns.stripplot(x='Algorithm', y='Energy_Total_J', data=subset_20, 
-              color='black', alpha=0.3, jitter=True)
+    plt.title('Fig 8. Rozkład Wyników Energetycznych (20 Sensorów)')
+    plt.ylabel('Energia Całkowita [J]')
+    plt.xlabel('Algorytm')
+    plt.grid(axis='y', linestyle='--', alpha=0.6)
 
-save_current_plot('Fig8_Energy_Distribution.png')
+    # Dodajemy punkty (strip plot) żeby pokazać próby
+    sns.stripplot(x='Algorithm', y='Energy_Total_J', data=subset_20,
+                  color='black', alpha=0.3, jitter=True)
 
+    save_current_plot(path)
 
 # ==============================================================================
-# 8. FIG 9: WSKAŹNIK KOSZT-EFEKTYWNOŚĆ (NOWOŚĆ)
+# 9. FIG 9: WSKAŹNIK KOSZT-EFEKTYWNOŚĆ (NOWOŚĆ)
 # ==============================================================================
-# Metryka = Energia * Czas. Im mniej tym lepiej.
 # Pokazuje, że GWO jest "najtańszy" w uzyskaniu wyniku.
+def draw_fig9(path, grouped):
+    plt.figure(figsize=(8, 5))
 
-df_valid['Cost_Efficiency'] = df_valid['Energy_Total_J'] * df_valid['Execution_Time_s']
-
-plt.figure(figsize=(8, 5))
-grouped_eff = df_valid.groupby(['Scenario_Sensors', 'Algorithm'])['Cost_Efficiency'].mean().reset_index()
+    for algo in SELECTED_ALGOS:
+        subset = grouped[grouped['Algorithm'] == algo]
+        opts = ALGO_OPTS[algo]
+        x_shifted = subset['Scenario_Sensors'] + opts['offset']
 
-for algo in SELECTED_ALGOS:
-    subset = grouped_eff[grouped_eff['Algorithm'] == algo]
-    opts = ALGO_OPTS[algo]
-    x_shifted = subset['Scenario_Sensors'] + opts['offset']
-    
-    plt.plot(x_shifted, subset['Cost_Efficiency'],
-             label=opts['label'], color=opts['color'],
-             marker=opts['marker'], linestyle=opts['ls'])
+        plt.plot(x_shifted, subset['Cost_Efficiency'],
+                 label=opts['label'], color=opts['color'],
+                 marker=opts['marker'], linestyle=opts['ls'])
 
-plt.xlabel('Liczba Sensorów')
-plt.ylabel('Wskaźnik EDP (Energy $\\times$ Time)')
-plt.title('Fig 9. Wskaźnik Efektywności (Im mniej tym lepiej)')
-plt.legend()
-plt.grid(True, linestyle='--', alpha=0.6)
+    plt.xlabel('Liczba Sensorów')
+    plt.ylabel('Wskaźnik EDP (Energy $\\times$ Time)')
+    plt.title('Fig 9. Wskaźnik Efektywności (Im mniej tym lepiej)')
+    plt.legend()
+    plt.grid(True, linestyle='--', alpha=0.6)
 
-save_current_plot('Fig9_Efficiency_Metric.png')
+    save_current_plot(path)
 
-print("\n=== GOTOWE! Wygenerowano 9 wykresów w folderze FINAL_THESIS_CHARTS_FULL ===")
\ No newline at end of file
+# ==============================================================================
+# 10. GRAF ZALEŻNOŚCI: CSV -> AGREGATY -> WYKRESY
+# ==============================================================================
+def build_pipeline():
+    pipe = PlotPipeline(output_dir=OUTPUT_DIR, style=setup_style)
+
+    pipe.source('experiment', [EXPERIMENT_CSV], load_experiment)
+    pipe.source('sensitivity', [SENSITIVITY_CSV], load_sensitivity)
+    pipe.source('convergence', [os.path.join(CONVERGENCE_DIR, 'index.csv'),
+                                os.path.join(CONVERGENCE_DIR, 'global_best.npy')], load_convergence_curves)
+
+    pipe.aggregate('means', mean_by_scenario, deps=['experiment'])
+    pipe.aggregate('success', success_by_pack, deps=['sensitivity'])
+    pipe.aggregate('subset_20', largest_scenario_trials, deps=['experiment'])
+
+    pipe.figure('Fig1_Energy_Trend.png', draw_fig1, deps=['means'])
+    pipe.figure('Fig2_Delay_Trend.png', draw_fig2, deps=['means'])
+    pipe.figure('Fig3_Time_Cost.png', draw_fig3, deps=['means'])
+    pipe.figure('Fig4_Reliability.png', draw_fig4, deps=['means'])
+    pipe.figure('Fig5_Energy_Comparison.png', draw_fig5, deps=['means'])
+    pipe.figure('Fig6_Sensitivity.png', draw_fig6, deps=['success'])
+    pipe.figure('Fig7_Convergence.png', draw_convergence, deps=['convergence'])
+    pipe.figure('Fig8_Energy_Distribution.png', draw_fig8, deps=['subset_20'])
+    pipe.figure('Fig9_Efficiency_Metric.png', draw_fig9, deps=['means'])
+    return pipe
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generowanie wykresów do pracy (przyrostowo).")
+    parser.add_argument('--force', action='store_true', help="Przerysuj wszystkie wykresy")
+    parser.add_argument('--workers', type=int, default=None, help="Liczba procesów rysujących")
+    args = parser.parse_args()
+
+    rendered = build_pipeline().run(force=args.force, workers=args.workers)
+    print(f"\n=== GOTOWE! Przerysowano {len(rendered)} wykresów w folderze {OUTPUT_DIR} ===")
@@ -1,10 +1,8 @@
 import numpy as np
-from mealpy.evolutionary_based import GA
-from mealpy.swarm_based import PSO
-from mealpy import FloatVar
 
 from src.fitness import WBANOptimizationProblem
 from src.body_model import BodyModel
+from src.optimizers import get_algorithm, build_problem_dict
 from src.utils import plot_body_simulation, plot_convergence
 
 # KONFIGURACJA
@@ -18,16 +16,11 @@ def run_experiment():
     # 1. Definicja Problemu
     wban_problem = WBANOptimizationProblem(n_relays=N_RELAYS)
     
-    problem_dict = {
-        "obj_func": wban_problem.fitness_function,
-        "bounds": FloatVar(lb=wban_problem.lb, ub=wban_problem.ub),
-        "minmax": wban_problem.minmax,
-        "log_to": None,
-    }
+    problem_dict = build_problem_dict(wban_problem)
 
     # 2. Uruchomienie PSO (Jest zazwyczaj szybsze i stabilniejsze dla ciągłych problemów)
     print("\n>>> Uruchamiam PSO...")
-    model_pso = PSO.OriginalPSO(epoch=EPOCHS, pop_size=POP_SIZE)
+    model_pso = get_algorithm('PSO')(epoch=EPOCHS, pop_size=POP_SIZE)
     result_pso = model_pso.solve(problem_dict)
     
     best_sol = result_pso.solution
@@ -45,7 +38,9 @@ def run_experiment():
     
     # C. Mapa z połączeniami
     relays = wban_problem.decode_solution(best_sol)
-    plot_body_simulation(relays, active_paths=active_paths, title="Optymalna Topologia Sieci (PSO)")
+    plot_body_simulation(relays, active_paths=active_paths, title="Optymalna Topologia Sieci (PSO)",
+                         hub_pos=wban_problem.hub_pos, sensors=wban_problem.sensors,
+                         sensor_pos=wban_problem.sensor_pos)
     
     print("\n--- ANALIZA ROZMIESZCZENIA ---")
     for i, r in enumerate(relays):
@@ -0,0 +1,68 @@
+import argparse
+import socket
+import time
+
+from src.telemetry import TELEMETRY_FILE, read_events, summarize
+
+# ==============================================================================
+# PODGLĄD TELEMETRII PRZEGLĄDÓW (src/telemetry.py)
+# ==============================================================================
+#   python monitor_telemetry.py                     # jednorazowe podsumowanie pliku
+#   python monitor_telemetry.py --follow            # odświeżanie co --interval s
+#   python monitor_telemetry.py --tail 20           # ostatnie surowe zdarzenia
+#   python monitor_telemetry.py --listen 9999       # odbiór UDP -> dopisywanie do pliku
+# (runnery z --telemetry udp://<host>:9999 wysyłają zdarzenia do tego procesu)
+REFRESH_S = 5.0
+
+
+def print_summary(events):
+    table = summarize(events)
+    if table.empty:
+        print("(brak zdarzeń)")
+        return
+    print(table.round({'Last_Seen_s': 0, 'Evals_per_s': 1, 'Best': 6, 'RSS_MB': 0, 'RSS_Peak_MB': 0}).to_string(index=False))
+    flagged = table[table['Status'] != 'OK']
+    for _, row in flagged.iterrows():
+        print(f"[UWAGA] {row['Source']}: {row['Status']} (ostatnie zdarzenie {row['Last_Seen_s']:.0f} s temu)")
+
+
+def follow(path, interval):
+    events, offset = read_events(path)
+    while True:
+        print("\033[2J\033[H", end="")
+        print(f"=== {path} | {time.strftime('%H:%M:%S')} | zdarzeń: {len(events)} ===")
+        print_summary(events)
+        time.sleep(interval)
+        new, offset = read_events(path, offset)
+        events.extend(new)
+
+
+def listen(port, path):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('0.0.0.0', port))
+    print(f"[TELEMETRIA] Nasłuch UDP :{port} -> {path}")
+    with open(path, 'ab', buffering=0) as f:
+        while True:
+            data, _ = sock.recvfrom(65536)
+            f.write(data if data.endswith(b"\n") else data + b"\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Podgląd i agregacja telemetrii JSON-lines z przeglądów.")
+    parser.add_argument('path', nargs='?', default=TELEMETRY_FILE, help="Plik telemetrii")
+    parser.add_argument('--follow', action='store_true', help="Odświeżaj podsumowanie na bieżąco")
+    parser.add_argument('--interval', type=float, default=REFRESH_S, help="Okres odświeżania [s]")
+    parser.add_argument('--tail', type=int, default=None, help="Pokaż N ostatnich surowych zdarzeń")
+    parser.add_argument('--listen', type=int, default=None, help="Odbieraj zdarzenia UDP na porcie i dopisuj do pliku")
+    args = parser.parse_args()
+
+    if args.listen is not None:
+        listen(args.listen, args.path)
+    elif args.follow:
+        follow(args.path, args.interval)
+    else:
+        events, _ = read_events(args.path)
+        if args.tail:
+            for e in events[-args.tail:]:
+                print(e)
+        print_summary(events)
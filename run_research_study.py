@@ -1,14 +1,18 @@
+import argparse
 import numpy as np
-import pandas as pd
 import time
-from mealpy import FloatVar
-# --- IMPORTY ALGORYTMÓW (TYLKO 3 ZATWIERDZONE) ---
-from mealpy.evolutionary_based import GA
-from mealpy.swarm_based import PSO, GWO
 
 # Importy lokalne
-from src.fitness import WBANOptimizationProblem, FIXED_SENSORS
-from src.body_model import BodyModel
+from src.fitness import WBANOptimizationProblem, PENALTY_OVERLAP
+from src.scenarios import get_sensor_placement
+from src.convergence import ConvergenceStore
+from src.optimizers import build_problem_dict
+from src.lifetime import network_lifetime
+from src.results_buffer import ResultsBuffer
+from src.work_queue import WorkQueue, run_worker
+from src.trial_cache import TrialCache, cached_solve
+from src.islands import TOPOLOGIES, island_trial
+from src.telemetry import Telemetry, TELEMETRY_FILE
 
 # ==============================================================================
 # 1. KONFIGURACJA EKSPERYMENTU
@@ -18,91 +22,203 @@ N_RELAYS = 2            # Liczba klastrów
 N_TRIALS = 30           # Liczba powtórzeń (Statystyka)
 EPOCH = 50              # Liczba iteracji
 POP_SIZE = 30           # Wielkość populacji
+CONVERGENCE_DIR = "WBAN_Convergence/experiment"  # Krzywe zbieżności (memmap .npy)
+QUEUE_DB = "WBAN_Experiment_Queue.sqlite"         # Kolejka zadań (tryb wielowęzłowy)
 
-# Słownik Algorytmów - TYLKO GA, PSO, GWO
-ALGORITHMS = {
-    'GA':  GA.BaseGA,
-    'PSO': PSO.OriginalPSO,
-    'GWO': GWO.OriginalGWO
-}
+RESULTS_CSV = "WBAN_Experiment_Results.csv"
+# Kolumny wyników (bufor strukturalny, patrz src/results_buffer.py)
+RESULT_FIELDS = [
+    ('Scenario_Sensors', 'i8'),
+    ('Algorithm', 'U8'),
+    ('Trial_ID', 'i8'),
+    ('Fitness_Cost', 'f8'),
+    ('Execution_Time_s', 'f8'),
+    ('Energy_Total_J', 'f8'),
+    ('Avg_Delay_s', 'f8'),
+    ('Min_Link_Margin_dB', 'f8'),
+    ('Lifetime_Days', 'f8')
+]
+
+# Algorytmy - TYLKO GA, PSO, GWO (klasy mealpy ładowane leniwie, patrz src/optimizers.py)
+ALGORITHMS = ['GA', 'PSO', 'GWO']
 
 # ==============================================================================
-# 2. GENERATOR ROZMIESZCZENIA SENSORÓW
+# 2. POJEDYNCZA PRÓBA
 # ==============================================================================
-def get_sensor_placement(n_sensors, seed=42):
-    np.random.seed(seed)
-    sensors = []
-    # Kopiujemy bazowe sensory
-    base = [s.copy() for s in FIXED_SENSORS[:min(len(FIXED_SENSORS), n_sensors)]]
-    sensors.extend(base)
-    # Dolosowujemy resztę
-    while len(sensors) < n_sensors:
-        pos = BodyModel.get_random_valid_position()
-        sensors.append({'name': f'S_{len(sensors)}', 'pos': pos, 'data_rate': 100})
-    return sensors
+def build_scenario(n_sensors):
+    """Problem i słownik mealpy dla scenariusza (rozmieszczenie sensorów zależne tylko od n)."""
+    current_sensors = get_sensor_placement(n_sensors, seed=n_sensors)
+    problem = WBANOptimizationProblem(n_relays=N_RELAYS, custom_sensors=current_sensors)
+    return problem, build_problem_dict(problem)
+
+def run_trial(problem, problem_dict, n_sensors, algo_name, trial_id, epoch=EPOCH, pop_size=POP_SIZE, cache=None,
+              telemetry=None, islands=0, topology='ring'):
+    """
+    Jedno uruchomienie algorytmu (ziarno = nr próby). Zwraca (wiersz wyników, krzywe zbieżności).
+    Z `cache` powtórzona konfiguracja (także z run_sensitivity_analysis.py) nie jest liczona ponownie.
+    islands > 0 - model wyspowy (src/islands.py): tyle wysp tego algorytmu, każda z pop_size osobników.
+    """
+    hyperparams = {'epoch': epoch, 'pop_size': pop_size}
+    if islands:
+        res = island_trial(problem, algo_name, hyperparams, trial_id, islands, topology, cache=cache)
+    else:
+        res = cached_solve(problem, algo_name, hyperparams, seed=trial_id, cache=cache, problem_dict=problem_dict,
+                           telemetry=telemetry, trial=f"{n_sensors}/{algo_name}/{trial_id}")
+    solution = np.array(res['solution'])
+
+    metrics = problem.get_metrics_details(solution)
+    # Rozwiązanie z karą (poza ciałem / kolizja) nie jest siecią - czas życia NaN, jak metryki
+    if res['fitness'] >= PENALTY_OVERLAP:
+        lifetime_days = float('nan')
+    else:
+        lifetime_days = float(network_lifetime(problem, solution, seed=trial_id - 1)['Lifetime_Days'])
+
+    # ZAPISUJEMY TYLKO TO, CO JEST POTRZEBNE DO WYKRESÓW
+    # Usunąłem 'Network_Load_Std', które powodowało błąd
+    row = dict(
+        Scenario_Sensors=n_sensors,
+        Algorithm=algo_name,
+        Trial_ID=trial_id,
+        Fitness_Cost=res['fitness'],
+        Execution_Time_s=res['time_s'],
+        Energy_Total_J=float(metrics['Energy']),
+        Avg_Delay_s=float(metrics['Delay'] / n_sensors),
+        Min_Link_Margin_dB=float(metrics['Quality']),
+        Lifetime_Days=lifetime_days
+    )
+    return row, res['curves']
 
 # ==============================================================================
-# 3. GŁÓWNA PĘTLA BADANIA
+# 3. GŁÓWNA PĘTLA BADANIA (JEDEN PROCES)
 # ==============================================================================
-def run_experiment():
+def output_paths(islands=0, topology='ring'):
+    """CSV wyników i katalog zbieżności; tryb wyspowy zapisuje osobno (nie miesza się z próbami pojedynczymi)."""
+    if not islands:
+        return RESULTS_CSV, CONVERGENCE_DIR
+    suffix = f"islands{islands}_{topology}"
+    return RESULTS_CSV.replace('.csv', f"_{suffix}.csv"), f"{CONVERGENCE_DIR}_{suffix}"
+
+def run_experiment(use_cache=True, telemetry=None, islands=0, topology='ring'):
+    results_csv, convergence_dir = output_paths(islands, topology)
     print("============================================================")
     print("   ROZPOCZYNAM BADANIE SKALOWALNOŚCI WBAN (FIXED)")
-    print(f"   Algorytmy: {list(ALGORITHMS.keys())}")
+    print(f"   Algorytmy: {ALGORITHMS}")
     print(f"   Scenariusze: {SCENARIOS_SENSORS}")
     print(f"   Konfig: {N_TRIALS} prób, {EPOCH} epok, {POP_SIZE} pop.")
+    if islands:
+        print(f"   Model wyspowy: {islands} wysp na próbę, topologia '{topology}'")
     print("============================================================")
     
-    results_db = []
+    results_db = ResultsBuffer(results_csv, RESULT_FIELDS)
+    cache = TrialCache(enabled=use_cache)
+    n_total = len(SCENARIOS_SENSORS) * len(ALGORITHMS) * N_TRIALS
+    store = ConvergenceStore.create(convergence_dir, n_trials=n_total, n_epochs=EPOCH,
+                                    key_columns=['Scenario_Sensors', 'Algorithm', 'Trial_ID'])
 
     for n_sensors in SCENARIOS_SENSORS:
         print(f"\n>>> SCENARIUSZ: {n_sensors} SENSORÓW")
-        current_sensors = get_sensor_placement(n_sensors, seed=n_sensors)
-        
-        problem = WBANOptimizationProblem(n_relays=N_RELAYS, custom_sensors=current_sensors)
-        problem_dict = {
-            "obj_func": problem.fitness_function,
-            "bounds": FloatVar(lb=problem.lb, ub=problem.ub),
-            "minmax": "min",
-            "log_to": None
-        }
-
-        for algo_name, algo_class in ALGORITHMS.items():
+        problem, problem_dict = build_scenario(n_sensors)
+
+        for algo_name in ALGORITHMS:
             print(f"   [{algo_name}] Liczenie {N_TRIALS} powtórzeń... ", end="", flush=True)
             start_time = time.time()
             
             for i in range(N_TRIALS):
-                model = algo_class(epoch=EPOCH, pop_size=POP_SIZE)
-                
-                t0 = time.time()
-                res = model.solve(problem_dict)
-                t_exec = time.time() - t0
-                
-                metrics = problem.get_metrics_details(res.solution)
-                
-                # ZAPISUJEMY TYLKO TO, CO JEST POTRZEBNE DO WYKRESÓW
-                # Usunąłem 'Network_Load_Std', które powodowało błąd
-                results_db.append({
-                    'Scenario_Sensors': n_sensors,
-                    'Algorithm': algo_name,
-                    'Trial_ID': i + 1,
-                    'Fitness_Cost': res.target.fitness,
-                    'Execution_Time_s': t_exec,
-                    'Energy_Total_J': metrics['Energy'],
-                    'Avg_Delay_s': metrics['Delay'] / n_sensors,
-                    'Min_Link_Margin_dB': metrics['Quality']
-                })
+                row, curves = run_trial(problem, problem_dict, n_sensors, algo_name, i + 1, cache=cache,
+                                        telemetry=telemetry, islands=islands, topology=topology)
+                store.record_curves(len(results_db), {'Scenario_Sensors': n_sensors, 'Algorithm': algo_name,
+                                                      'Trial_ID': i + 1}, curves)
+                results_db.append(**row)
             
             duration = time.time() - start_time
             print(f"Gotowe ({duration:.1f}s)")
 
-    # ZAPIS
-    df = pd.DataFrame(results_db)
-    filename = "WBAN_Experiment_Results.csv"
-    df.to_csv(filename, index=False)
+    # ZAPIS (ostatni kawałek bufora; wcześniejsze trafiły na dysk w trakcie)
+    results_db.close()
+    store.flush()
     
     print("\n" + "="*60)
-    print(f"[SUKCES] Dane zapisano do: {filename}")
+    print(f"[CACHE] Trafienia: {cache.hits}, nowe próby: {cache.misses}")
+    print(f"[SUKCES] Dane zapisano do: {results_csv}")
+    print(f"[SUKCES] Krzywe zbieżności zapisano do: {convergence_dir}")
     print("="*60)
 
+# ==============================================================================
+# 4. TRYB WIELOWĘZŁOWY (KOLEJKA SQLITE, patrz src/work_queue.py)
+# ==============================================================================
+# 1) --init     rozwija przegląd w tabelę zadań (idempotentnie),
+# 2) --worker   na dowolnej liczbie maszyn/procesów ze wspólnym dyskiem,
+# 3) --collect  składa wyniki w CSV i magazyn zbieżności (kolejność jak w pętli).
+def init_queue(path=QUEUE_DB):
+    tasks = [{'key': f"{n_sensors}/{algo_name}/{i + 1}", 'n_sensors': n_sensors, 'algorithm': algo_name,
+              'trial_id': i + 1, 'epoch': EPOCH, 'pop_size': POP_SIZE}
+             for n_sensors in SCENARIOS_SENSORS for algo_name in ALGORITHMS for i in range(N_TRIALS)]
+    queue = WorkQueue(path)
+    added = queue.enqueue(tasks)
+    print(f"[KOLEJKA] Dodano {added} nowych zadań ({len(tasks)} w przeglądzie). Stan: {queue.progress()}")
+    queue.close()
+
+def work_queue(path=QUEUE_DB, use_cache=True, telemetry=None):
+    cache = TrialCache(enabled=use_cache)
+    scenarios = {}  # Problem budowany raz na scenariusz w danym workerze
+
+    def handle(task):
+        n_sensors = task['n_sensors']
+        if n_sensors not in scenarios:
+            scenarios[n_sensors] = build_scenario(n_sensors)
+        problem, problem_dict = scenarios[n_sensors]
+        row, curves = run_trial(problem, problem_dict, n_sensors, task['algorithm'], task['trial_id'],
+                                epoch=task['epoch'], pop_size=task['pop_size'], cache=cache, telemetry=telemetry)
+        return {'row': row, 'curves': curves}
+
+    done = run_worker(path, handle, telemetry=telemetry)
+    print(f"[WORKER] Zakończono {done} zadań.")
+
+def collect_queue(path=QUEUE_DB):
+    queue = WorkQueue(path)
+    progress = queue.progress()
+    results = queue.results()
+    queue.close()
+    if progress['pending'] or progress['running'] or progress['failed']:
+        print(f"[UWAGA] Kolejka niekompletna: {progress}")
+
+    store = ConvergenceStore.create(CONVERGENCE_DIR, n_trials=len(results),
+                                    n_epochs=max([t['epoch'] for t, _ in results], default=EPOCH),
+                                    key_columns=['Scenario_Sensors', 'Algorithm', 'Trial_ID'])
+    with ResultsBuffer(RESULTS_CSV, RESULT_FIELDS) as results_db:
+        for task, result in results:
+            row = result['row']
+            store.record_curves(len(results_db), {'Scenario_Sensors': row['Scenario_Sensors'],
+                                                  'Algorithm': row['Algorithm'],
+                                                  'Trial_ID': row['Trial_ID']}, result['curves'])
+            results_db.append(**row)
+    store.flush()
+    print(f"[SUKCES] {len(results)} prób z kolejki -> {RESULTS_CSV}, {CONVERGENCE_DIR}")
+
 if __name__ == "__main__":
-    run_experiment()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Badanie skalowalności WBAN (lokalnie lub przez kolejkę SQLite).")
+    parser.add_argument('--queue', default=QUEUE_DB, help="Plik bazy kolejki (wspólny dysk)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--init', action='store_true', help="Rozwiń przegląd w zadania kolejki")
+    mode.add_argument('--worker', action='store_true', help="Wykonuj zadania z kolejki do jej opróżnienia")
+    mode.add_argument('--collect', action='store_true', help="Złóż wyniki z kolejki w CSV")
+    parser.add_argument('--no-cache', action='store_true', help="Licz wszystkie próby od nowa (bez WBAN_Cache)")
+    parser.add_argument('--telemetry', nargs='?', const=TELEMETRY_FILE, default=None,
+                        help="Telemetria JSON-lines: plik lub udp://host:port (podgląd: monitor_telemetry.py)")
+    parser.add_argument('--islands', type=int, default=0,
+                        help="Model wyspowy: liczba wysp na próbę (0 = pojedyncza populacja; tylko tryb lokalny)")
+    parser.add_argument('--topology', choices=TOPOLOGIES, default='ring', help="Topologia migracji wysp")
+    args = parser.parse_args()
+    if args.islands and (args.init or args.worker or args.collect):
+        parser.error("--islands działa tylko w trybie lokalnym (bez kolejki)")
+
+    with Telemetry(args.telemetry) as telemetry:
+        if args.init:
+            init_queue(args.queue)
+        elif args.worker:
+            work_queue(args.queue, use_cache=not args.no_cache, telemetry=telemetry)
+        elif args.collect:
+            collect_queue(args.queue)
+        else:
+            run_experiment(use_cache=not args.no_cache, telemetry=telemetry, islands=args.islands,
+                           topology=args.topology)
@@ -1,13 +1,14 @@
 import numpy as np
-import pandas as pd
-import time
-from mealpy import FloatVar
-# TYLKO 3 ALGORYTMY (Bez DE)
-from mealpy.evolutionary_based import GA
-from mealpy.swarm_based import PSO, GWO
+import argparse
 
-from src.fitness import WBANOptimizationProblem, FIXED_SENSORS
-from src.body_model import BodyModel
+from src.fitness import WBANOptimizationProblem
+from src.scenarios import get_sensor_placement
+from src.convergence import ConvergenceStore
+from src.optimizers import build_problem_dict
+from src.racing import expand_grid, race, trial_cost
+from src.results_buffer import ResultsBuffer
+from src.trial_cache import TrialCache, cached_solve
+from src.telemetry import Telemetry, TELEMETRY_FILE
 
 # ==============================================================================
 # 1. KONFIGURACJA PACZEK (ZASOBÓW)
@@ -22,75 +23,179 @@ CONFIG_PACKS = {
 SCENARIO_SENSORS = 15
 N_RELAYS = 2
 N_TRIALS = 30
+CONVERGENCE_DIR = "WBAN_Convergence/sensitivity"
+RESULTS_CSV = "WBAN_Sensitivity_Results.csv"
 
-ALGORITHMS = {
-    'GA':  GA.BaseGA,
-    'PSO': PSO.OriginalPSO,
-    'GWO': GWO.OriginalGWO
-}
+# Kolumny wyników (bufor strukturalny, patrz src/results_buffer.py)
+RESULT_FIELDS = [
+    ('Config_Pack', 'U48'),
+    ('Algorithm', 'U8'),
+    ('Fitness_Cost', 'f8'),
+    ('Execution_Time_s', 'f8'),
+    ('Is_Success', '?')
+]
 
-# ==============================================================================
-# 2. GENERATOR
-# ==============================================================================
-def get_sensor_placement(n_sensors, seed=42):
-    np.random.seed(seed) 
-    sensors = []
-    base = [s.copy() for s in FIXED_SENSORS[:min(len(FIXED_SENSORS), n_sensors)]]
-    sensors.extend(base)
-    while len(sensors) < n_sensors:
-        pos = BodyModel.get_random_valid_position()
-        sensors.append({'name': f'S_{len(sensors)}', 'pos': pos, 'data_rate': 100})
-    return sensors
+# TYLKO 3 ALGORYTMY (Bez DE), ładowane leniwie z src/optimizers.py
+ALGORITHMS = ['GA', 'PSO', 'GWO']
+
+# Tryb racing: siatka hiperparametrów w tym samym budżecie CPU. 3 x 3 (z paczkami CONFIG_PACKS)
+# x 5 zestawów parametrów = 45 konfiguracji; pierwsza runda (MIN_TRIALS = 3) to ~37% budżetu,
+# reszta idzie na successive halving (symulacja: zwycięzca kończy z ~24 próbami).
+RACING_GRID = {
+    'epoch':    [15, 50, 100],
+    'pop_size': [10, 30, 50]
+}
+# Pusty słownik = domyślne parametry mealpy (GA: pc=0.95, pm=0.025; PSO: c1=c2=2.05, w=0.4),
+# czyli dokładnie ustawienia paczek CONFIG_PACKS - te konfiguracje dostają nazwy paczek
+RACING_ALGO_PARAMS = {
+    'GA':  [{}, {'pc': 0.85, 'pm': 0.1}],
+    'PSO': [{}, {'c1': 1.5, 'c2': 1.5, 'w': 0.7}],
+    'GWO': [{}]
+}
+RACING_TRACE_CSV = "WBAN_Sensitivity_Racing_Trace.csv"
 
 # ==============================================================================
-# 3. SILNIK TESTOWY
+# 2. SILNIK TESTOWY
 # ==============================================================================
-def run_sensitivity_study():
+def run_sensitivity_study(use_cache=True, telemetry=None):
     print("============================================================")
     print("   ANALIZA WRAŻLIWOŚCI (SENSITIVITY) - GOLD MASTER")
     print("============================================================")
     
     fixed_sensors = get_sensor_placement(SCENARIO_SENSORS, seed=SCENARIO_SENSORS)
-    results_db = []
+    results_db = ResultsBuffer(RESULTS_CSV, RESULT_FIELDS)
+    # Ziarno = nr próby jak w run_research_study.py: B_Standard dzieli wyniki z 15 sensorami
+    cache = TrialCache(enabled=use_cache)
+    n_total = len(CONFIG_PACKS) * len(ALGORITHMS) * N_TRIALS
+    max_epoch = max(p['epoch'] for p in CONFIG_PACKS.values())
+    store = ConvergenceStore.create(CONVERGENCE_DIR, n_trials=n_total, n_epochs=max_epoch,
+                                    key_columns=['Config_Pack', 'Algorithm', 'Trial_ID'])
 
     for pack_name, params in CONFIG_PACKS.items():
         print(f"\n>>> PACZKA: {pack_name} {params}")
         
         problem = WBANOptimizationProblem(n_relays=N_RELAYS, custom_sensors=fixed_sensors)
-        problem_dict = {
-            "obj_func": problem.fitness_function,
-            "bounds": FloatVar(lb=problem.lb, ub=problem.ub),
-            "minmax": "min",
-            "log_to": None
-        }
+        problem_dict = build_problem_dict(problem)
 
-        for algo_name, algo_class in ALGORITHMS.items():
+        for algo_name in ALGORITHMS:
             print(f"   [{algo_name}] ... ", end="", flush=True)
             
             for i in range(N_TRIALS):
-                model = algo_class(epoch=params['epoch'], pop_size=params['pop_size'])
+                res = cached_solve(problem, algo_name, dict(params), seed=i + 1, cache=cache,
+                                   problem_dict=problem_dict, telemetry=telemetry,
+                                   trial=f"{pack_name}/{algo_name}/{i + 1}")
                 
-                t0 = time.time()
-                res = model.solve(problem_dict)
-                t_exec = time.time() - t0
+                store.record_curves(len(results_db), {'Config_Pack': pack_name, 'Algorithm': algo_name,
+                                                      'Trial_ID': i + 1}, res['curves'])
                 
                 # Zapisujemy wynik
                 # Fitness < 100 uznajemy za sukces (brak kary 1000)
-                is_success = res.target.fitness < 100.0
+                is_success = res['fitness'] < 100.0
                 
-                results_db.append({
-                    'Config_Pack': pack_name,
-                    'Algorithm': algo_name,
-                    'Fitness_Cost': res.target.fitness,
-                    'Execution_Time_s': t_exec,
-                    'Is_Success': is_success
-                })
+                results_db.append(
+                    Config_Pack=pack_name,
+                    Algorithm=algo_name,
+                    Fitness_Cost=res['fitness'],
+                    Execution_Time_s=res['time_s'],
+                    Is_Success=is_success
+                )
             print("Gotowe")
 
-    # Zapis
-    df = pd.DataFrame(results_db)
-    df.to_csv("WBAN_Sensitivity_Results.csv", index=False)
-    print("\n[SUKCES] Dane zapisano do: WBAN_Sensitivity_Results.csv")
+    # Zapis (ostatni kawałek bufora)
+    results_db.close()
+    store.flush()
+    print(f"\n[CACHE] Trafienia: {cache.hits}, nowe próby: {cache.misses}")
+    print(f"[SUKCES] Dane zapisano do: {RESULTS_CSV}")
+    print(f"[SUKCES] Krzywe zbieżności zapisano do: {CONVERGENCE_DIR}")
+
+# ==============================================================================
+# 3. TRYB RACING (ADAPTACYJNY PRZYDZIAŁ PRÓB)
+# ==============================================================================
+def fixed_design_budget():
+    """Budżet (wywołania funkcji celu) zużywany przez klasyczne 30 prób na paczkę."""
+    return sum(p['epoch'] * p['pop_size'] for p in CONFIG_PACKS.values()) * len(ALGORITHMS) * N_TRIALS
+
+def pack_label(config):
+    """Konfiguracje z CONFIG_PACKS zachowują nazwy paczek (zgodność z wykresami)."""
+    for pack_name, params in CONFIG_PACKS.items():
+        if not config['params'] and params == {'epoch': config['epoch'], 'pop_size': config['pop_size']}:
+            return pack_name
+    return config['name']
+
+def check_pack_labels(configs):
+    """Każdy algorytm musi mieć w siatce wszystkie paczki CONFIG_PACKS (Fig6 wybiera wiersze po nazwach)."""
+    for algo in ALGORITHMS:
+        labels = {pack_label(c) for c in configs if c['algorithm'] == algo}
+        missing = set(CONFIG_PACKS) - labels
+        if missing:
+            raise ValueError(f"Siatka racing nie zawiera paczek {sorted(missing)} dla {algo}")
+
+def run_racing_study(budget=None, use_cache=True, telemetry=None):
+    budget = budget or fixed_design_budget()
+    configs = expand_grid(ALGORITHMS, RACING_GRID['epoch'], RACING_GRID['pop_size'], RACING_ALGO_PARAMS)
+    check_pack_labels(configs)
+
+    print("============================================================")
+    print("   ANALIZA WRAŻLIWOŚCI - TRYB RACING (SUCCESSIVE HALVING)")
+    print(f"   Konfiguracji: {len(configs)}, budżet: {budget} wywołań funkcji celu")
+    print("============================================================")
+
+    fixed_sensors = get_sensor_placement(SCENARIO_SENSORS, seed=SCENARIO_SENSORS)
+    problem = WBANOptimizationProblem(n_relays=N_RELAYS, custom_sensors=fixed_sensors)
+    problem_dict = build_problem_dict(problem)
+
+    max_rows = budget // min(trial_cost(c) for c in configs)
+    store = ConvergenceStore.create(CONVERGENCE_DIR, n_trials=max_rows, n_epochs=max(RACING_GRID['epoch']),
+                                    key_columns=['Config_Pack', 'Algorithm', 'Trial_ID'])
+    results_db = ResultsBuffer(RESULTS_CSV, RESULT_FIELDS)
+    cache = TrialCache(enabled=use_cache)
+
+    def run_trial(config, trial_idx):
+        hyperparams = dict(epoch=config['epoch'], pop_size=config['pop_size'], **config['params'])
+        res = cached_solve(problem, config['algorithm'], hyperparams, seed=trial_idx + 1, cache=cache,
+                           problem_dict=problem_dict, telemetry=telemetry,
+                           trial=f"{config['algorithm']}/{config['name']}/{trial_idx + 1}")
+
+        label = pack_label(config)
+        store.record_curves(len(results_db), {'Config_Pack': label, 'Algorithm': config['algorithm'],
+                                               'Trial_ID': trial_idx + 1}, res['curves'])
+        row = {
+            'Config_Pack': label,
+            'Algorithm': config['algorithm'],
+            'Fitness_Cost': res['fitness'],
+            'Execution_Time_s': res['time_s'],
+            'Is_Success': res['fitness'] < 100.0
+        }
+        results_db.append(**row)
+        return row
+
+    _, trace = race(configs, run_trial, budget, max_trials=N_TRIALS)
+
+    import pandas as pd
+    results_db.close()
+    pd.DataFrame(trace).to_csv(RACING_TRACE_CSV, index=False)
+    store.flush()
+
+    final = [t for t in trace if t['Rung'] == trace[-1]['Rung'] and t['Status'] == 'alive']
+    print(f"\n[RACING] Wykonano {len(results_db)} prób w {trace[-1]['Rung'] + 1} rundach "
+          f"(z cache: {cache.hits}).")
+    for t in final:
+        print(f"   Najlepsza: {t['Algorithm']} {t['Config_Pack']} (mediana {t['Median_Fitness']:.4f}, {t['Trials']} prób)")
+    print(f"[SUKCES] Dane zapisano do: {RESULTS_CSV}")
+    print(f"[SUKCES] Ślad alokacji zapisano do: {RACING_TRACE_CSV}")
 
 if __name__ == "__main__":
-    run_sensitivity_study()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analiza wrażliwości na zasoby obliczeniowe.")
+    parser.add_argument('--racing', action='store_true', help="Adaptacyjny przydział prób (successive halving)")
+    parser.add_argument('--budget', type=int, default=None,
+                        help="Budżet racing w wywołaniach funkcji celu (domyślnie jak 30 prób/paczkę)")
+    parser.add_argument('--no-cache', action='store_true', help="Licz wszystkie próby od nowa (bez WBAN_Cache)")
+    parser.add_argument('--telemetry', nargs='?', const=TELEMETRY_FILE, default=None,
+                        help="Telemetria JSON-lines: plik lub udp://host:port (podgląd: monitor_telemetry.py)")
+    args = parser.parse_args()
+
+    with Telemetry(args.telemetry) as telemetry:
+        if args.racing:
+            run_racing_study(args.budget, use_cache=not args.no_cache, telemetry=telemetry)
+        else:
+            run_sensitivity_study(use_cache=not args.no_cache, telemetry=telemetry)
\ No newline at end of file
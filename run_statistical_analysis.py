@@ -0,0 +1,49 @@
+import argparse
+import time
+
+from src.analysis import analyze_experiment, summarize, N_BOOTSTRAP
+
+# ==============================================================================
+# 1. KONFIGURACJA
+# ==============================================================================
+EXPERIMENT_CSV = "WBAN_Experiment_Results.csv"
+SENSITIVITY_CSV = "WBAN_Sensitivity_Results.csv"
+
+SUMMARY_CSV = "WBAN_Statistics_Summary.csv"              # Średnie, mediany, CI, skuteczność
+TESTS_CSV = "WBAN_Statistics_Tests.csv"                  # Kruskal-Wallis + Mann-Whitney (Holm)
+SENSITIVITY_SUMMARY_CSV = "WBAN_Sensitivity_Summary.csv" # Skuteczność paczek z CI
+
+# ==============================================================================
+# 2. ANALIZA
+# ==============================================================================
+def run_analysis(n_boot=N_BOOTSTRAP, seed=0):
+    import os
+    import pandas as pd
+
+    print("============================================================")
+    print("   ANALIZA STATYSTYCZNA WYNIKÓW (BOOTSTRAP + TESTY)")
+    print("============================================================")
+
+    t0 = time.time()
+    df_exp = pd.read_csv(EXPERIMENT_CSV)
+    summary, tests = analyze_experiment(df_exp, n_boot=n_boot, seed=seed)
+    summary.to_csv(SUMMARY_CSV, index=False)
+    tests.to_csv(TESTS_CSV, index=False)
+    print(f"[SUKCES] {len(df_exp)} prób -> {SUMMARY_CSV} ({len(summary)} wierszy), {TESTS_CSV} ({len(tests)} testów)")
+
+    if os.path.exists(SENSITIVITY_CSV):
+        df_sens = pd.read_csv(SENSITIVITY_CSV)
+        sens_summary = summarize(df_sens, metrics=['Fitness_Cost', 'Execution_Time_s'],
+                                 group_cols=['Config_Pack', 'Algorithm'], n_boot=n_boot, seed=seed)
+        sens_summary.to_csv(SENSITIVITY_SUMMARY_CSV, index=False)
+        print(f"[SUKCES] {len(df_sens)} prób -> {SENSITIVITY_SUMMARY_CSV}")
+
+    print(f"Czas analizy: {time.time() - t0:.1f} s")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Przedziały bootstrap, skuteczność i testy dla wyników.")
+    parser.add_argument('--n-boot', type=int, default=N_BOOTSTRAP, help="Liczba replikacji bootstrap")
+    parser.add_argument('--seed', type=int, default=0, help="Ziarno losowania bootstrap")
+    args = parser.parse_args()
+
+    run_analysis(args.n_boot, args.seed)
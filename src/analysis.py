@@ -0,0 +1,267 @@
+import itertools
+import numpy as np
+
+# ==================================================================================
+# ANALIZA STATYSTYCZNA WYNIKÓW (WEKTOROWO)
+# Wszystkie grupy (scenariusz x algorytm) trafiają do jednej macierzy (G, N)
+# dopełnionej NaN; bootstrap, współczynniki sukcesu i testy liczymy operacjami
+# tablicowymi na całej macierzy, zamiast pętli po grupach.
+#   - metryki fizyczne: tylko próby udane (Fitness < SUCCESS_THRESHOLD, bez kary),
+#   - skuteczność: odsetek prób udanych + przedział Wilsona,
+#   - testy: Kruskal-Wallis (wszystkie algorytmy) i Mann-Whitney (pary, Holm) - próby niezależne
+#     (to samo ziarno Trial_ID nie paruje prób różnych algorytmów).
+# ==================================================================================
+
+SUCCESS_THRESHOLD = 100.0   # Fitness < 100 = brak kary
+N_BOOTSTRAP = 2000          # Liczba replikacji bootstrap
+CONFIDENCE = 0.95           # Poziom ufności przedziałów
+MAX_BOOT_ELEMENTS = 20_000_000  # Limit elementów (B x N) w jednym kawałku bootstrapu
+
+EXPERIMENT_METRICS = ['Energy_Total_J', 'Avg_Delay_s', 'Min_Link_Margin_dB', 'Execution_Time_s',
+                      'Lifetime_Days', 'Fitness_Cost']
+GROUP_COLUMNS = ['Scenario_Sensors', 'Algorithm']
+
+
+def group_matrix(df, group_cols, value_col):
+    """
+    Grupuje kolumnę `value_col` do macierzy (G, N_max) dopełnionej NaN.
+    Zwraca (klucze grup jako DataFrame, macierz).
+    """
+    grouped = df.groupby(group_cols, sort=True)
+    g = grouped.ngroup().to_numpy()
+    pos = grouped.cumcount().to_numpy()
+    keys = grouped.size().reset_index()[group_cols]
+
+    values = np.full((len(keys), int(pos.max()) + 1 if len(pos) else 0), np.nan)
+    values[g, pos] = df[value_col].to_numpy(dtype=float)
+    return keys, values
+
+
+def bootstrap_ci(values, n_boot=N_BOOTSTRAP, confidence=CONFIDENCE, stat='mean', rng=None):
+    """
+    Przedział ufności percentylowy dla każdego wiersza (G, N) z NaN (pomijane).
+    Średnia: replikacja = x @ liczności_losowania / n, czyli jedno mnożenie macierzy
+    dla wszystkich grup o tej samej liczbie prób. Mediana: losowanie indeksów wsadowo.
+    Zwraca (low, high) o kształcie (G,).
+    """
+    rng = np.random.default_rng(rng)
+    values = np.asarray(values, dtype=float)
+    # Wartości niepuste przesuwamy na początek wiersza, n_g = ich liczba
+    order = np.argsort(np.isnan(values), axis=1, kind='stable')
+    packed = np.nan_to_num(np.take_along_axis(values, order, axis=1))
+    counts = np.sum(~np.isnan(values), axis=1)
+    n_groups, width = packed.shape
+
+    estimates = np.full((n_groups, n_boot), np.nan)
+    chunk = max(1, MAX_BOOT_ELEMENTS // max(1, width))
+    for n in np.unique(counts[counts > 0]):
+        rows = np.nonzero(counts == n)[0]
+        for start in range(0, n_boot, chunk):
+            b = min(chunk, n_boot - start)
+            draws = rng.integers(0, n, size=(b, n))
+            if stat == 'median':
+                estimates[rows, start:start + b] = np.median(packed[rows][:, draws], axis=2)
+                continue
+            # Liczności wylosowania każdej próby w każdej replikacji (b, n)
+            weights = np.bincount((draws + (np.arange(b) * n)[:, None]).ravel(), minlength=b * n)
+            estimates[rows, start:start + b] = packed[rows, :n] @ weights.reshape(b, n).T / n
+
+    tail = (1 - confidence) / 2 * 100
+    with _quiet():
+        low, high = np.nanpercentile(estimates, [tail, 100 - tail], axis=1)
+    return low, high
+
+
+def wilson_interval(successes, trials, confidence=CONFIDENCE):
+    """Przedział Wilsona dla odsetka sukcesów (wektorowo)."""
+    from scipy.stats import norm
+
+    z = norm.ppf(1 - (1 - confidence) / 2)
+    n = np.asarray(trials, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        p = np.asarray(successes, dtype=float) / n
+        centre = (p + z * z / (2 * n)) / (1 + z * z / n)
+        half = z * np.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return centre - half, centre + half
+
+
+def summarize(df, metrics=EXPERIMENT_METRICS, group_cols=GROUP_COLUMNS, n_boot=N_BOOTSTRAP, seed=0):
+    """
+    Tabela "tidy": jeden wiersz na (grupa, metryka) z N, średnią, medianą, odchyleniem
+    i przedziałem bootstrap średniej, plus wiersz 'Success_Rate' (przedział Wilsona).
+    Metryki fizyczne liczone tylko dla prób udanych; brakujące kolumny są pomijane.
+    """
+    import pandas as pd
+
+    metrics = [m for m in metrics if m in df.columns]
+
+    success = df['Fitness_Cost'].to_numpy() < SUCCESS_THRESHOLD
+    keys, success_m = group_matrix(df.assign(_ok=success.astype(float)), group_cols, '_ok')
+    n_trials = np.sum(~np.isnan(success_m), axis=1)
+    n_ok = np.nansum(success_m, axis=1)
+
+    rows = []
+    low, high = wilson_interval(n_ok, n_trials)
+    rows.append(keys.assign(Metric='Success_Rate', N=n_trials, Mean=n_ok / n_trials,
+                            Median=np.nan, Std=np.nan, CI_Low=low, CI_High=high))
+
+    rng = np.random.default_rng(seed)
+    feasible = df[success]
+    for metric in metrics:
+        source = df if metric == 'Fitness_Cost' else feasible
+        _, values = group_matrix(source.reindex(columns=group_cols + [metric]), group_cols, metric)
+        values = _align(keys, source, group_cols, values)
+        low, high = bootstrap_ci(values, n_boot=n_boot, rng=rng)
+        with np.errstate(all='ignore'), _quiet():
+            rows.append(keys.assign(Metric=metric, N=np.sum(~np.isnan(values), axis=1),
+                                    Mean=np.nanmean(values, axis=1), Median=np.nanmedian(values, axis=1),
+                                    Std=np.nanstd(values, axis=1, ddof=1), CI_Low=low, CI_High=high))
+    return pd.concat(rows, ignore_index=True)
+
+
+def group_tests(df, metric, block_col='Scenario_Sensors', treatment_col='Algorithm'):
+    """
+    Testy w każdym bloku (scenariuszu) na próbach niezależnych: Kruskal-Wallis dla wszystkich
+    algorytmów i Mann-Whitney dla każdej pary (korekta Holma w bloku). Próby różnych algorytmów
+    z tym samym Trial_ID (ziarnem) nie są sparowane - każdy algorytm zużywa generator inaczej,
+    więc testy sparowane (Friedman/Wilcoxon) nie mają tu podstaw.
+    Bloki liczone wsadowo (oś 0), bez pętli po scenariuszach.
+    """
+    import pandas as pd
+    from scipy.stats import chi2, mannwhitneyu, rankdata
+
+    df = df.dropna(subset=[metric])
+    treatments = sorted(df[treatment_col].unique())
+    block_keys = np.unique(df[block_col])
+    k = len(treatments)
+    # (B, N_max, K) dopełnione NaN - wszystkie scenariusze naraz
+    b_idx = np.searchsorted(block_keys, df[block_col].to_numpy())
+    t_idx = np.searchsorted(treatments, df[treatment_col].to_numpy())
+    pos = df.groupby([block_col, treatment_col]).cumcount().to_numpy()
+    data = np.full((len(block_keys), int(pos.max()) + 1 if len(pos) else 0, k), np.nan)
+    data[b_idx, pos, t_idx] = df[metric].to_numpy(dtype=float)
+    n_j = np.sum(~np.isnan(data), axis=1)
+    n = np.sum(n_j, axis=1)
+
+    # Kruskal-Wallis z korektą na remisy: rangi w obrębie całego bloku
+    pooled = data.reshape(len(block_keys), -1)
+    ranks = rankdata(pooled, axis=1, nan_policy='omit').reshape(data.shape)
+    rank_sums = np.nansum(ranks, axis=1)
+    ties = _tie_term(pooled[:, None, :])[:, 0]
+    with np.errstate(all='ignore'):
+        stat = 12.0 / (n * (n + 1)) * np.sum(np.where(n_j > 0, rank_sums ** 2 / n_j, 0), axis=1) - 3 * (n + 1)
+        stat = stat / (1 - ties / (n ** 3 - n))
+    stat = np.where(np.isfinite(stat), stat, 0.0)
+    groups = np.sum(n_j > 0, axis=1)
+    p_kruskal = np.where((n > groups) & (groups > 1), chi2.sf(stat, np.maximum(groups - 1, 1)), np.nan)
+
+    rows = [pd.DataFrame({block_col: block_keys, 'Metric': metric, 'Test': 'Kruskal-Wallis', 'A': 'all',
+                          'B': 'all', 'N': n, 'Statistic': stat, 'P_Value': p_kruskal, 'P_Holm': p_kruskal})]
+
+    pairs = list(itertools.combinations(range(k), 2))
+    p_pairs = np.full((len(block_keys), len(pairs)), np.nan)
+    s_pairs = np.full_like(p_pairs, np.nan)
+    for j, (a, b) in enumerate(pairs):
+        with _quiet():
+            res = mannwhitneyu(data[:, :, a], data[:, :, b], axis=1, nan_policy='omit')
+        p_pairs[:, j] = res.pvalue
+        s_pairs[:, j] = res.statistic
+
+    p_holm = holm_adjust(np.where(np.isnan(p_pairs), 1.0, p_pairs))
+    for j, (a, b) in enumerate(pairs):
+        rows.append(pd.DataFrame({block_col: block_keys, 'Metric': metric, 'Test': 'Mann-Whitney',
+                                  'A': treatments[a], 'B': treatments[b], 'N': n_j[:, a] + n_j[:, b],
+                                  'Statistic': s_pairs[:, j], 'P_Value': p_pairs[:, j],
+                                  'P_Holm': np.where(np.isnan(p_pairs[:, j]), np.nan, p_holm[:, j])}))
+    return pd.concat(rows, ignore_index=True)
+
+
+def holm_adjust(p_values):
+    """Korekta Holma-Bonferroniego wzdłuż ostatniej osi (wektorowo)."""
+    p = np.asarray(p_values, dtype=float)
+    m = p.shape[-1]
+    order = np.argsort(p, axis=-1)
+    sorted_p = np.take_along_axis(p, order, axis=-1) * (m - np.arange(m))
+    adjusted = np.minimum(np.maximum.accumulate(sorted_p, axis=-1), 1.0)
+    out = np.empty_like(adjusted)
+    np.put_along_axis(out, order, adjusted, axis=-1)
+    return out
+
+
+def analyze_experiment(df, metrics=EXPERIMENT_METRICS, n_boot=N_BOOTSTRAP, seed=0):
+    """Pełna analiza wyników badania: (tabela podsumowania, tabela testów)."""
+    summary = summarize(df, metrics=metrics, n_boot=n_boot, seed=seed)
+    # Testy na Fitness_Cost (kary wliczone - porównanie "jak algorytm radzi sobie naprawdę")
+    tests = group_tests(df, 'Fitness_Cost')
+    return summary, tests
+
+
+def _align(keys, source, group_cols, values):
+    """Dopasowuje wiersze macierzy z podzbioru danych do pełnej listy grup `keys`."""
+    present = source.groupby(group_cols, sort=True).size().reset_index()[group_cols]
+    if len(present) == len(keys):
+        return values
+    full = np.full((len(keys), values.shape[1]), np.nan)
+    lookup = {tuple(r): i for i, r in enumerate(keys.itertuples(index=False, name=None))}
+    for i, r in enumerate(present.itertuples(index=False, name=None)):
+        full[lookup[tuple(r)]] = values[i]
+    return full
+
+
+def _tie_term(data):
+    """Suma (t^3 - t) po grupach remisów w każdym wierszu (B, T, K) - korekta rang na remisy (NaN pomijane)."""
+    sorted_d = np.sort(data, axis=2)
+    k = data.shape[2]
+    total = np.zeros(data.shape[:2])
+    run = np.ones(data.shape[:2])
+    for j in range(1, k):
+        same = sorted_d[:, :, j] == sorted_d[:, :, j - 1]
+        total += np.where(same, 0, run ** 3 - run)
+        run = np.where(same, run + 1, 1)
+    return total + run ** 3 - run
+
+
+class _quiet:
+    """Wycisza ostrzeżenia numpy/scipy dla pustych grup i prób bez różnic."""
+    def __enter__(self):
+        import warnings
+        self._ctx = warnings.catch_warnings()
+        self._ctx.__enter__()
+        warnings.simplefilter('ignore')
+
+    def __exit__(self, *exc):
+        return self._ctx.__exit__(*exc)
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import time
+    import pandas as pd
+    from scipy.stats import kruskal
+
+    rng = np.random.default_rng(0)
+    n_sc, n_alg, n_tr = 20, 3, 2000   # 120 000 prób
+    df = pd.DataFrame({
+        'Scenario_Sensors': np.repeat(np.arange(n_sc), n_alg * n_tr),
+        'Algorithm': np.tile(np.repeat(['GA', 'PSO', 'GWO'], n_tr), n_sc),
+        'Trial_ID': np.tile(np.arange(n_tr), n_sc * n_alg),
+    })
+    shift = df['Algorithm'].map({'GA': 0.3, 'PSO': 0.0, 'GWO': 0.0}).to_numpy()
+    df['Fitness_Cost'] = np.where(rng.random(len(df)) < 0.05, 800.0, 5 + shift + rng.normal(0, 1, len(df)))
+    df['Energy_Total_J'] = 0.01 + 0.001 * rng.normal(size=len(df))
+
+    t0 = time.perf_counter()
+    summary, tests = analyze_experiment(df, metrics=['Energy_Total_J', 'Fitness_Cost'])
+    dt = time.perf_counter() - t0
+
+    # Kontrola z scipy dla jednego scenariusza
+    block = df[df['Scenario_Sensors'] == 0]
+    ref = kruskal(*[g['Fitness_Cost'] for _, g in block.groupby('Algorithm')]).statistic
+    ours = tests[(tests['Test'] == 'Kruskal-Wallis') & (tests['Scenario_Sensors'] == 0)]['Statistic'].iloc[0]
+    ga_pso = tests[(tests['Test'] == 'Mann-Whitney') & (tests['A'] == 'GA') & (tests['B'] == 'GWO')]['P_Holm']
+
+    print(summary.head(4).to_string())
+    print(f"{len(df)} prób, {len(summary)} wierszy podsumowania, {len(tests)} testów w {dt:.2f} s")
+    print(f"Kruskal-Wallis: nasz {ours:.4f}, scipy {ref:.4f}")
+    if dt < 10 and np.isclose(ours, ref) and np.all(ga_pso < 0.05):
+        print(">> SUKCES: Analiza wektorowa zgodna ze scipy i szybka dla 100k+ prób.")
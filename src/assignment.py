@@ -0,0 +1,96 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+# ==================================================================================
+# PRZYPISANIE SENSOR -> RELAY Z LIMITAMI POJEMNOŚCI (ALGORYTM WĘGIERSKI)
+# Każdy relay rozwijamy w `max_sensors` identycznych "slotów", a łącze direct
+# w S slotów (bez limitu). Przypisanie o minimalnym koszcie [J/s] na macierzy
+# S x (S + R*max_sensors) jest wtedy dokładnym rozwiązaniem problemu z limitem
+# liczby sensorów na relay. Limit przepływności (pakiety/s) domykamy naprawą:
+# z przeciążonego relaya zdejmujemy sensory o najmniejszej stracie.
+# ==================================================================================
+
+INFEASIBLE_COST = 1e6  # Koszt slotu, którego nie wolno wybrać (skończony dla solvera)
+
+
+def assign_capacitated(e_direct, e_relay, data_rates, max_sensors, max_data_rate):
+    """
+    e_direct (S,)   - energia/pakiet łącza direct
+    e_relay  (S, R) - energia/pakiet drogi przez relay (hop1 + hop2)
+    data_rates (S,) - pakiety/s każdego sensora
+    Zwraca tablicę (S,): -1 = direct, k = relay k.
+    """
+    n_sensors, n_relays = e_relay.shape
+    cost_direct = e_direct * data_rates
+    cost_relay = e_relay * data_rates[:, None]
+
+    # Relay, który nie jest tańszy od direct lub sam sensor przekracza limit relaya -> zakazany
+    forbidden = (e_relay >= e_direct[:, None]) | (data_rates[:, None] > max_data_rate)
+    cost_relay = np.where(forbidden, INFEASIBLE_COST, cost_relay)
+
+    slots = int(min(max_sensors, n_sensors))
+    cost = np.empty((n_sensors, n_sensors + n_relays * slots))
+    cost[:, :n_sensors] = cost_direct[:, None]
+    cost[:, n_sensors:] = np.repeat(cost_relay, slots, axis=1)
+
+    rows, cols = linear_sum_assignment(cost)
+    assignment = np.full(n_sensors, -1, dtype=np.int64)
+    relay_cols = cols >= n_sensors
+    assignment[rows[relay_cols]] = (cols[relay_cols] - n_sensors) // slots
+    assignment[cost[rows, cols] >= INFEASIBLE_COST] = -1
+
+    return _repair_data_rate(assignment, cost_direct, cost_relay, data_rates, max_sensors, max_data_rate)
+
+
+def _repair_data_rate(assignment, cost_direct, cost_relay, data_rates, max_sensors, max_data_rate):
+    """
+    Zdejmuje sensory z relayów przekraczających limit pakietów/s.
+    Przeniesiony sensor trafia do najtańszego relaya z wolnym miejscem albo na direct.
+    """
+    n_relays = cost_relay.shape[1]
+    load = np.bincount(assignment[assignment >= 0], weights=data_rates[assignment >= 0], minlength=n_relays)
+    count = np.bincount(assignment[assignment >= 0], minlength=n_relays)
+
+    for r in np.nonzero(load > max_data_rate)[0]:
+        members = np.nonzero(assignment == r)[0]
+        # Najpierw zdejmujemy sensory, których przeniesienie na direct kosztuje najmniej
+        members = members[np.argsort(cost_direct[members] - cost_relay[members, r])]
+        for s in members:
+            if load[r] <= max_data_rate:
+                break
+            assignment[s] = -1
+            load[r] -= data_rates[s]
+            count[r] -= 1
+
+            fits = (count < max_sensors) & (load + data_rates[s] <= max_data_rate)
+            fits[r] = False
+            options = np.where(fits & (cost_relay[s] < cost_direct[s]), cost_relay[s], np.inf)
+            k = int(np.argmin(options))
+            if np.isfinite(options[k]):
+                assignment[s] = k
+                load[k] += data_rates[s]
+                count[k] += 1
+    return assignment
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(0)
+    S, R = 20, 3
+    e_direct = rng.uniform(2e-5, 3e-5, S)
+    e_relay = rng.uniform(1e-5, 2.5e-5, (S, R))
+    rates = rng.choice([10, 100, 500], S).astype(float)
+
+    t0 = time.perf_counter()
+    for _ in range(1000):
+        a = assign_capacitated(e_direct, e_relay, rates, max_sensors=4, max_data_rate=333.0)
+    dt = (time.perf_counter() - t0) / 1000
+
+    counts = np.bincount(a[a >= 0], minlength=R)
+    loads = np.bincount(a[a >= 0], weights=rates[a >= 0], minlength=R)
+    print(f"Przypisanie: {a}")
+    print(f"Sensory/relay: {counts}, pakiety/s na relay: {loads}, czas: {dt*1e6:.0f} us")
+    if np.all(counts <= 4) and np.all(loads <= 333.0) and dt < 1e-3:
+        print(">> SUKCES: Limity pojemności spełnione w < 1 ms.")
@@ -58,6 +58,20 @@ class BodyModel:
         
         return None, None # Punkt poza dozwolonym obszarem (np. w powietrzu)
 
+    @staticmethod
+    def get_zone_indices(points):
+        """
+        Wektorowy odpowiednik get_zone_info dla tablicy punktów (..., 2).
+        Zwraca indeks strefy w kolejności ALLOWED_ZONES (pierwsza pasująca)
+        lub -1 dla punktów poza ciałem.
+        """
+        points = np.asarray(points, dtype=float)
+        bounds = np.array([data['bounds'] for data in ALLOWED_ZONES.values()])
+        x, y = points[..., 0, None], points[..., 1, None]
+        inside = (bounds[:, 0] <= x) & (x <= bounds[:, 1]) & (bounds[:, 2] <= y) & (y <= bounds[:, 3])
+        # argmax zwraca pierwszą pasującą strefę (jak pętla w get_zone_info)
+        return np.where(inside.any(axis=-1), np.argmax(inside, axis=-1), -1)
+
     @staticmethod
     def is_valid_position(x, y):
         """Czy punkt jest poprawny?"""
@@ -65,10 +79,15 @@ class BodyModel:
         return zone is not None
 
     @staticmethod
-    def get_random_valid_position():
+    def get_random_valid_position(rng=None):
         """
         Losuje poprawny punkt na ciele (do inicjalizacji populacji GA/PSO).
+        Jeśli podano `rng` (numpy.random.Generator), losowanie jest powtarzalne
+        i ważone polem stref - patrz get_random_valid_positions.
         """
+        if rng is not None:
+            return BodyModel.get_random_valid_positions(1, rng)[0]
+
         # 1. Wylosuj strefę (np. Ręka, Noga, Plecy)
         zone_name = random.choice(list(ALLOWED_ZONES.keys()))
         data = ALLOWED_ZONES[zone_name]
@@ -79,6 +98,28 @@ class BodyModel:
         y = random.uniform(b[2], b[3])
         return np.array([x, y])
 
+    @staticmethod
+    def get_zone_areas():
+        """Pola stref [cm^2] w kolejności ALLOWED_ZONES."""
+        bounds = np.array([data['bounds'] for data in ALLOWED_ZONES.values()])
+        return (bounds[:, 1] - bounds[:, 0]) * (bounds[:, 3] - bounds[:, 2])
+
+    @staticmethod
+    def get_random_valid_positions(n, rng):
+        """
+        Wektorowo losuje n poprawnych punktów (tablica n x 2).
+        Strefa wybierana z prawdopodobieństwem proporcjonalnym do jej pola,
+        więc punkty są rozłożone równomiernie po całej powierzchni ciała.
+        """
+        bounds = np.array([data['bounds'] for data in ALLOWED_ZONES.values()])
+        areas = BodyModel.get_zone_areas()
+        zone_idx = rng.choice(len(bounds), size=n, p=areas / areas.sum())
+        b = bounds[zone_idx]
+        u = rng.random((n, 2))
+        x = b[:, 0] + u[:, 0] * (b[:, 1] - b[:, 0])
+        y = b[:, 2] + u[:, 1] * (b[:, 3] - b[:, 2])
+        return np.column_stack([x, y])
+
     @staticmethod
     def get_hub_position():
         """Zwraca domyślną pozycję Huba (Pępek/Pas)"""
@@ -0,0 +1,151 @@
+import csv
+import os
+import numpy as np
+
+# ==================================================================================
+# MAGAZYN KRZYWYCH ZBIEŻNOŚCI (KOLUMNOWY, MEMORY-MAPPED .npy)
+# Każde pole to osobna macierz float32 o kształcie (n_prób, n_epok).
+# Wiersz = jedna próba, kolumna = epoka. Krótsze przebiegi dopełniamy NaN.
+# Klucze prób (scenariusz, algorytm, nr próby...) trzymamy w index.csv.
+# ==================================================================================
+
+CONVERGENCE_FIELDS = ('global_best', 'current_best', 'diversity', 'n_evals')
+INDEX_FILE = 'index.csv'
+
+
+def attach_eval_counter(model):
+    """
+    Podpina licznik wywołań funkcji celu do modelu mealpy.
+    Zwraca listę, do której po każdej epoce trafia skumulowane `nfe_counter`.
+    """
+    counts = []
+    original_step = model.track_optimize_step
+
+    def track_optimize_step(pop=None, epoch=None, runtime=None):
+        original_step(pop, epoch, runtime)
+        counts.append(model.nfe_counter)
+
+    model.track_optimize_step = track_optimize_step
+    return counts
+
+
+def history_curves(model, eval_counts=None):
+    """Krzywe zbieżności modelu mealpy jako słownik list (serializowalny do JSON)."""
+    history = model.history
+    return {
+        'global_best': [float(v) for v in history.list_global_best_fit],
+        'current_best': [float(v) for v in history.list_current_best_fit],
+        'diversity': [float(v) for v in history.list_diversity],
+        'n_evals': [float(v) for v in (eval_counts or [])]
+    }
+
+
+class ConvergenceStore:
+    """
+    Zapis/odczyt przebiegów zbieżności wszystkich prób eksperymentu.
+    """
+
+    def __init__(self, directory, arrays, index, mode):
+        self.directory = directory
+        self.arrays = arrays
+        self.index = index
+        self.mode = mode
+
+    @classmethod
+    def create(cls, directory, n_trials, n_epochs, key_columns):
+        """Prealokuje pliki .npy (wypełnione NaN) dla n_trials prób po n_epochs epok."""
+        os.makedirs(directory, exist_ok=True)
+        arrays = {}
+        for field in CONVERGENCE_FIELDS:
+            path = os.path.join(directory, f"{field}.npy")
+            arr = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32,
+                                            shape=(n_trials, n_epochs))
+            arr[:] = np.nan
+            arrays[field] = arr
+        index = {'columns': ['Row'] + list(key_columns) + ['Epochs'], 'rows': []}
+        return cls(directory, arrays, index, mode='w')
+
+    @classmethod
+    def open(cls, directory):
+        """Otwiera istniejący magazyn tylko do odczytu (bez kopiowania danych)."""
+        arrays = {}
+        for field in CONVERGENCE_FIELDS:
+            path = os.path.join(directory, f"{field}.npy")
+            arrays[field] = np.load(path, mmap_mode='r')
+        with open(os.path.join(directory, INDEX_FILE), newline='') as f:
+            reader = csv.reader(f)
+            columns = next(reader)
+            rows = [row for row in reader]
+        return cls(directory, arrays, {'columns': columns, 'rows': rows}, mode='r')
+
+    @property
+    def n_trials(self):
+        return self.arrays['global_best'].shape[0]
+
+    def record(self, row, key, model, eval_counts=None):
+        """
+        Zapisuje historię jednej próby (model mealpy po `solve`) do wiersza `row`.
+        `key` to słownik wartości kolumn kluczowych (np. scenariusz, algorytm).
+        """
+        self.record_curves(row, key, history_curves(model, eval_counts))
+
+    def record_curves(self, row, key, curves):
+        """Jak `record`, ale z gotowych list (np. wyniki przysłane przez workera kolejki)."""
+        n = min(len(curves['global_best']), self.arrays['global_best'].shape[1])
+        for field in CONVERGENCE_FIELDS:
+            values = curves.get(field)
+            if values is not None and len(values):
+                self.arrays[field][row, :n] = np.asarray(values, dtype=float)[:n]
+
+        key_values = [key[c] for c in self.index['columns'][1:-1]]
+        self.index['rows'].append([row] + key_values + [n])
+
+    def flush(self):
+        """Zrzuca memmapy na dysk i zapisuje index.csv."""
+        for arr in self.arrays.values():
+            arr.flush()
+        with open(os.path.join(self.directory, INDEX_FILE), 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(self.index['columns'])
+            writer.writerows(self.index['rows'])
+
+    def select(self, **filters):
+        """
+        Zwraca numery wierszy, których klucze pasują do filtrów,
+        np. store.select(Algorithm='GWO', Scenario_Sensors=20).
+        """
+        columns = self.index['columns']
+        positions = {name: columns.index(name) for name in filters}
+        rows = []
+        for entry in self.index['rows']:
+            if all(str(entry[positions[k]]) == str(v) for k, v in filters.items()):
+                rows.append(int(entry[0]))
+        return np.array(rows, dtype=np.int64)
+
+    def curves(self, field='global_best', **filters):
+        """Macierz (n_wybranych_prób, n_epok) dla danego pola."""
+        return np.asarray(self.arrays[field][self.select(**filters)])
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import tempfile
+
+    class _History:
+        list_global_best_fit = [3.0, 2.0, 1.0]
+        list_current_best_fit = [3.0, 2.5, 1.0]
+        list_diversity = [0.9, 0.5, 0.1]
+
+    class _Model:
+        history = _History()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ConvergenceStore.create(tmp, n_trials=2, n_epochs=4, key_columns=['Algorithm'])
+        store.record(0, {'Algorithm': 'PSO'}, _Model(), eval_counts=[30, 60, 90])
+        store.flush()
+
+        loaded = ConvergenceStore.open(tmp)
+        curve = loaded.curves('global_best', Algorithm='PSO')
+        print(f"Wczytano {loaded.n_trials} wierszy, krzywa PSO: {curve[0]}")
+        if curve[0, 2] == 1.0 and np.isnan(curve[0, 3]):
+            print(">> SUKCES: Magazyn zbieżności działa.")
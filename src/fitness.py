@@ -1,6 +1,7 @@
 import numpy as np
-from src.physics import WBANPhysics
-from src.body_model import BodyModel, LANDMARKS
+from src.physics import WBANPhysics, IEEE_802_15_6_PARAMS, RX_SENSITIVITY, BIT_RATE, PL_D0_DB, PACKET_SIZE_BITS
+from src.body_model import BodyModel, LANDMARKS, ALLOWED_ZONES
+from src import multihop, mac, geodesic
 
 # ==================================================================================
 # DEFINICJA PROBLEMU OPTYMALIZACYJNEGO (WIELOKRYTERIALNA)
@@ -8,28 +9,32 @@ from src.body_model import BodyModel, LANDMARKS
 
 # 1. Definicja stałych elementów sieci
 FIXED_SENSORS = [
-    {'name': 'ECG_Monitor',  'pos': LANDMARKS['CHEST'],   'data_rate': 500}, 
-    {'name': 'Activity_L',   'pos': LANDMARKS['WRIST_L'], 'data_rate': 100}, 
-    {'name': 'Activity_Leg', 'pos': LANDMARKS['ANKLE_L'], 'data_rate': 100}, 
-    {'name': 'Temp_Sensor',  'pos': LANDMARKS['BACK'],    'data_rate': 10}   
+    {'name': 'ECG_Monitor',  'pos': LANDMARKS['CHEST'],   'data_rate': 500},
+    {'name': 'Activity_L',   'pos': LANDMARKS['WRIST_L'], 'data_rate': 100},
+    {'name': 'Activity_Leg', 'pos': LANDMARKS['ANKLE_L'], 'data_rate': 100},
+    {'name': 'Temp_Sensor',  'pos': LANDMARKS['BACK'],    'data_rate': 10}
 ]
 
 HUB_POS = LANDMARKS['NAVEL']
 
 # Kary
-PENALTY_OFF_BODY = 1000.0      
+PENALTY_OFF_BODY = 1000.0
 PENALTY_DISCONNECTED = 500.0
 PENALTY_OVERLAP = 800.0
 
 # Minimalny odstęp między urządzeniami (cm)
-MIN_DISTANCE_CM = 10.0 
+MIN_DISTANCE_CM = 10.0
+
+# Opóźnienia (model stały): czas nadania pakietu 1500 b @ 1 Mbps + obsługa w relayu
+HOP_DELAY_S = PACKET_SIZE_BITS / BIT_RATE
+RELAY_PROCESSING_DELAY_S = 0.005
 
 # Wagi
 WEIGHTS = {
     'energy': 0.6,
-    'delay': 0.1,       
+    'delay': 0.1,
     'quality': 0.2,
-    'load': 0.1         
+    'load': 0.1
 }
 
 # Kalibracja normalizacji
@@ -40,21 +45,120 @@ NORM_FACTORS = {
     'load': 1.0
 }
 
+# Tryby routingu:
+#   'greedy'      - każdy sensor osobno wybiera tańszą drogę (direct lub 1 relay)
+#   'capacitated' - wspólne przypisanie sensor -> relay z limitami pojemności relayów
+#   'multihop'    - najkrótsze (energetycznie) drogi po grafie sensory + relaye + hub
+ROUTING_MODES = ('greedy', 'capacitated', 'multihop')
+
+# Modele opóźnienia:
+#   'constant'     - stały czas hopu + obsługa w relayu (model pierwotny)
+#   'tdma'/'csma'  - kolejki MAC IEEE 802.15.6 zależne od obciążenia (src/mac.py)
+DELAY_MODELS = ('constant',) + mac.MAC_MODELS
+
+# Modele odległości:
+#   'euclidean' - prosta na rozłożonej mapie 2D (model pierwotny)
+#   'geodesic'  - droga po powierzchni ciała (prekomputowane pole, src/geodesic.py)
+DISTANCE_MODELS = ('euclidean', 'geodesic')
+
+# Pojemność relaya: relay odbiera i ponownie nadaje każdy pakiet,
+# więc jego radio (BIT_RATE) mieści co najwyżej BIT_RATE / (2 * pakiet) pakietów/s.
+RELAY_CAPACITY = {
+    'max_sensors': 4,
+    'max_data_rate': BIT_RATE / (2 * PACKET_SIZE_BITS)
+}
+
+# Zapas względny promienia zasięgu (odporność na zaokrąglenia przy przycinaniu par)
+REACH_TOLERANCE = 1e-9
+
+# Wykładnik n dla każdej strefy (kolejność ALLOWED_ZONES) + 'General' na końcu,
+# dzięki czemu indeks -1 (poza ciałem) trafia w 'General'.
+ZONE_EXPONENTS = np.array([WBANPhysics.get_path_loss_params(data['type'])['n']
+                           for data in ALLOWED_ZONES.values()] + [IEEE_802_15_6_PARAMS['General']['n']])
+
+# Tablice niezależne od relayów (wynik _precompute_static) - można je podać gotowe
+# (static=...), np. jako widoki pamięci współdzielonej w procesach roboczych
+STATIC_FIELDS = ('sensor_pos', 'data_rates', 'sensor_n', 'e_direct', 'margin_direct', 'reach_cm')
+
 class WBANOptimizationProblem:
-    
-    def __init__(self, n_relays=2, custom_sensors=None):
+
+    def __init__(self, n_relays=2, custom_sensors=None, routing='greedy', relay_capacity=None, pruning=False,
+                 delay_model='constant', hub_pos=None, distance_model='euclidean', static=None):
         self.n_relays = n_relays
         self.problem_size = 2 * n_relays
         self.lb = [0.0] * self.problem_size
         self.ub = [100.0, 180.0] * n_relays
         self.minmax = "min"
         self.log_to = None
-        
+
         if custom_sensors is not None:
             self.sensors = custom_sensors
         else:
             self.sensors = FIXED_SENSORS
 
+        if routing not in ROUTING_MODES:
+            raise ValueError(f"Nieznany tryb routingu: {routing} (dostępne: {ROUTING_MODES})")
+        self.routing = routing
+        self.relay_capacity = dict(RELAY_CAPACITY, **(relay_capacity or {}))
+        if delay_model not in DELAY_MODELS:
+            raise ValueError(f"Nieznany model opóźnienia: {delay_model} (dostępne: {DELAY_MODELS})")
+        self.delay_model = delay_model
+        # Przycinanie par sensor x relay poza zasięgiem opłacalności (KD-drzewo)
+        self.pruning = pruning
+        if distance_model not in DISTANCE_MODELS:
+            raise ValueError(f"Nieznany model odległości: {distance_model} (dostępne: {DISTANCE_MODELS})")
+        # Przycinanie zakłada kule euklidesowe, a droga po ciele bywa krótsza niż na mapie (zawinięcie tułowia)
+        if pruning and distance_model != 'euclidean':
+            raise ValueError("Przycinanie par (pruning) działa tylko z modelem odległości 'euclidean'")
+        self.distance_model = distance_model
+        self._geodesic = geodesic.get_field() if distance_model == 'geodesic' else None
+        # Położenie huba: domyślnie HUB_POS (w trybie wspólnej optymalizacji - zmienna decyzyjna)
+        self.hub_pos = np.array(HUB_POS if hub_pos is None else hub_pos, dtype=float)
+
+        if static is None:
+            self._precompute_static()
+        else:
+            # Lista sensorów jest wtedy zbędna (tablice są źródłem prawdy)
+            self.sensors = custom_sensors
+            for name in STATIC_FIELDS:
+                setattr(self, name, static[name])
+
+    def _precompute_static(self):
+        """
+        Dane niezależne od położenia relayów liczymy raz:
+        pozycje i wykładniki sensorów oraz pełne parametry łączy direct.
+        """
+        self.sensor_pos = np.array([s['pos'] for s in self.sensors], dtype=float)
+        self.data_rates = np.array([s['data_rate'] for s in self.sensors], dtype=float)
+
+        # Jak w pierwotnej pętli: typ brany jako s_zone[1] (znak nazwy strefy),
+        # co dla każdego sensora daje parametry 'General'.
+        sensor_n = []
+        for s_pos in self.sensor_pos:
+            s_zone, _ = BodyModel.get_zone_info(s_pos[0], s_pos[1])
+            sensor_n.append(WBANPhysics.get_path_loss_params(s_zone[1] if s_zone else 'General')['n'])
+        self.sensor_n = np.array(sensor_n)
+
+        dist_dir = self.distance_matrix_m(self.sensor_pos, self.hub_pos[None, :])[:, 0]
+        pl_dir = WBANPhysics.path_loss_dB_array(dist_dir, self.sensor_n)
+        self.e_direct = WBANPhysics.energy_from_path_loss(pl_dir, PACKET_SIZE_BITS)
+        self.margin_direct = np.maximum(0, -RX_SENSITIVITY - pl_dir)
+
+        # Zasięg opłacalności [cm]: relay dalej niż reach_cm od sensora nigdy nie wygra z direct,
+        # bo już sam hop1 + najtańszy możliwy hop2 (moc TX_POWER_MIN) kosztuje >= e_direct.
+        # Energia rośnie monotonicznie z odległością, więc próg wynika z odwrócenia modelu.
+        e_floor = WBANPhysics.energy_from_path_loss(PL_D0_DB, PACKET_SIZE_BITS)
+        reach_m = np.minimum(WBANPhysics.max_distance_for_energy_m(self.e_direct - e_floor, self.sensor_n,
+                                                                   PACKET_SIZE_BITS),
+                             WBANPhysics.max_range_m(self.sensor_n))
+        self.reach_cm = 100.0 * reach_m * (1 + REACH_TOLERANCE)
+
+    def distance_matrix_m(self, points_a, points_b):
+        """Macierz odległości [m] w wybranym modelu odległości (kształty jak WBANPhysics.distance_matrix_m)."""
+        if self._geodesic is not None:
+            return self._geodesic.distance_matrix_m(points_a, points_b)
+        return WBANPhysics.distance_matrix_m(points_a, points_b)
+
     def decode_solution(self, solution_vector):
         relays = []
         for i in range(0, len(solution_vector), 2):
@@ -72,188 +176,307 @@ class WBANOptimizationProblem:
                 dist = np.linalg.norm(relays[i] - relays[j])
                 if dist < MIN_DISTANCE_CM:
                     return True # Kolizja między relayami
-        
+
         # 2. Sprawdź Relay <-> Fixed Sensor
         for r_pos in relays:
-            for s in self.sensors:
-                s_pos = np.array(s['pos'])
-                dist = np.linalg.norm(r_pos - s_pos)
-                if dist < MIN_DISTANCE_CM:
-                    return True # Kolizja z sensorem medycznym
-            
+            dist = np.sqrt(np.min(np.sum((self.sensor_pos - r_pos) ** 2, axis=1)))
+            if dist < MIN_DISTANCE_CM:
+                return True # Kolizja z sensorem medycznym
+
             # 3. Sprawdź Relay <-> Hub
-            dist_hub = np.linalg.norm(r_pos - np.array(HUB_POS))
+            dist_hub = np.linalg.norm(r_pos - self.hub_pos)
             if dist_hub < MIN_DISTANCE_CM:
                 return True # Kolizja z Hubem
-                
+
         return False
 
+    def is_feasible(self, relays):
+        """Czy wszystkie relaye leżą na ciele i nie kolidują?"""
+        on_body = all(BodyModel.is_valid_position(r[0], r[1]) for r in relays)
+        return on_body and not self.check_overlap(relays)
+
+    # ------------------------------------------------------------------
+    # RDZEŃ WEKTOROWY: tablice linków -> routing -> metryki
+    # Wszystkie metody przyjmują relaye (R, 2) lub całą populację (P, R, 2).
+    # ------------------------------------------------------------------
+
+    def link_tables(self, relays):
+        """
+        Parametry wszystkich łączy dla danego położenia relayów:
+        e_hop1/margin_hop1 (..., S, R) sensor -> relay, e_hop2/margin_hop2 (..., R) relay -> hub.
+        """
+        relays = np.asarray(relays, dtype=float)
+        relay_n = ZONE_EXPONENTS[BodyModel.get_zone_indices(relays)]
+
+        if self.pruning and relays.ndim == 2:
+            e_hop1, margin_hop1 = self._pruned_hop1(relays)
+        else:
+            dist_h1 = self.distance_matrix_m(self.sensor_pos, relays)
+            pl_h1 = WBANPhysics.path_loss_dB_array(dist_h1, self.sensor_n[:, None])
+            e_hop1 = WBANPhysics.energy_from_path_loss(pl_h1, PACKET_SIZE_BITS)
+            margin_hop1 = np.maximum(0, -RX_SENSITIVITY - pl_h1)
+
+        dist_h2 = self.distance_matrix_m(relays, self.hub_pos[None, :])[..., 0]
+        pl_h2 = WBANPhysics.path_loss_dB_array(dist_h2, relay_n)
+
+        return {
+            'relay_n': relay_n,
+            'e_hop1': e_hop1,
+            'margin_hop1': margin_hop1,
+            'e_hop2': WBANPhysics.energy_from_path_loss(pl_h2, PACKET_SIZE_BITS),
+            'margin_hop2': np.maximum(0, -RX_SENSITIVITY - pl_h2)
+        }
+
+    def candidate_pairs(self, relays):
+        """
+        Pary (sensor, relay) w zasięgu opłacalności: zapytanie kulowe KD-drzewa relayów
+        z promieniem reach_cm każdego sensora. Koszt rośnie z liczbą sąsiadów, nie z S x R.
+        """
+        from scipy.spatial import cKDTree
+
+        active = np.nonzero(self.reach_cm > 0)[0]
+        if len(active) == 0 or len(relays) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        neighbours = cKDTree(relays).query_ball_point(self.sensor_pos[active], self.reach_cm[active])
+        counts = np.fromiter((len(n) for n in neighbours), dtype=np.int64, count=len(active))
+        if counts.sum() == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        return np.repeat(active, counts), np.concatenate([n for n in neighbours if n]).astype(np.int64)
+
+    def _pruned_hop1(self, relays):
+        """Tablice hop1 liczone tylko dla par-kandydatów; pozostałe: energia inf, margines 0."""
+        e_hop1 = np.full((len(self.sensor_pos), len(relays)), np.inf)
+        margin_hop1 = np.zeros_like(e_hop1)
+
+        s_idx, r_idx = self.candidate_pairs(relays)
+        if len(s_idx):
+            diff = self.sensor_pos[s_idx] - relays[r_idx]
+            dist = np.maximum(np.sqrt(np.sum(diff * diff, axis=-1)) / 100.0, 0.01)
+            pl = WBANPhysics.path_loss_dB_array(dist, self.sensor_n[s_idx])
+            e_hop1[s_idx, r_idx] = WBANPhysics.energy_from_path_loss(pl, PACKET_SIZE_BITS)
+            margin_hop1[s_idx, r_idx] = np.maximum(0, -RX_SENSITIVITY - pl)
+        return e_hop1, margin_hop1
+
+    def route(self, tables):
+        """
+        Przypisanie sensorów (..., S): -1 = direct, k = przez relay k.
+        'capacitated' liczy assign_capacitated osobno dla każdego rozwiązania (pętla Pythona,
+        koszt liniowy w P - znacznie wolniej niż wektorowy 'greedy' dla dużych populacji).
+        """
+        e_relay = tables['e_hop1'] + tables['e_hop2'][..., None, :]
+
+        if self.routing == 'capacitated':
+            from src.assignment import assign_capacitated
+            flat = e_relay.reshape(-1, *e_relay.shape[-2:])
+            assignment = [assign_capacitated(self.e_direct, e, self.data_rates,
+                                             self.relay_capacity['max_sensors'],
+                                             self.relay_capacity['max_data_rate']) for e in flat]
+            return np.array(assignment, dtype=int).reshape(e_relay.shape[:-1])
+
+        # 'greedy': najtańszy relay (pierwszy przy remisie), jeśli tańszy niż direct
+        best = np.argmin(e_relay, axis=-1)
+        best_energy = np.take_along_axis(e_relay, best[..., None], axis=-1)[..., 0]
+        return np.where(best_energy < self.e_direct, best, -1)
+
+    def network_metrics(self, tables, assignment):
+        """Energia [J/s], opóźnienie [s] i margines [dB] każdego sensora dla przypisania."""
+        via = assignment >= 0
+        r = np.where(via, assignment, 0)
+
+        e_hop1 = np.take_along_axis(tables['e_hop1'], r[..., None], axis=-1)[..., 0]
+        e_hop2 = np.take_along_axis(tables['e_hop2'], r, axis=-1)
+        m_hop1 = np.take_along_axis(tables['margin_hop1'], r[..., None], axis=-1)[..., 0]
+        m_hop2 = np.take_along_axis(tables['margin_hop2'], r, axis=-1)
+
+        energy = np.where(via, e_hop1 + e_hop2, self.e_direct)
+        if self.delay_model == 'constant':
+            delay = np.where(via, 2 * HOP_DELAY_S + RELAY_PROCESSING_DELAY_S, HOP_DELAY_S)
+        else:
+            # Obciążenie nadajników: sensory - własny ruch, relaye - suma przypisanych sensorów
+            relay_load = np.sum(np.where(assignment[..., None] == np.arange(self.n_relays),
+                                         self.data_rates[:, None], 0.0), axis=-2)
+            loads = np.concatenate([np.broadcast_to(self.data_rates, relay_load.shape[:-1] + self.data_rates.shape),
+                                    relay_load], axis=-1)
+            hop = mac.hop_delays(loads, self.delay_model)
+            n_s = len(self.data_rates)
+            relay_hop = np.take_along_axis(hop[..., n_s:], r, axis=-1)
+            delay = hop[..., :n_s] + np.where(via, RELAY_PROCESSING_DELAY_S + relay_hop, 0.0)
+        margin = np.where(via, np.minimum(m_hop1, m_hop2), self.margin_direct)
+        return {
+            'energy': energy * self.data_rates,
+            'delay': delay,
+            'margin': margin,
+            'relay_usage': np.sum(assignment[..., None] == np.arange(self.n_relays), axis=-2)
+        }
+
+    def multihop_routes(self, relays, tables):
+        """
+        Routing 'multihop': graf [sensory, relaye, hub], najkrótsze drogi do huba
+        dla wszystkich sensorów (i całej populacji) naraz.
+        Zwraca (next_hop (..., MAX_HOPS, N) - tablice poziomów skoków, metryki jak w network_metrics).
+        """
+        relays = np.asarray(relays, dtype=float)
+        n_s, n_r = self.sensor_pos.shape[-2], relays.shape[-2]
+        lead = relays.shape[:-2]
+        sink = n_s + n_r
+
+        node_pos = np.concatenate([np.broadcast_to(self.sensor_pos, lead + (n_s, 2)), relays,
+                                   np.broadcast_to(self.hub_pos, lead + (1, 2))], axis=-2)
+        node_n = np.concatenate([np.broadcast_to(self.sensor_n, lead + (n_s,)), tables['relay_n'],
+                                 np.broadcast_to(ZONE_EXPONENTS[-1], lead + (1,))], axis=-1)
+        forwarders = np.ones(sink + 1, dtype=bool)
+        forwarders[:n_s] = multihop.SENSOR_FORWARDING
+
+        W, M = multihop.build_energy_graph(node_pos, node_n, sink, PACKET_SIZE_BITS, forwarders,
+                                           distance=self.distance_matrix_m)
+        cost, next_hop = multihop.shortest_paths_to_sink(W, sink, multihop.MAX_HOPS)
+        hops, margin, visits = multihop.walk_paths(next_hop, M, np.arange(n_s), sink, multihop.MAX_HOPS)
+
+        if self.delay_model == 'constant':
+            delay = hops * HOP_DELAY_S + (hops - 1) * RELAY_PROCESSING_DELAY_S
+        else:
+            # Węzeł przekazujący nadaje własny ruch + ruch wszystkich dróg przez niego
+            forwarded = np.einsum('s,...sn->...n', self.data_rates, visits[..., :sink].astype(float))
+            loads = forwarded + np.concatenate([self.data_rates, np.zeros(n_r)])
+            hop = mac.hop_delays(loads, self.delay_model)
+            delay = hop[..., :n_s] + np.einsum('...sn,...n->...s', visits[..., :sink].astype(float),
+                                               hop + RELAY_PROCESSING_DELAY_S)
+
+        metrics = {
+            'energy': cost[..., :n_s] * self.data_rates,
+            'delay': delay,
+            'margin': margin,
+            'relay_usage': np.sum(visits[..., n_s:sink], axis=-2)
+        }
+        return next_hop, metrics
+
+    def evaluate_relays(self, relays):
+        """
+        Pełna symulacja sieci dla poprawnego (na ciele, bez kolizji) rozwiązania.
+        Zwraca (trasy, metryki); trasy to przypisanie (S,) lub next_hop (MAX_HOPS, N) dla 'multihop'.
+        """
+        tables = self.link_tables(relays)
+        if self.routing == 'multihop':
+            return self.multihop_routes(relays, tables)
+        assignment = self.route(tables)
+        return assignment, self.network_metrics(tables, assignment)
+
+    def objective(self, metrics):
+        """Ważona funkcja celu z metryk (działa też dla metryk całej populacji)."""
+        total_energy_J = np.sum(metrics['energy'], axis=-1)
+        total_delay_s = np.sum(metrics['delay'], axis=-1)
+        min_link_margin_dB = np.minimum(100.0, np.min(metrics['margin'], axis=-1))
+        relay_usage = metrics['relay_usage']
+
+        f_energy = total_energy_J / NORM_FACTORS['energy']
+        f_delay = total_delay_s / NORM_FACTORS['delay']
+        f_quality = (100.0 - min_link_margin_dB) / NORM_FACTORS['quality']
+
+        # W trybie 'capacitated' obciążenie jest twardym ograniczeniem, a nie karą
+        f_load = 0.0
+        if self.routing != 'capacitated' and self.n_relays > 0:
+            f_load = np.where(np.sum(relay_usage, axis=-1) > 0,
+                              np.std(relay_usage, axis=-1) / NORM_FACTORS['load'], 0.0)
+
+        return (WEIGHTS['energy'] * f_energy +
+                WEIGHTS['delay']  * f_delay +
+                WEIGHTS['quality'] * f_quality +
+                WEIGHTS['load']   * f_load)
+
+    def penalties(self, relays):
+        """
+        Kary dla populacji relayów (P, R, 2): PENALTY_OFF_BODY, PENALTY_OVERLAP lub 0.
+        Wektorowy odpowiednik sprawdzeń z fitness_function.
+        """
+        relays = np.asarray(relays, dtype=float)
+        off_body = np.any(BodyModel.get_zone_indices(relays) < 0, axis=-1)
+
+        diff = relays[..., :, None, :] - relays[..., None, :, :]
+        dist_rr = np.sqrt(np.sum(diff * diff, axis=-1))
+        iu = np.triu_indices(relays.shape[-2], k=1)
+        overlap = np.any(dist_rr[..., iu[0], iu[1]] < MIN_DISTANCE_CM, axis=-1)
+
+        diff = relays[..., :, None, :] - self.sensor_pos
+        overlap |= np.any(np.sqrt(np.sum(diff * diff, axis=-1)) < MIN_DISTANCE_CM, axis=(-2, -1))
+        overlap |= np.any(np.linalg.norm(relays - self.hub_pos, axis=-1) < MIN_DISTANCE_CM, axis=-1)
+
+        return np.where(off_body, PENALTY_OFF_BODY, np.where(overlap, PENALTY_OVERLAP, 0.0))
+
+    def evaluate_population(self, population):
+        """
+        Wsadowa ocena całej populacji (P, 2R) w jednym przebiegu wektorowym.
+        Wynik zgodny z fitness_function wywołaną osobno dla każdego wiersza.
+        """
+        population = np.asarray(population, dtype=float)
+        relays = population.reshape(len(population), -1, 2)
+        fitness = self.penalties(relays)
+
+        ok = fitness == 0.0
+        if np.any(ok):
+            _, metrics = self.evaluate_relays(relays[ok])
+            fitness[ok] = self.objective(metrics)
+        return fitness
+
     def fitness_function(self, solution_vector):
         relays = self.decode_solution(solution_vector)
-        
+
         # --- 1. Sprawdzenie Ograniczeń (Constraints) ---
-        
+
         # A. Czy na ciele?
         for r_pos in relays:
             if not BodyModel.is_valid_position(r_pos[0], r_pos[1]):
                 return PENALTY_OFF_BODY
-        
+
         # B. Czy nie ma kolizji?
         if self.check_overlap(relays):
             return PENALTY_OVERLAP
 
         # --- 2. Symulacja Sieci ---
-        total_energy_J = 0.0
-        total_delay_s = 0.0
-        min_link_margin_dB = 100.0 
-        relay_usage = [0] * self.n_relays 
-        
-        for sensor in self.sensors:
-            s_pos = np.array(sensor['pos'])
-            s_zone, _ = BodyModel.get_zone_info(s_pos[0], s_pos[1])
-            
-            # Parametry Direct
-            dist_dir = WBANPhysics.calculate_distance_m(s_pos, np.array(HUB_POS))
-            pl_dir = WBANPhysics.calculate_path_loss_dB(dist_dir, s_zone[1] if s_zone else 'General')
-            margin_dir = max(0, 96.0 - pl_dir)
-            
-            e_direct = WBANPhysics.calculate_energy_consumption(s_pos, np.array(HUB_POS), location_type=s_zone[1] if s_zone else 'General')
-            d_direct = (1500 / 1_000_000)
-            
-            chosen_energy = e_direct
-            chosen_delay = d_direct
-            chosen_margin = margin_dir
-            chosen_relay_idx = -1 
-
-            for idx, r_pos in enumerate(relays):
-                # Hop 1
-                dist_h1 = WBANPhysics.calculate_distance_m(s_pos, r_pos)
-                pl_h1 = WBANPhysics.calculate_path_loss_dB(dist_h1, s_zone[1] if s_zone else 'General')
-                margin_h1 = max(0, 96.0 - pl_h1)
-                e_hop1 = WBANPhysics.calculate_energy_consumption(s_pos, r_pos, location_type=s_zone[1] if s_zone else 'General')
-                d_hop1 = (1500 / 1_000_000)
-
-                # Hop 2
-                r_zone, r_type = BodyModel.get_zone_info(r_pos[0], r_pos[1])
-                dist_h2 = WBANPhysics.calculate_distance_m(r_pos, np.array(HUB_POS))
-                pl_h2 = WBANPhysics.calculate_path_loss_dB(dist_h2, r_type if r_zone else 'General')
-                margin_h2 = max(0, 96.0 - pl_h2)
-                e_hop2 = WBANPhysics.calculate_energy_consumption(r_pos, np.array(HUB_POS), location_type=r_type if r_zone else 'General')
-                d_hop2 = (1500 / 1_000_000)
-
-                e_relay_total = e_hop1 + e_hop2
-                if e_relay_total < chosen_energy:
-                    chosen_energy = e_relay_total
-                    chosen_delay = d_hop1 + d_hop2 + 0.005
-                    chosen_margin = min(margin_h1, margin_h2)
-                    chosen_relay_idx = idx
-
-            total_energy_J += chosen_energy * sensor['data_rate']
-            total_delay_s += chosen_delay
-            if chosen_margin < min_link_margin_dB:
-                min_link_margin_dB = chosen_margin
-            
-            if chosen_relay_idx != -1:
-                relay_usage[chosen_relay_idx] += 1
-
-        f_energy = total_energy_J / NORM_FACTORS['energy']
-        f_delay = total_delay_s / NORM_FACTORS['delay']
-        f_quality = (100.0 - min_link_margin_dB) / NORM_FACTORS['quality']
-        
-        f_load = 0.0
-        if sum(relay_usage) > 0:
-            f_load = np.std(relay_usage) / NORM_FACTORS['load']
-
-        fitness = (WEIGHTS['energy'] * f_energy +
-                   WEIGHTS['delay']  * f_delay +
-                   WEIGHTS['quality'] * f_quality +
-                   WEIGHTS['load']   * f_load)
-                   
-        return fitness
+        _, metrics = self.evaluate_relays(relays)
+        return self.objective(metrics)
 
     def get_metrics_details(self, solution_vector):
         """
         Zwraca słownik z fizycznymi wartościami metryk dla danego rozwiązania.
         """
         relays = self.decode_solution(solution_vector)
-        
+
         # Sprawdź kary
-        if not all(BodyModel.is_valid_position(r[0], r[1]) for r in relays) or self.check_overlap(relays):
+        if not self.is_feasible(relays):
             return {'Energy': float('nan'), 'Delay': float('nan'), 'Quality': 0.0}
 
-        total_energy_J = 0.0
-        total_delay_s = 0.0
-        min_link_margin_dB = 100.0
-        
-        for sensor in self.sensors:
-            s_pos = np.array(sensor['pos'])
-            s_zone, _ = BodyModel.get_zone_info(s_pos[0], s_pos[1])
-            
-            # Direct
-            dist_dir = WBANPhysics.calculate_distance_m(s_pos, np.array(HUB_POS))
-            pl_dir = WBANPhysics.calculate_path_loss_dB(dist_dir, s_zone[1] if s_zone else 'General')
-            margin_dir = max(0, 96.0 - pl_dir)
-            e_direct = WBANPhysics.calculate_energy_consumption(s_pos, np.array(HUB_POS), location_type=s_zone[1] if s_zone else 'General')
-            d_direct = (1500 / 1_000_000)
-            
-            chosen_energy = e_direct
-            chosen_delay = d_direct
-            chosen_margin = margin_dir
-            
-            for idx, r_pos in enumerate(relays):
-                r_zone, r_type = BodyModel.get_zone_info(r_pos[0], r_pos[1])
-                
-                # Hop 1 & 2
-                dist_h1 = WBANPhysics.calculate_distance_m(s_pos, r_pos)
-                pl_h1 = WBANPhysics.calculate_path_loss_dB(dist_h1, s_zone[1] if s_zone else 'General')
-                margin_h1 = max(0, 96.0 - pl_h1)
-                e_hop1 = WBANPhysics.calculate_energy_consumption(s_pos, r_pos, location_type=s_zone[1] if s_zone else 'General')
-                
-                dist_h2 = WBANPhysics.calculate_distance_m(r_pos, np.array(HUB_POS))
-                pl_h2 = WBANPhysics.calculate_path_loss_dB(dist_h2, r_type if r_zone else 'General')
-                margin_h2 = max(0, 96.0 - pl_h2)
-                e_hop2 = WBANPhysics.calculate_energy_consumption(r_pos, np.array(HUB_POS), location_type=r_type if r_zone else 'General')
-                
-                e_total = e_hop1 + e_hop2
-                
-                if e_total < chosen_energy:
-                    chosen_energy = e_total
-                    chosen_delay = (1500 / 1_000_000) * 2 + 0.005
-                    chosen_margin = min(margin_h1, margin_h2)
-
-            total_energy_J += chosen_energy * sensor['data_rate']
-            total_delay_s += chosen_delay
-            if chosen_margin < min_link_margin_dB:
-                min_link_margin_dB = chosen_margin
-                
+        _, metrics = self.evaluate_relays(relays)
         return {
-            'Energy': total_energy_J,
-            'Delay': total_delay_s,
-            'Quality': min_link_margin_dB
+            'Energy': float(np.sum(metrics['energy'])),
+            'Delay': float(np.sum(metrics['delay'])),
+            'Quality': float(min(100.0, np.min(metrics['margin'])))
         }
-    
+
     def get_routing_details(self, solution_vector):
         """Metoda pomocnicza do wizualizacji"""
         relays = self.decode_solution(solution_vector)
+        routes, _ = self.evaluate_relays(relays)
         paths = []
-        for sensor in self.sensors:
-            s_pos = np.array(sensor['pos'])
-            s_zone, _ = BodyModel.get_zone_info(s_pos[0], s_pos[1])
-            e_direct = WBANPhysics.calculate_energy_consumption(s_pos, np.array(HUB_POS), location_type=s_zone[1] if s_zone else 'General')
-            best_energy = e_direct
-            chosen_path = {'from': s_pos, 'to': np.array(HUB_POS), 'type': 'Direct'}
-            for idx, r_pos in enumerate(relays):
-                e_hop1 = WBANPhysics.calculate_energy_consumption(s_pos, r_pos, location_type=s_zone[1] if s_zone else 'General')
-                r_zone, r_type = BodyModel.get_zone_info(r_pos[0], r_pos[1])
-                e_hop2 = WBANPhysics.calculate_energy_consumption(r_pos, np.array(HUB_POS), location_type=r_type if r_zone else 'General')
-                if (e_hop1 + e_hop2) < best_energy:
-                    best_energy = e_hop1 + e_hop2
-                    chosen_path = [
-                        {'from': s_pos, 'to': r_pos, 'type': 'Relay'},
-                        {'from': r_pos, 'to': np.array(HUB_POS), 'type': 'Relay'}
-                    ]
-            if isinstance(chosen_path, list):
-                paths.extend(chosen_path)
+
+        if self.routing == 'multihop':
+            nodes = list(self.sensor_pos) + relays + [self.hub_pos]
+            sink = len(nodes) - 1
+            for s_idx in range(len(self.sensor_pos)):
+                cur, level = s_idx, len(routes) - 1
+                hop_type = 'Direct' if routes[level, cur] == sink else 'Relay'
+                while cur != sink:
+                    nxt = routes[level, cur]
+                    paths.append({'from': nodes[cur], 'to': nodes[nxt], 'type': hop_type})
+                    cur, level = nxt, level - 1
+            return paths
+
+        for s_pos, r in zip(self.sensor_pos, routes):
+            if r < 0:
+                paths.append({'from': s_pos, 'to': self.hub_pos, 'type': 'Direct'})
             else:
-                paths.append(chosen_path)
-        return paths
\ No newline at end of file
+                paths.extend([
+                    {'from': s_pos, 'to': relays[r], 'type': 'Relay'},
+                    {'from': relays[r], 'to': self.hub_pos, 'type': 'Relay'}
+                ])
+        return paths
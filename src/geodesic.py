@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+from src.body_model import BodyModel, ALLOWED_ZONES
+
+# ==================================================================================
+# ODLEGŁOŚCI GEODEZYJNE PO POWIERZCHNI CIAŁA (PREKOMPUTOWANE POLE, MEMMAP)
+# Mapa 2D jest "rozłożonym" ciałem: strefy to prostokąty, a przestrzeń między
+# nimi nie jest skórą. Sygnał z pleców na klatkę idzie dookoła tułowia, więc
+# łączymy strefy SZWAMI (boki tułowia, bark, biodro) o szerokości z anatomii,
+# niezależnej od odstępów na mapie (lewy bok zawija plecy z powrotem na przód).
+# Strefy są wypukłe: wewnątrz strefy geodezyjna = odległość euklidesowa.
+# Między strefami: graf punktów brzegowych szwów (krawędzie w strefie = prosta,
+# przez szew = pas o szerokości `gap`), najkrótsze drogi Dijkstrą (scipy.csgraph),
+# a potem pole (komórki x komórki) na siatce GEODESIC_GRID_CM zapisane jako .npy
+# i otwierane przez mmap. Odczyt dla pary punktów = O(1) (zaokrąglenie do komórki,
+# błąd <= GEODESIC_GRID_CM / sqrt(2) na każdy koniec łącza).
+# ==================================================================================
+
+GEODESIC_GRID_CM = 2.0
+GEODESIC_CACHE_DIR = "WBAN_Geodesic"
+
+# Obwód tułowia: przód (25 cm) + plecy (25 cm) + dwa boki
+TORSO_CIRCUMFERENCE_CM = 90.0
+_front, _back = ALLOWED_ZONES['TORSO_FRONT']['bounds'], ALLOWED_ZONES['BACK_ZONE']['bounds']
+FLANK_CM = (TORSO_CIRCUMFERENCE_CM - (_front[1] - _front[0]) - (_back[1] - _back[0])) / 2
+
+# Szwy: (strefa A, krawędź A, strefa B, krawędź B, szerokość pasa skóry [cm])
+SEAMS = [
+    ('TORSO_FRONT', 'xmax', 'BACK_ZONE', 'xmin', FLANK_CM),  # prawy bok
+    ('TORSO_FRONT', 'xmin', 'BACK_ZONE', 'xmax', FLANK_CM),  # lewy bok (zawinięcie)
+    ('ARM_LEFT', 'xmax', 'TORSO_FRONT', 'xmin', 5.0),        # bark
+    ('TORSO_FRONT', 'ymax', 'LEG_LEFT', 'ymin', 20.0)        # biodro
+]
+
+ZONE_NAMES = list(ALLOWED_ZONES)
+_EDGE_AXIS = {'xmin': 0, 'xmax': 0, 'ymin': 1, 'ymax': 1}  # oś stałej współrzędnej krawędzi
+
+
+def zone_grid(spacing=GEODESIC_GRID_CM):
+    """Siatka komórek każdej strefy: (x0, y0, nx, ny, offset) w kolejności ALLOWED_ZONES."""
+    grid, offset = [], 0
+    for data in ALLOWED_ZONES.values():
+        x0, x1, y0, y1 = data['bounds']
+        nx, ny = int(np.floor((x1 - x0) / spacing)) + 1, int(np.floor((y1 - y0) / spacing)) + 1
+        grid.append((x0, y0, nx, ny, offset))
+        offset += nx * ny
+    return np.array(grid, dtype=float)
+
+
+def grid_cell_indices(points, grid, spacing=GEODESIC_GRID_CM):
+    """Indeks komórki siatki zone_grid (..., ) dla punktów (..., 2) i strefa punktu; -1 poza ciałem."""
+    points = np.asarray(points, dtype=float)
+    zone = BodyModel.get_zone_indices(points)
+    x0, y0, nx, ny, offset = np.moveaxis(grid[np.maximum(zone, 0)], -1, 0)
+    ix = np.clip(np.round((points[..., 0] - x0) / spacing), 0, nx - 1)
+    iy = np.clip(np.round((points[..., 1] - y0) / spacing), 0, ny - 1)
+    return np.where(zone >= 0, offset + ix * ny + iy, -1).astype(np.int64), zone
+
+
+def surface_cells(spacing=GEODESIC_GRID_CM):
+    """Środki komórek (N, 2) i indeks strefy każdej komórki (N,)."""
+    cells, zones = [], []
+    for z, (x0, y0, nx, ny, _) in enumerate(zone_grid(spacing)):
+        ix, iy = np.meshgrid(np.arange(int(nx)), np.arange(int(ny)), indexing='ij')
+        cells.append(np.column_stack([x0 + ix.ravel() * spacing, y0 + iy.ravel() * spacing]))
+        zones.append(np.full(int(nx * ny), z))
+    return np.vstack(cells), np.concatenate(zones)
+
+
+def _edge_points(zone, edge, spacing):
+    """Punkty próbkujące krawędź strefy i ich współrzędna wzdłuż krawędzi."""
+    x0, x1, y0, y1 = ALLOWED_ZONES[zone]['bounds']
+    axis = _EDGE_AXIS[edge]
+    fixed = {'xmin': x0, 'xmax': x1, 'ymin': y0, 'ymax': y1}[edge]
+    lo, hi = (y0, y1) if axis == 0 else (x0, x1)
+    along = np.linspace(lo, hi, int(np.ceil((hi - lo) / spacing)) + 1)
+    points = np.empty((len(along), 2))
+    points[:, axis], points[:, 1 - axis] = fixed, along
+    return points, along
+
+
+def boundary_graph(spacing=GEODESIC_GRID_CM):
+    """
+    Punkty brzegowe szwów (B, 2), ich strefy (B,) i macierz najkrótszych dróg (B, B) [cm].
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import dijkstra
+
+    points, zones, seam_edges = [], [], []
+    for zone_a, edge_a, zone_b, edge_b, gap in SEAMS:
+        pa, along_a = _edge_points(zone_a, edge_a, spacing)
+        pb, along_b = _edge_points(zone_b, edge_b, spacing)
+        ia = np.arange(len(pa)) + sum(len(p) for p in points)
+        ib = np.arange(len(pb)) + ia[-1] + 1
+        points += [pa, pb]
+        zones += [np.full(len(pa), ZONE_NAMES.index(zone_a)), np.full(len(pb), ZONE_NAMES.index(zone_b))]
+        # Pas skóry między krawędziami: szerokość `gap`, przesunięcie wzdłuż krawędzi
+        w = np.sqrt(gap ** 2 + (along_a[:, None] - along_b[None, :]) ** 2)
+        seam_edges.append((np.repeat(ia, len(ib)), np.tile(ib, len(ia)), w.ravel()))
+
+    points, zones = np.vstack(points), np.concatenate(zones)
+    diff = points[:, None, :] - points[None, :, :]
+    euclid = np.sqrt(np.sum(diff * diff, axis=-1))
+    same = (zones[:, None] == zones[None, :]) & ~np.eye(len(points), dtype=bool)
+    rows, cols = np.nonzero(same)
+
+    i = np.concatenate([rows] + [e[0] for e in seam_edges])
+    j = np.concatenate([cols] + [e[1] for e in seam_edges])
+    w = np.concatenate([euclid[rows, cols]] + [e[2] for e in seam_edges])
+    graph = coo_matrix((np.maximum(w, 1e-9), (i, j)), shape=(len(points),) * 2).tocsr()
+    return points, zones, dijkstra(graph, directed=False)
+
+
+def build_distance_field(spacing=GEODESIC_GRID_CM, chunk=64):
+    """Pole odległości geodezyjnych (N, N) [cm] float32 między komórkami powierzchni."""
+    cells, cell_zone = surface_cells(spacing)
+    nodes, node_zone, D = boundary_graph(spacing)
+
+    # Komórka -> punkt brzegowy tej samej strefy (prosta), inne strefy: brak drogi
+    diff = cells[:, None, :] - nodes[None, :, :]
+    C = np.where(cell_zone[:, None] == node_zone[None, :], np.sqrt(np.sum(diff * diff, axis=-1)), np.inf)
+    E = np.min(C[:, :, None] + D[None, :, :], axis=1)   # komórka -> dowolny punkt brzegowy
+
+    field = np.empty((len(cells), len(cells)), dtype=np.float32)
+    for start in range(0, len(cells), chunk):
+        stop = min(start + chunk, len(cells))
+        field[start:stop] = np.min(E[start:stop, None, :] + C[None, :, :], axis=-1)
+
+    same = cell_zone[:, None] == cell_zone[None, :]
+    diff = cells[:, None, :] - cells[None, :, :]
+    field[same] = np.sqrt(np.sum(diff * diff, axis=-1))[same]
+    return field
+
+
+def field_file_path(spacing=GEODESIC_GRID_CM, cache_dir=GEODESIC_CACHE_DIR):
+    """Nazwa pliku zawiera skrót geometrii - zmiana stref lub szwów wymusza przeliczenie."""
+    spec = json.dumps({'zones': ALLOWED_ZONES, 'seams': SEAMS, 'spacing': spacing}, sort_keys=True)
+    digest = hashlib.sha256(spec.encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"geodesic_{spacing:g}cm_{digest}.npy")
+
+
+def build_field_file(spacing=GEODESIC_GRID_CM, cache_dir=GEODESIC_CACHE_DIR):
+    """Ścieżka do pliku pola; liczy go tylko, jeśli nie istnieje (zapis tmp + os.replace)."""
+    path = field_file_path(spacing, cache_dir)
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, build_distance_field(spacing))
+        os.replace(tmp_path, path)
+    return path
+
+
+class GeodesicField:
+    """Pole odległości otwarte przez mmap + wektorowy odczyt dla par punktów."""
+
+    def __init__(self, path, spacing=GEODESIC_GRID_CM):
+        self.field = np.load(path, mmap_mode='r')
+        self.spacing = spacing
+        self.grid = zone_grid(spacing)
+
+    def cell_indices(self, points):
+        """Indeks komórki (..., ) dla punktów (..., 2); -1 poza ciałem."""
+        return grid_cell_indices(points, self.grid, self.spacing)
+
+    def distance_matrix_m(self, points_a, points_b):
+        """
+        Jak WBANPhysics.distance_matrix_m, ale po powierzchni ciała.
+        W jednej strefie i poza ciałem - odległość euklidesowa (dokładna).
+        """
+        a = np.asarray(points_a, dtype=float)
+        b = np.asarray(points_b, dtype=float)
+        diff = a[..., :, None, :] - b[..., None, :, :]
+        dist_cm = np.sqrt(np.sum(diff * diff, axis=-1))
+
+        ca, za = self.cell_indices(a)
+        cb, zb = self.cell_indices(b)
+        cross = (za[..., :, None] != zb[..., None, :]) & (za[..., :, None] >= 0) & (zb[..., None, :] >= 0)
+        if np.any(cross):
+            ia, ib = np.broadcast_arrays(ca[..., :, None], cb[..., None, :])
+            dist_cm = np.where(cross, self.field[np.maximum(ia, 0), np.maximum(ib, 0)], dist_cm)
+        return np.maximum(dist_cm / 100.0, 0.01)
+
+
+_FIELDS = {}
+
+
+def get_field(spacing=GEODESIC_GRID_CM, cache_dir=GEODESIC_CACHE_DIR):
+    """Pole geodezyjne (budowane przy pierwszym użyciu, potem mmap; jedno na proces)."""
+    key = (spacing, cache_dir)
+    if key not in _FIELDS:
+        _FIELDS[key] = GeodesicField(build_field_file(spacing, cache_dir), spacing)
+    return _FIELDS[key]
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from src.body_model import LANDMARKS
+    from src.physics import WBANPhysics
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        geo = get_field(cache_dir=tmp)
+        t_build = time.perf_counter() - t0
+        n = geo.field.shape[0]
+        print(f"Pole {n} x {n} komórek ({os.path.getsize(field_file_path(cache_dir=tmp)) / 1e6:.1f} MB) "
+              f"w {t_build:.2f} s")
+
+        names = list(LANDMARKS)
+        pts = np.array([LANDMARKS[k] for k in names])
+        d_geo = geo.distance_matrix_m(pts, pts) * 100
+        d_euc = WBANPhysics.distance_matrix_m(pts, pts) * 100
+        for i, j in [(0, 4), (1, 3), (2, 4), (0, 1)]:
+            print(f"{names[i]:>8} -> {names[j]:<8} mapa {d_euc[i, j]:6.1f} cm, po ciele {d_geo[i, j]:6.1f} cm")
+
+        # Klatka -> plecy: 14 cm do boku + FLANK_CM + 10 cm po plecach
+        expected = (50 - 36) + FLANK_CM + (70 - 60)
+        rng = np.random.default_rng(0)
+        a, b = BodyModel.get_random_valid_positions(300, rng), BodyModel.get_random_valid_positions(300, rng)
+        t0 = time.perf_counter()
+        d = geo.distance_matrix_m(a, b)
+        t_lookup = time.perf_counter() - t0
+        symmetric = np.allclose(d, geo.distance_matrix_m(b, a).T)
+        print(f"300 x 300 łączy w {t_lookup * 1000:.1f} ms")
+
+        if abs(d_geo[0, 4] - expected) < 2 * GEODESIC_GRID_CM and symmetric and np.allclose(d_geo[0, 1], d_euc[0, 1]):
+            print(">> SUKCES: Odległości po powierzchni ciała z pola w pamięci mapowanej.")
@@ -0,0 +1,287 @@
+import numpy as np
+
+from src.physics import WBANPhysics, IEEE_802_15_6_PARAMS, physics_context
+from src.body_model import BodyModel, ALLOWED_ZONES
+from src import fitness
+
+# ==================================================================================
+# GLOBALNA ANALIZA WRAŻLIWOŚCI (SOBOL / SALTELLI) STAŁYCH MODELU
+# Parametry: stałe radia (src/physics.py), wykładniki n, wagi i normalizacja
+# funkcji celu (src/fitness.py). Próbki Saltellego (scipy.stats.qmc.Sobol):
+# N * (D + 2) zestawów parametrów. Geometria P stałych rozmieszczeń relayów
+# (odległości, strefy) jest liczona raz, a funkcja celu dla K próbek x P
+# rozmieszczeń to jeden przebieg wektorowy (K, P, S, R) z kontekstem fizycznym
+# o kształcie (K, 1, 1, 1). Model jak domyślny problem: routing 'greedy',
+# opóźnienie 'constant' (wynik dla nominalnych stałych = evaluate_population).
+# Wyjścia: najlepszy koszt, energia optimum i "żal" (regret) rozmieszczenia
+# optymalnego dla stałych nominalnych - ST > 0 dla regretu oznacza, że stała
+# faktycznie przesuwa optimum. Przy stałych nominalnych relay nigdy nie wygrywa z direct
+# (wszystkie rozmieszczenia remisują), więc zakres CURRENT_BASE_MA sięga 0 mA - tam koszt
+# nadawania zależy głównie od tłumienia i relaye się opłacają. Optimum "przesunięte" =
+# regret > REGRET_TOL (względnie), a nie inny indeks argmin (remisy rozstrzygane na indeks 0).
+# Wyjście stałe we wszystkich próbkach (Output_Std = 0) ma indeksy 0 - brak rankingu.
+# ==================================================================================
+
+# Zakresy (rozkład jednostajny) - nominał z modułów leży wewnątrz każdego przedziału
+PARAMETER_RANGES = {
+    'RX_SENSITIVITY':          (-100.0, -90.0),
+    'SYSTEM_MARGIN':           (5.0, 15.0),
+    'CURRENT_BASE_MA':         (0.0, 3.5),   # < ~1 mA: relaye wygrywają z direct
+    'CURRENT_SLOPE_MA_PER_DB': (0.05, 0.15),
+    'n.LOS':                   (1.9, 2.5),
+    'n.NLOS':                  (3.0, 3.7),
+    'n.Torso':                 (2.9, 3.6),
+    'n.General':               (2.8, 3.4),
+    'WEIGHTS.energy':          (0.4, 0.8),
+    'WEIGHTS.delay':           (0.05, 0.2),
+    'WEIGHTS.quality':         (0.1, 0.3),
+    'WEIGHTS.load':            (0.05, 0.2),
+    'NORM_FACTORS.energy':     (0.0025, 0.01),
+    'NORM_FACTORS.delay':      (0.05, 0.2),
+    'NORM_FACTORS.quality':    (25.0, 100.0),
+    'NORM_FACTORS.load':       (0.5, 2.0)
+}
+
+OUTPUTS = ('Best_Fitness', 'Optimum_Energy_J', 'Regret_Nominal')
+PATH_LOSS_TYPES = ('LOS', 'NLOS', 'Torso', 'General')
+SAMPLE_CHUNK = 128      # Próbek parametrów w jednym przebiegu wektorowym
+N_BOOTSTRAP = 200       # Replikacje bootstrap dla przedziałów indeksów
+REGRET_TOL = 1e-9       # Względny regret, powyżej którego optimum uznajemy za przesunięte
+
+
+def nominal_parameters():
+    """Bieżące wartości stałych z modułów (kolejność PARAMETER_RANGES)."""
+    ctx = physics_context()
+    values = {}
+    for name in PARAMETER_RANGES:
+        group, _, key = name.partition('.')
+        if group == 'n':
+            values[name] = IEEE_802_15_6_PARAMS[key]['n']
+        elif group in ('WEIGHTS', 'NORM_FACTORS'):
+            values[name] = getattr(fitness, group)[key]
+        else:
+            values[name] = ctx[name]
+    return values
+
+
+def check_problem_modes(problem):
+    """Model wsadowy odtwarza tylko routing 'greedy' i opóźnienie 'constant' - inne tryby to błąd."""
+    if problem.routing != 'greedy':
+        raise ValueError(f"Analiza stałych obsługuje tylko routing 'greedy' (problem: '{problem.routing}')")
+    if problem.delay_model != 'constant':
+        raise ValueError(f"Analiza stałych obsługuje tylko opóźnienie 'constant' (problem: '{problem.delay_model}')")
+
+
+def placement_geometry(problem, placements):
+    """Geometria P rozmieszczeń (P, 2R) niezależna od stałych: odległości [m] i typy stref relayów."""
+    check_problem_modes(problem)
+    relays = np.asarray(placements, dtype=float).reshape(len(placements), -1, 2)
+    zone_types = [PATH_LOSS_TYPES.index(data['type']) for data in ALLOWED_ZONES.values()]
+    zones = BodyModel.get_zone_indices(relays)
+    return {
+        'd_hop1': problem.distance_matrix_m(problem.sensor_pos, relays),                # (P, S, R)
+        'd_hop2': problem.distance_matrix_m(relays, problem.hub_pos[None, :])[..., 0],  # (P, R)
+        'd_direct': problem.distance_matrix_m(problem.sensor_pos, problem.hub_pos[None, :])[:, 0],
+        'relay_type': np.where(zones >= 0, np.array(zone_types)[np.maximum(zones, 0)],
+                               PATH_LOSS_TYPES.index('General'))
+    }
+
+
+def evaluate_samples(problem, geometry, samples):
+    """
+    Funkcja celu (K, P) i energia [J/s] (K, P) dla K próbek parametrów naraz.
+    samples - słownik nazwa -> tablica (K,) (brakujące = nominał).
+    Sensory zawsze z wykładnikiem 'General' - jak w WBANOptimizationProblem.
+    """
+    nominal = nominal_parameters()
+    K = len(next(iter(samples.values()))) if samples else 1
+    p = {name: np.broadcast_to(np.asarray(samples.get(name, nominal[name]), dtype=float), (K,))
+         for name in PARAMETER_RANGES}
+    col = lambda v: v[:, None, None, None]  # (K,) -> (K, 1, 1, 1)
+
+    ctx = physics_context(**{name: col(p[name]) for name in
+                             ('RX_SENSITIVITY', 'SYSTEM_MARGIN', 'CURRENT_BASE_MA', 'CURRENT_SLOPE_MA_PER_DB')})
+    n_types = np.stack([p[f"n.{t}"] for t in PATH_LOSS_TYPES], axis=-1)     # (K, T)
+    n_sensor = col(p['n.General'])
+    n_relay = n_types[:, geometry['relay_type']][:, :, None, :]             # (K, P, 1, R)
+
+    pl1 = WBANPhysics.path_loss_dB_array(geometry['d_hop1'][None], n_sensor, ctx)                 # (K, P, S, R)
+    pl2 = WBANPhysics.path_loss_dB_array(geometry['d_hop2'][None, :, None, :], n_relay, ctx)     # (K, P, 1, R)
+    pld = WBANPhysics.path_loss_dB_array(geometry['d_direct'][None, None, :, None], n_sensor, ctx)  # (K, 1, S, 1)
+    e1 = WBANPhysics.energy_from_path_loss(pl1, fitness.PACKET_SIZE_BITS, ctx)
+    e2 = WBANPhysics.energy_from_path_loss(pl2, fitness.PACKET_SIZE_BITS, ctx)
+    ed = WBANPhysics.energy_from_path_loss(pld, fitness.PACKET_SIZE_BITS, ctx)[..., 0]            # (K, 1, S)
+    m1 = np.maximum(0, -ctx['RX_SENSITIVITY'] - pl1)
+    m2 = np.maximum(0, -ctx['RX_SENSITIVITY'] - pl2)
+    md = np.maximum(0, -ctx['RX_SENSITIVITY'] - pld)[..., 0]
+
+    # Routing 'greedy': najtańszy relay (pierwszy przy remisie), jeśli tańszy niż direct
+    e_relay = e1 + e2
+    best = np.argmin(e_relay, axis=-1)[..., None]
+    best_e = np.take_along_axis(e_relay, best, axis=-1)[..., 0]
+    via = best_e < ed
+    m_relay = np.minimum(np.take_along_axis(m1, best, axis=-1),
+                         np.take_along_axis(np.broadcast_to(m2, m1.shape), best, axis=-1))[..., 0]
+
+    energy = np.where(via, best_e, ed) * problem.data_rates
+    delay = np.where(via, 2 * fitness.HOP_DELAY_S + fitness.RELAY_PROCESSING_DELAY_S, fitness.HOP_DELAY_S)
+    margin = np.where(via, m_relay, md)
+    usage = np.sum(via[..., None] & (best == np.arange(problem.n_relays)), axis=-2)            # (K, P, R)
+
+    w = {k: p[f"WEIGHTS.{k}"][:, None] for k in ('energy', 'delay', 'quality', 'load')}
+    norm = {k: p[f"NORM_FACTORS.{k}"][:, None] for k in ('energy', 'delay', 'quality', 'load')}
+    total_energy = np.sum(energy, axis=-1)
+    f_quality = (100.0 - np.minimum(100.0, np.min(margin, axis=-1))) / norm['quality']
+    f_load = 0.0
+    if problem.n_relays > 0:
+        f_load = np.where(np.sum(usage, axis=-1) > 0, np.std(usage, axis=-1) / norm['load'], 0.0)
+    cost = (w['energy'] * total_energy / norm['energy'] + w['delay'] * np.sum(delay, axis=-1) / norm['delay'] +
+            w['quality'] * f_quality + w['load'] * f_load)
+    return cost, total_energy
+
+
+def landscape_outputs(problem, geometry, samples, chunk=SAMPLE_CHUNK):
+    """Wyjścia analizy (słownik OUTPUTS -> (K,)) + indeks optimum dla każdej próbki."""
+    nominal_cost, _ = evaluate_samples(problem, geometry, {})
+    p_nominal = int(np.argmin(nominal_cost[0]))
+
+    K = len(next(iter(samples.values())))
+    out = {name: np.empty(K) for name in OUTPUTS}
+    argbest = np.empty(K, dtype=np.int64)
+    for start in range(0, K, chunk):
+        sl = slice(start, min(start + chunk, K))
+        cost, energy = evaluate_samples(problem, geometry, {k: v[sl] for k, v in samples.items()})
+        b = np.argmin(cost, axis=1)
+        rows = np.arange(len(b))
+        argbest[sl] = b
+        out['Best_Fitness'][sl] = cost[rows, b]
+        out['Optimum_Energy_J'][sl] = energy[rows, b]
+        out['Regret_Nominal'][sl] = cost[:, p_nominal] - cost[rows, b]
+    return out, argbest, p_nominal
+
+
+# ------------------------------------------------------------------
+# SALTELLI / SOBOL
+# ------------------------------------------------------------------
+
+def saltelli_design(ranges, n_base, seed=0):
+    """
+    Macierze A, B i AB_i (Saltelli 2010) jako jedna tablica (N * (D + 2), D) w jednostkach fizycznych.
+    n_base zaokrąglane w górę do potęgi 2 (sekwencja Sobola).
+    """
+    from scipy.stats import qmc
+
+    D = len(ranges)
+    m = int(np.ceil(np.log2(max(n_base, 2))))
+    base = qmc.Sobol(d=2 * D, scramble=True, seed=seed).random_base2(m)
+    A, B = base[:, :D], base[:, D:]
+    AB = np.repeat(A[None], D, axis=0)
+    AB[np.arange(D), :, np.arange(D)] = B.T
+    unit = np.vstack([A, B, AB.reshape(-1, D)])
+    lows, highs = np.array(list(ranges.values())).T
+    return qmc.scale(unit, lows, highs)
+
+
+def sobol_indices(y, n_params, n_boot=N_BOOTSTRAP, seed=0):
+    """
+    Indeksy pierwszego rzędu (estymator Saltellego 2010) i całkowite (Jansen)
+    z wyjścia y ułożonego jak w saltelli_design. Zwraca słownik tablic (D,) z 95% CI (bootstrap).
+    """
+    y = np.asarray(y, dtype=float)
+    N = len(y) // (n_params + 2)
+    yA, yB, yAB = y[:N], y[N:2 * N], y[2 * N:].reshape(n_params, N)
+
+    def estimate(rows):
+        a, b, ab = yA[..., rows], yB[..., rows], yAB[:, rows] if rows.ndim == 1 else yAB[:, rows].swapaxes(0, 1)
+        var = np.var(np.concatenate([a, b], axis=-1), axis=-1)[..., None]
+        s1 = np.mean(b[..., None, :] * (ab - a[..., None, :]), axis=-1)
+        st = 0.5 * np.mean((a[..., None, :] - ab) ** 2, axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(var > 0, s1 / var, 0.0), np.where(var > 0, st / var, 0.0)
+
+    s1, st = estimate(np.arange(N))
+    rows = np.random.default_rng(seed).integers(0, N, size=(n_boot, N))
+    s1_b, st_b = estimate(rows)
+    return {
+        'S1': s1, 'S1_CI_Low': np.percentile(s1_b, 2.5, axis=0), 'S1_CI_High': np.percentile(s1_b, 97.5, axis=0),
+        'ST': st, 'ST_CI_Low': np.percentile(st_b, 2.5, axis=0), 'ST_CI_High': np.percentile(st_b, 97.5, axis=0)
+    }
+
+
+def feasible_placements(problem, n_placements, seed=0):
+    """n_placements losowych, poprawnych (bez kar) rozmieszczeń relayów (P, 2R)."""
+    rng = np.random.default_rng(seed)
+    chosen = []
+    while sum(len(c) for c in chosen) < n_placements:
+        relays = BodyModel.get_random_valid_positions(4 * n_placements * problem.n_relays, rng)
+        relays = relays.reshape(-1, problem.n_relays, 2)
+        chosen.append(relays[problem.penalties(relays) == 0].reshape(-1, 2 * problem.n_relays))
+    return np.vstack(chosen)[:n_placements]
+
+
+def analyze_constants(problem, placements, n_base=1024, ranges=None, n_boot=N_BOOTSTRAP, seed=0):
+    """
+    Pełna analiza: projekt Saltellego -> wyjścia dla wszystkich próbek -> indeksy Sobola.
+    Zwraca (tabela pandas: Output, Output_Std, Parameter, S1, ST + CI; udział próbek, w których
+    rozmieszczenie optymalne dla stałych nominalnych ma regret > REGRET_TOL).
+    """
+    import pandas as pd
+
+    check_problem_modes(problem)
+    ranges = ranges or PARAMETER_RANGES
+    X = saltelli_design(ranges, n_base, seed)
+    samples = {name: X[:, i] for i, name in enumerate(ranges)}
+    geometry = placement_geometry(problem, placements)
+    outputs, _, _ = landscape_outputs(problem, geometry, samples)
+
+    rows = []
+    for output in OUTPUTS:
+        idx = sobol_indices(outputs[output], len(ranges), n_boot, seed)
+        for i, name in enumerate(ranges):
+            rows.append({'Output': output, 'Output_Std': float(np.std(outputs[output])), 'Parameter': name,
+                         **{k: float(v[i]) for k, v in idx.items()}})
+    moved = outputs['Regret_Nominal'] > REGRET_TOL * np.abs(outputs['Best_Fitness'])
+    return pd.DataFrame(rows), float(np.mean(moved))
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import time
+    from src.scenarios import get_sensor_placement
+
+    # 1. Estymator na funkcji Ishigami (znane indeksy: S1 = 0.314, 0.442, 0; ST3 = 0.244)
+    ishigami = {'x1': (-np.pi, np.pi), 'x2': (-np.pi, np.pi), 'x3': (-np.pi, np.pi)}
+    X = saltelli_design(ishigami, 4096, seed=1)
+    y = np.sin(X[:, 0]) + 7 * np.sin(X[:, 1]) ** 2 + 0.1 * X[:, 2] ** 4 * np.sin(X[:, 0])
+    ish = sobol_indices(y, 3)
+    print(f"Ishigami S1 = {np.round(ish['S1'], 3)}, ST = {np.round(ish['ST'], 3)}")
+    ishigami_ok = np.allclose(ish['S1'], [0.314, 0.442, 0.0], atol=0.03) and abs(ish['ST'][2] - 0.244) < 0.03
+
+    # 2. Nominalne stałe -> ten sam koszt co evaluate_population
+    problem = fitness.WBANOptimizationProblem(n_relays=2, custom_sensors=get_sensor_placement(12, seed=12))
+    placements = feasible_placements(problem, 256, seed=0)
+    geometry = placement_geometry(problem, placements)
+    nominal_cost, _ = evaluate_samples(problem, geometry, {})
+    same = np.allclose(nominal_cost[0], problem.evaluate_population(placements), rtol=1e-12, atol=0)
+
+    # 3. Pełna analiza
+    t0 = time.perf_counter()
+    table, moved = analyze_constants(problem, placements, n_base=256)
+    n_evals = 256 * (len(PARAMETER_RANGES) + 2) * len(placements)
+    print(f"{n_evals:,} ocen (próbki x rozmieszczenia) w {time.perf_counter() - t0:.2f} s, "
+          f"optimum przesunięte w {moved:.0%} próbek")
+    top = table[table['Output'] == 'Best_Fitness'].nlargest(5, 'ST')
+    print(top[['Parameter', 'S1', 'ST']].round(3).to_string(index=False))
+
+    try:
+        placement_geometry(fitness.WBANOptimizationProblem(n_relays=2, routing='multihop'), placements)
+        modes_checked = False
+    except ValueError:
+        modes_checked = True
+
+    # Zakresy obejmują reżim, w którym relaye wygrywają - regret ma wariancję
+    regret_std = table[table['Output'] == 'Regret_Nominal']['Output_Std'].iloc[0]
+    print(f"Odchylenie regretu: {regret_std:.3g}")
+
+    if ishigami_ok and same and modes_checked and regret_std > 0 and moved > 0:
+        print(">> SUKCES: Indeksy Sobola poprawne, model wsadowy zgodny z funkcją celu.")
@@ -0,0 +1,192 @@
+import numpy as np
+
+from src.fitness import (WBANOptimizationProblem, ZONE_EXPONENTS, PACKET_SIZE_BITS, MIN_DISTANCE_CM,
+                         PENALTY_OFF_BODY, PENALTY_OVERLAP)
+from src.physics import WBANPhysics, RX_SENSITIVITY
+from src.body_model import BodyModel
+
+# ==================================================================================
+# WSPÓLNA OPTYMALIZACJA POŁOŻENIA HUBA I RELAYÓW (DWA POZIOMY)
+# Zewnętrzny poziom (mealpy): położenie huba (x, y) - 2 zmienne.
+# Wewnętrzny poziom: relaye dla danego huba wybierane z siatki kandydatów
+# na ciele (co RELAY_GRID_CM) metodą spadku po współrzędnych: dla każdego
+# slotu relaya cała siatka oceniana jest naraz (wsadowo, jak evaluate_population).
+# Tablice łączy:
+#   sensor -> kandydat (S, G)  - niezależne od huba, liczone raz,
+#   kandydat -> hub (G,)       - liczone raz na komórkę huba (HUB_GRID_CM),
+# a wynik wewnętrznego rozwiązania jest zapamiętywany per komórka, więc
+# powracające w populacji położenia huba nie kosztują nic.
+# ==================================================================================
+
+RELAY_GRID_CM = 5.0   # Rozdzielczość siatki kandydatów na relaye
+HUB_GRID_CM = 2.0     # Hub zaokrąglany do tej siatki (klucz cache)
+INNER_PASSES = 3      # Maks. liczba przejść spadku po współrzędnych
+
+
+def relay_grid(spacing=RELAY_GRID_CM):
+    """Punkty siatki (G, 2) leżące na ciele."""
+    xs = np.arange(0.0, 100.0 + 1e-9, spacing)
+    ys = np.arange(0.0, 180.0 + 1e-9, spacing)
+    points = np.stack(np.meshgrid(xs, ys, indexing='ij'), axis=-1).reshape(-1, 2)
+    return points[BodyModel.get_zone_indices(points) >= 0]
+
+
+class JointPlacementProblem:
+
+    def __init__(self, n_relays=2, custom_sensors=None, relay_grid_cm=RELAY_GRID_CM, hub_grid_cm=HUB_GRID_CM,
+                 **problem_kwargs):
+        """problem_kwargs (routing, delay_model, ...) trafiają do WBANOptimizationProblem każdego huba."""
+        self.n_relays = n_relays
+        self.sensors = custom_sensors
+        self.problem_kwargs = problem_kwargs
+        self.hub_grid_cm = hub_grid_cm
+
+        self.problem_size = 2
+        self.lb = [0.0, 0.0]
+        self.ub = [100.0, 180.0]
+        self.minmax = "min"
+        self.log_to = None
+
+        # Dane niezależne od huba (hub domyślny nie ma tu znaczenia)
+        base = WBANOptimizationProblem(n_relays=n_relays, custom_sensors=custom_sensors, **problem_kwargs)
+        self.sensor_pos = base.sensor_pos
+        self.grid = relay_grid(relay_grid_cm)
+        self.grid_n = ZONE_EXPONENTS[BodyModel.get_zone_indices(self.grid)]
+
+        dist_h1 = base.distance_matrix_m(self.sensor_pos, self.grid)
+        pl_h1 = WBANPhysics.path_loss_dB_array(dist_h1, base.sensor_n[:, None])
+        self.e_hop1 = WBANPhysics.energy_from_path_loss(pl_h1, PACKET_SIZE_BITS)
+        self.margin_hop1 = np.maximum(0, -RX_SENSITIVITY - pl_h1)
+
+        d_sensor = np.sqrt(np.min(np.sum((self.grid[:, None, :] - self.sensor_pos) ** 2, axis=-1), axis=1))
+        self.grid_free = d_sensor >= MIN_DISTANCE_CM
+        diff = self.grid[:, None, :] - self.grid[None, :, :]
+        self.grid_spaced = np.sqrt(np.sum(diff * diff, axis=-1)) >= MIN_DISTANCE_CM
+
+        self.hubs = {}   # komórka huba -> wynik wewnętrzny
+        self.hits = 0
+        self.misses = 0
+
+    def hub_cell(self, hub):
+        return tuple(int(v) for v in np.round(np.asarray(hub, dtype=float) / self.hub_grid_cm))
+
+    def hub_problem(self, hub):
+        return WBANOptimizationProblem(n_relays=self.n_relays, custom_sensors=self.sensors, hub_pos=hub,
+                                       **self.problem_kwargs)
+
+    # ------------------------------------------------------------------
+    # POZIOM WEWNĘTRZNY: relaye dla ustalonego huba
+    # ------------------------------------------------------------------
+
+    def _evaluate_sets(self, problem, hop2, idx):
+        """Funkcja celu dla zestawów relayów (B, R) podanych indeksami siatki (tablice z cache)."""
+        tables = {
+            'relay_n': self.grid_n[idx],
+            'e_hop1': np.moveaxis(self.e_hop1[:, idx], 0, -2),
+            'margin_hop1': np.moveaxis(self.margin_hop1[:, idx], 0, -2),
+            'e_hop2': hop2['e_hop2'][idx],
+            'margin_hop2': hop2['margin_hop2'][idx]
+        }
+        if problem.routing == 'multihop':
+            _, metrics = problem.multihop_routes(self.grid[idx], tables)
+        else:
+            metrics = problem.network_metrics(tables, problem.route(tables))
+        return problem.objective(metrics)
+
+    def _inner_solve(self, hub):
+        problem = self.hub_problem(hub)
+        dist_h2 = problem.distance_matrix_m(self.grid, problem.hub_pos[None, :])[:, 0]
+        pl_h2 = WBANPhysics.path_loss_dB_array(dist_h2, self.grid_n)
+        hop2 = {'e_hop2': WBANPhysics.energy_from_path_loss(pl_h2, PACKET_SIZE_BITS),
+                'margin_hop2': np.maximum(0, -RX_SENSITIVITY - pl_h2)}
+
+        allowed = self.grid_free & (np.linalg.norm(self.grid - problem.hub_pos, axis=1) >= MIN_DISTANCE_CM)
+
+        # Start: najtańsze (dla najbliższego energetycznie sensora) punkty z zachowaniem odstępów
+        order = np.argsort(np.min(self.e_hop1, axis=0) + hop2['e_hop2'], kind='stable')
+        chosen = []
+        for g in order[allowed[order]]:
+            if all(self.grid_spaced[g, c] for c in chosen):
+                chosen.append(g)
+            if len(chosen) == self.n_relays:
+                break
+        if len(chosen) < self.n_relays:
+            return {'hub': problem.hub_pos, 'problem': problem, 'relays': None, 'fitness': PENALTY_OVERLAP}
+
+        idx = np.array(chosen)
+        best = float(self._evaluate_sets(problem, hop2, idx[None, :])[0])
+        for _ in range(INNER_PASSES):
+            improved = False
+            for slot in range(self.n_relays):
+                others = np.delete(idx, slot)
+                ok = allowed & np.all(self.grid_spaced[:, others], axis=1)
+                candidates = np.nonzero(ok)[0]
+                sets = np.repeat(idx[None, :], len(candidates), axis=0)
+                sets[:, slot] = candidates
+                fitness = self._evaluate_sets(problem, hop2, sets)
+                k = int(np.argmin(fitness))
+                if fitness[k] < best:
+                    best, idx, improved = float(fitness[k]), sets[k], True
+            if not improved:
+                break
+        return {'hub': problem.hub_pos, 'problem': problem, 'relays': self.grid[idx], 'fitness': best}
+
+    def solve_relays(self, hub):
+        """Najlepsze relaye dla huba (zaokrąglonego do siatki); wynik z cache, jeśli był liczony."""
+        cell = self.hub_cell(hub)
+        entry = self.hubs.get(cell)
+        if entry is None:
+            self.misses += 1
+            entry = self._inner_solve(np.array(cell, dtype=float) * self.hub_grid_cm)
+            self.hubs[cell] = entry
+        else:
+            self.hits += 1
+        return entry
+
+    # ------------------------------------------------------------------
+    # POZIOM ZEWNĘTRZNY: funkcja celu dla mealpy (wektor = położenie huba)
+    # ------------------------------------------------------------------
+
+    def fitness_function(self, solution_vector):
+        hub = np.array(self.hub_cell(solution_vector), dtype=float) * self.hub_grid_cm
+        if not BodyModel.is_valid_position(hub[0], hub[1]):
+            return PENALTY_OFF_BODY
+        if np.min(np.linalg.norm(self.sensor_pos - hub, axis=1)) < MIN_DISTANCE_CM:
+            return PENALTY_OVERLAP
+        return self.solve_relays(hub)['fitness']
+
+    def decode_solution(self, solution_vector):
+        """(hub (2,), relaye (R, 2), problem dla tego huba) - do metryk i wizualizacji."""
+        entry = self.solve_relays(solution_vector)
+        return entry['hub'], entry['relays'], entry['problem']
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import time
+    from src.optimizers import get_algorithm, build_problem_dict
+    from src.scenarios import get_sensor_placement
+
+    sensors = get_sensor_placement(12, seed=12)
+    epoch, pop_size = 30, 20
+    get_algorithm('GA')  # Import mealpy poza pomiarem czasu
+
+    t0 = time.time()
+    fixed = WBANOptimizationProblem(n_relays=2, custom_sensors=sensors)
+    res_fixed = get_algorithm('GA')(epoch=epoch, pop_size=pop_size).solve(build_problem_dict(fixed), seed=1)
+    t_fixed = time.time() - t0
+
+    t0 = time.time()
+    joint = JointPlacementProblem(n_relays=2, custom_sensors=sensors)
+    res_joint = get_algorithm('GA')(epoch=epoch, pop_size=pop_size).solve(build_problem_dict(joint), seed=1)
+    t_joint = time.time() - t0
+
+    hub, relays, problem = joint.decode_solution(res_joint.solution)
+    check = problem.fitness_function(relays.ravel())
+    print(f"Hub stały {fixed.hub_pos}: fitness {res_fixed.target.fitness:.6f} ({t_fixed:.2f} s)")
+    print(f"Hub optymalizowany {hub}: fitness {res_joint.target.fitness:.6f} ({t_joint:.2f} s), "
+          f"relaye {relays.tolist()}")
+    print(f"Siatka: {len(joint.grid)} kandydatów, huby: {joint.misses} policzone, {joint.hits} z cache")
+
+    if np.isclose(check, res_joint.target.fitness, rtol=1e-12) and joint.hits > joint.misses:
+        print(">> SUKCES: Wspólna optymalizacja huba i relayów z wewnętrznym cache.")
@@ -0,0 +1,217 @@
+import math
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from queue import Empty
+import numpy as np
+
+from src.optimizers import get_algorithm, build_problem_dict
+from src.trial_cache import trial_key
+
+# ==================================================================================
+# MODEL WYSPOWY (KILKA POPULACJI MEALPY W OSOBNYCH PROCESACH + MIGRACJA ELIT)
+# Każda wyspa to osobny proces z własną populacją (może to być inny algorytm).
+# Co `migration_interval` epok wyspa:
+#   1) wpisuje swoje `n_migrants` najlepszych osobników do pamięci współdzielonej
+#      (tablica (wyspy, migranci, wymiar + 1), ostatnia kolumna = fitness),
+#   2) czeka na barierze, czyta elity sąsiadów wg topologii, znowu bariera,
+#   3) zastępuje najgorszych osobników imigrantami i wznawia solve
+#      (starting_solutions = populacja po migracji).
+# Migracja jest synchroniczna: wynik zależy tylko od ziarna, nie od planisty OS.
+# Uwaga: wznowienie solve zeruje stan wewnętrzny algorytmu (np. prędkości PSO)
+# i ponownie ocenia populację startową (pop_size wywołań na segment).
+# Badanie: run_research_study.py --islands N --topology ring (island_trial - format
+# i cache jak cached_solve, wyniki w osobnym CSV).
+# ==================================================================================
+
+MIGRATION_INTERVAL = 10   # Epok między migracjami
+N_MIGRANTS = 2            # Elit wysyłanych przez wyspę w każdej migracji
+TOPOLOGIES = ('ring', 'complete', 'isolated')
+SEED_STRIDE = 1000        # Ziarno segmentu = seed + SEED_STRIDE * wyspa + runda
+
+
+def migration_sources(topology, n_islands):
+    """Dla każdej wyspy: lista wysp, od których przyjmuje imigrantów."""
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Nieznana topologia: {topology} (dostępne: {TOPOLOGIES})")
+    if topology == 'ring' and n_islands > 1:
+        return [[(i - 1) % n_islands] for i in range(n_islands)]
+    if topology == 'complete':
+        return [[j for j in range(n_islands) if j != i] for i in range(n_islands)]
+    return [[] for _ in range(n_islands)]
+
+
+def _population(model):
+    """Pozycje i fitness populacji po solve, posortowane od najlepszego (minimalizacja)."""
+    positions = np.array([agent.solution for agent in model.pop], dtype=float)
+    fitness = np.array([agent.target.fitness for agent in model.pop], dtype=float)
+    # Globalne best (np. PSO nie jest elitarne) zastępuje najgorszego osobnika
+    worst = np.argmax(fitness)
+    if model.g_best.target.fitness < fitness.min():
+        positions[worst] = model.g_best.solution
+        fitness[worst] = model.g_best.target.fitness
+    order = np.argsort(fitness, kind='stable')
+    return positions[order], fitness[order]
+
+
+def _island(idx, problem, algorithm, hyperparams, epoch, interval, n_migrants, sources, seed,
+            shm_name, shape, barrier, out_queue):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        elites = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+        problem_dict = build_problem_dict(problem)
+        n_rounds = math.ceil(epoch / interval)
+        starting, curve = None, []
+
+        for r in range(n_rounds):
+            model = get_algorithm(algorithm)(epoch=min(interval, epoch - r * interval), **hyperparams)
+            model.solve(problem_dict, starting_solutions=starting,
+                        seed=None if seed is None else seed + SEED_STRIDE * idx + r)
+            curve.extend(model.history.list_global_best_fit)
+            positions, fitness = _population(model)
+            if r == n_rounds - 1:
+                break
+
+            elites[idx, :, :-1] = positions[:n_migrants]
+            elites[idx, :, -1] = fitness[:n_migrants]
+            barrier.wait()
+            immigrants = elites[sources].reshape(-1, shape[2]).copy()
+            barrier.wait()
+
+            # Najlepsi imigranci zastępują najgorszych (najwyżej połowa populacji)
+            immigrants = immigrants[np.argsort(immigrants[:, -1], kind='stable')][:len(positions) // 2]
+            if len(immigrants):
+                positions[-len(immigrants):] = immigrants[:, :-1]
+            starting = positions
+
+        out_queue.put((idx, positions[0].tolist(), float(fitness[0]), [float(v) for v in curve]))
+    finally:
+        shm.close()
+
+
+def run_islands(problem, algorithms=('GA',), n_islands=4, epoch=50, pop_size=30, algo_params=None,
+                migration_interval=MIGRATION_INTERVAL, n_migrants=N_MIGRANTS, topology='ring', seed=None):
+    """
+    Optymalizacja modelem wyspowym. `algorithms` przypisujemy wyspom cyklicznie
+    (np. ('GA', 'PSO') -> GA, PSO, GA, PSO), `algo_params` = {algorytm: dodatkowe parametry}.
+    Zwraca słownik: solution, fitness, time_s, islands (algorytm, fitness, krzywa na wyspę).
+    """
+    sources = migration_sources(topology, n_islands)
+    algo_params = algo_params or {}
+    dim = len(problem.lb)
+    shape = (n_islands, n_migrants, dim + 1)
+
+    ctx = mp.get_context()
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+    barrier = ctx.Barrier(n_islands)
+    out_queue = ctx.Queue()
+    names = [algorithms[i % len(algorithms)] for i in range(n_islands)]
+
+    t0 = time.time()
+    procs = [ctx.Process(target=_island, daemon=True,
+                         args=(i, problem, names[i], dict(pop_size=pop_size, **algo_params.get(names[i], {})),
+                               epoch, migration_interval, n_migrants, sources[i], seed, shm.name, shape,
+                               barrier, out_queue))
+             for i in range(n_islands)]
+    try:
+        for p in procs:
+            p.start()
+        results = {}
+        while len(results) < n_islands:
+            try:
+                idx, solution, fitness, curve = out_queue.get(timeout=1.0)
+                results[idx] = (solution, fitness, curve)
+            except Empty:
+                # Wyspa padła -> przerywamy barierę, żeby pozostałe nie czekały w nieskończoność
+                if any(p.exitcode not in (None, 0) for p in procs):
+                    barrier.abort()
+                    raise RuntimeError("Proces wyspy zakończył się błędem")
+        for p in procs:
+            p.join()
+    finally:
+        for p in procs:
+            if p.is_alive():
+                p.terminate()
+        shm.close()
+        shm.unlink()
+
+    best = min(results, key=lambda i: results[i][1])
+    return {
+        'solution': np.array(results[best][0]),
+        'fitness': results[best][1],
+        'time_s': time.time() - t0,
+        'islands': [{'algorithm': names[i], 'fitness': results[i][1], 'curve': results[i][2]}
+                    for i in range(n_islands)]
+    }
+
+
+def island_trial(problem, algorithm, hyperparams, seed, n_islands, topology='ring', cache=None):
+    """
+    Próba w trybie wyspowym (wszystkie wyspy tym samym algorytmem) w formacie cached_solve:
+    solution, fitness, time_s, curves (global_best = minimum po wyspach w każdej epoce).
+    Klucz cache = klucz próby + ustawienia wysp, więc nie miesza się z próbami pojedynczymi.
+    """
+    extra = {'islands': n_islands, 'topology': topology, 'migration_interval': MIGRATION_INTERVAL,
+             'n_migrants': N_MIGRANTS}
+    key = trial_key(problem, algorithm, hyperparams, seed, extra) if cache is not None else None
+    if key is not None:
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+    params = dict(hyperparams)
+    epoch, pop_size = params.pop('epoch'), params.pop('pop_size')
+    res = run_islands(problem, (algorithm,), n_islands, epoch, pop_size, algo_params={algorithm: params},
+                      topology=topology, seed=seed)
+    result = {
+        'solution': [float(v) for v in res['solution']],
+        'fitness': float(res['fitness']),
+        'time_s': res['time_s'],
+        'curves': {'global_best': [float(v) for v in np.min([isl['curve'] for isl in res['islands']], axis=0)]}
+    }
+    if key is not None:
+        cache.put(key, result)
+    return result
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    from mealpy import Termination
+    from src import physics
+    from src.fitness import WBANOptimizationProblem
+    from src.scenarios import get_sensor_placement
+
+    # Przy stałych nominalnych relay nigdy nie wygrywa z direct i wszystkie poprawne rozmieszczenia
+    # remisują - porównanie jakości wymaga reżimu, w którym relaye się opłacają (wyspy dziedziczą
+    # stałą przez fork; przy 'spawn' porównanie biegnie na stałych nominalnych)
+    physics.CURRENT_BASE_MA = 0.0
+    problem = WBANOptimizationProblem(n_relays=2, custom_sensors=get_sensor_placement(20, seed=20))
+    n_islands = 4  # Na maszynie z >= 4 rdzeniami wyspy liczą się równolegle
+    epoch, pop_size = 40, 30
+
+    t0 = time.time()
+    model = get_algorithm('GA')(epoch=epoch, pop_size=pop_size)
+    single = model.solve(build_problem_dict(problem), seed=1)
+    t_single = time.time() - t0
+
+    ring = run_islands(problem, ('GA', 'PSO'), n_islands, epoch, pop_size, topology='ring', seed=1)
+    again = run_islands(problem, ('GA', 'PSO'), n_islands, epoch, pop_size, topology='ring', seed=1)
+    isolated = run_islands(problem, ('GA', 'PSO'), n_islands, epoch, pop_size, topology='isolated', seed=1)
+
+    # Ten sam czas zegarowy: pojedynczy GA dostaje czas pracy wysp (izolowanych i pierścienia)
+    budget = Termination(max_time=ring['time_s'])
+    model = get_algorithm('GA')(epoch=100 * epoch, pop_size=pop_size)
+    same_time = model.solve(build_problem_dict(problem), seed=1, termination=budget)
+    same_epochs = len(model.history.list_global_best_fit)
+
+    print(f"Pojedynczy GA:        fitness {single.target.fitness:.6f}, {t_single:.2f} s")
+    print(f"Pojedynczy GA, czas wysp: fitness {same_time.target.fitness:.6f}, {same_epochs} epok "
+          f"w {ring['time_s']:.2f} s ({mp.cpu_count()} CPU)")
+    print(f"{n_islands} wyspy (izolowane): fitness {isolated['fitness']:.6f}, {isolated['time_s']:.2f} s")
+    print(f"{n_islands} wyspy (pierścień): fitness {ring['fitness']:.6f}, {ring['time_s']:.2f} s")
+    print("Wyspy:", [(isl['algorithm'], round(isl['fitness'], 6)) for isl in ring['islands']])
+
+    complete = all(len(isl['curve']) == epoch for isl in ring['islands'])
+    repeatable = ring['fitness'] == again['fitness'] and np.array_equal(ring['solution'], again['solution'])
+    if complete and repeatable and ring['fitness'] == problem.fitness_function(ring['solution']):
+        print(">> SUKCES: Wyspy z migracją przez pamięć współdzieloną, wynik powtarzalny.")
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import numpy as np
+
+from src.body_model import ALLOWED_ZONES
+from src.fitness import WBANOptimizationProblem, WEIGHTS, NORM_FACTORS
+from src.geodesic import zone_grid, surface_cells, grid_cell_indices
+from src.shared_problem import problem_config
+from src.trial_cache import model_constants
+
+# ==================================================================================
+# KRAJOBRAZ FUNKCJI CELU DLA JEDNEGO RELAYA (GĘSTA SIATKA, MEMMAP)
+# Dla zadanego układu sensorów relay stawiany jest w środku każdej komórki siatki
+# LANDSCAPE_GRID_CM na strefach ALLOWED_ZONES (te same komórki co pole geodezyjne),
+# a metryki routingu liczone są wektorowo, porcjami po CHUNK_CELLS komórek
+# (relaye (N, 1, 2) jako "populacja" - jeden przebieg rdzenia fitness.py).
+# Mapy (LANDSCAPE_METRICS x komórki) trafiają do pliku .npy otwieranego przez mmap;
+# nazwa pliku zawiera skrót sensorów, ustawień problemu, wag i stałych modelu
+# (trial_cache.model_constants: physics, mac, multihop, geodesic...), więc ponowne
+# użycie jest natychmiastowe. Zastosowania: mapy cieplne (utils.plot_landscape)
+# i populacje startowe z obszarów o niskiej energii (LandscapeMap.starting_solutions).
+# ==================================================================================
+
+LANDSCAPE_GRID_CM = 1.0
+LANDSCAPE_CACHE_DIR = "WBAN_Landscape"
+CHUNK_CELLS = 2048      # Komórek na jeden przebieg wektorowy (pamięć ~ CHUNK x S)
+SEED_QUANTILE = 0.1     # Populacja startowa z tego kwantyla metryki (tylko komórki poprawne)
+SEED_MAX_ROUNDS = 100   # Rund losowania krotek relayów (odrzucanie kolizji) przed błędem
+
+# Fitness     - jak evaluate_population (z karami)
+# Penalty     - PENALTY_OFF_BODY / PENALTY_OVERLAP / 0
+# Energy_J, Delay_s, Min_Margin_dB - metryki sieci (jak get_metrics_details, liczone też w kolizji)
+# Relay_Sensors - liczba sensorów obsługiwanych przez relay
+# Relay_Gap_J - min po sensorach (droga przez relay - direct) x przepływność; < 0: relay się opłaca
+LANDSCAPE_METRICS = ('Fitness', 'Penalty', 'Energy_J', 'Delay_s', 'Min_Margin_dB', 'Relay_Sensors', 'Relay_Gap_J')
+
+
+def landscape_file_path(problem, spacing=LANDSCAPE_GRID_CM, cache_dir=LANDSCAPE_CACHE_DIR):
+    """Nazwa pliku zawiera skrót sensorów, ustawień problemu, wag, stałych modelu i siatki."""
+    spec = json.dumps({'zones': ALLOWED_ZONES, 'sensor_pos': problem.sensor_pos.tolist(),
+                       'data_rates': problem.data_rates.tolist(), 'config': problem_config(problem),
+                       'weights': WEIGHTS, 'norm': NORM_FACTORS, 'constants': model_constants(),
+                       'metrics': LANDSCAPE_METRICS, 'spacing': spacing},
+                      sort_keys=True, default=lambda v: np.asarray(v).tolist())
+    digest = hashlib.sha256(spec.encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"landscape_{problem.routing}_{spacing:g}cm_{digest}.npy")
+
+
+def landscape_chunk(problem, cells):
+    """Metryki LANDSCAPE_METRICS (M, N) dla relaya w punktach cells (N, 2) - jeden przebieg wektorowy."""
+    relays = np.asarray(cells, dtype=float)[:, None, :]
+    penalty = problem.penalties(relays)
+    tables = problem.link_tables(relays)
+    if problem.routing == 'multihop':
+        _, metrics = problem.multihop_routes(relays, tables)
+    else:
+        metrics = problem.network_metrics(tables, problem.route(tables))
+
+    e_relay = tables['e_hop1'][..., 0] + tables['e_hop2']
+    gap = np.min((e_relay - problem.e_direct) * problem.data_rates, axis=-1)
+    return np.stack([
+        np.where(penalty > 0, penalty, problem.objective(metrics)),
+        penalty,
+        np.sum(metrics['energy'], axis=-1),
+        np.sum(metrics['delay'], axis=-1),
+        np.minimum(100.0, np.min(metrics['margin'], axis=-1)),
+        metrics['relay_usage'][..., 0],
+        gap
+    ])
+
+
+def build_landscape_file(problem, spacing=LANDSCAPE_GRID_CM, cache_dir=LANDSCAPE_CACHE_DIR, chunk=CHUNK_CELLS):
+    """Ścieżka do pliku map; liczy go tylko, jeśli nie istnieje (zapis do memmap tmp + os.replace)."""
+    if problem.n_relays != 1:
+        raise ValueError(f"Krajobraz wymaga problemu z jednym relayem (n_relays={problem.n_relays})")
+    path = landscape_file_path(problem, spacing, cache_dir)
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        cells, _ = surface_cells(spacing)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        maps = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.float64,
+                                         shape=(len(LANDSCAPE_METRICS), len(cells)))
+        for start in range(0, len(cells), chunk):
+            maps[:, start:start + chunk] = landscape_chunk(problem, cells[start:start + chunk])
+        maps.flush()
+        del maps
+        os.replace(tmp_path, path)
+    return path
+
+
+class LandscapeMap:
+    """Mapy krajobrazu otwarte przez mmap + odczyt w punktach, obrazy stref i populacje startowe."""
+
+    def __init__(self, path, spacing=LANDSCAPE_GRID_CM, problem=None):
+        """problem - problem, z którego liczono mapy (kary przy losowaniu populacji startowej)."""
+        self.maps = np.load(path, mmap_mode='r')
+        self.problem = problem
+        self.spacing = spacing
+        self.grid = zone_grid(spacing)
+        self.cells, self.cell_zone = surface_cells(spacing)
+
+    def metric(self, name):
+        """Mapa (N,) jednej metryki w kolejności komórek surface_cells."""
+        if name not in LANDSCAPE_METRICS:
+            raise ValueError(f"Nieznana metryka: {name} (dostępne: {LANDSCAPE_METRICS})")
+        return self.maps[LANDSCAPE_METRICS.index(name)]
+
+    @property
+    def feasible(self):
+        return self.metric('Penalty') == 0
+
+    def value_at(self, points, name):
+        """Wartość metryki w najbliższej komórce dla punktów (..., 2); NaN poza ciałem."""
+        idx, _ = grid_cell_indices(points, self.grid, self.spacing)
+        return np.where(idx >= 0, np.asarray(self.metric(name))[np.maximum(idx, 0)], np.nan)
+
+    def zone_image(self, zone_name, name, feasible_only=True):
+        """Obraz (ny, nx) metryki w strefie (origin='lower') i jego extent dla imshow."""
+        x0, y0, nx, ny, offset = self.grid[list(ALLOWED_ZONES).index(zone_name)]
+        nx, ny, offset = int(nx), int(ny), int(offset)
+        values = np.array(self.metric(name)[offset:offset + nx * ny])
+        if feasible_only:
+            values[~self.feasible[offset:offset + nx * ny]] = np.nan
+        half = self.spacing / 2
+        extent = (x0 - half, x0 + (nx - 1) * self.spacing + half, y0 - half, y0 + (ny - 1) * self.spacing + half)
+        return values.reshape(nx, ny).T, extent
+
+    def seed_positions(self, n, rng, name='Energy_J', quantile=SEED_QUANTILE):
+        """
+        n punktów (n, 2) - środki losowych komórek poprawnych o metryce <= kwantyla `quantile`
+        (środki, bo tam liczono mapy: przesunięcie w komórce mogłoby wejść w kolizję).
+        """
+        values = np.asarray(self.metric(name))
+        feasible = np.nonzero(self.feasible)[0]
+        if len(feasible) == 0:
+            raise ValueError("Brak poprawnych komórek w krajobrazie")
+        threshold = np.quantile(values[feasible], quantile)
+        pool = feasible[values[feasible] <= threshold]
+        return self.cells[rng.choice(pool, size=n)]
+
+    def starting_solutions(self, pop_size, n_relays, rng, name='Energy_J', quantile=SEED_QUANTILE):
+        """
+        Populacja startowa (pop_size, 2R) dla mealpy solve(starting_solutions=...): krotki R relayów
+        z seed_positions losowane z odrzucaniem - zostają tylko bez kar (odstępy relay-relay,
+        relay-sensor, relay-hub) w problemie z R relayami.
+        """
+        if self.problem is None:
+            raise ValueError("Populacja startowa wymaga problemu krajobrazu (LandscapeMap(..., problem=...))")
+        chosen, n_chosen = [], 0
+        for _ in range(SEED_MAX_ROUNDS):
+            relays = self.seed_positions(4 * pop_size * n_relays, rng, name, quantile).reshape(-1, n_relays, 2)
+            feasible = relays[self.problem.penalties(relays) == 0]
+            chosen.append(feasible)
+            n_chosen += len(feasible)
+            if n_chosen >= pop_size:
+                return np.vstack(chosen)[:pop_size].reshape(pop_size, 2 * n_relays)
+        raise ValueError(f"Za mało poprawnych krotek {n_relays} relayów w kwantylu {quantile} metryki {name} "
+                         f"({n_chosen} z {pop_size})")
+
+
+def get_landscape(sensors=None, spacing=LANDSCAPE_GRID_CM, cache_dir=LANDSCAPE_CACHE_DIR, **problem_kwargs):
+    """Krajobraz jednego relaya dla układu sensorów (liczony przy pierwszym użyciu, potem mmap)."""
+    problem = WBANOptimizationProblem(n_relays=1, custom_sensors=sensors, **problem_kwargs)
+    return LandscapeMap(build_landscape_file(problem, spacing, cache_dir), spacing, problem)
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import tempfile
+    import time
+    from src.scenarios import get_sensor_placement
+    from src.utils import plot_landscape
+
+    sensors = get_sensor_placement(15, seed=15)
+    problem = WBANOptimizationProblem(n_relays=1, custom_sensors=sensors)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        land = get_landscape(sensors, cache_dir=tmp)
+        t_build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        get_landscape(sensors, cache_dir=tmp)
+        t_open = time.perf_counter() - t0
+        n_cells = len(land.cells)
+
+        # Odniesienie: fitness_function punkt po punkcie (próbka komórek)
+        rng = np.random.default_rng(0)
+        sample = rng.choice(n_cells, size=300, replace=False)
+        t0 = time.perf_counter()
+        ref = np.array([problem.fitness_function(land.cells[i]) for i in sample])
+        t_point = (time.perf_counter() - t0) / len(sample) * n_cells
+        same = np.allclose(np.asarray(land.metric('Fitness'))[sample], ref, rtol=1e-12, atol=0)
+        lookup = np.array_equal(land.value_at(land.cells[sample], 'Fitness'), np.asarray(land.metric('Fitness'))[sample])
+
+        # Energia sieci jest płaska (relay nie wygrywa z direct) - seedujemy po Relay_Gap_J
+        energy = land.metric('Energy_J')
+        threshold = np.quantile(np.asarray(land.metric('Relay_Gap_J'))[land.feasible], SEED_QUANTILE)
+        seeds_ok = True
+        for n_relays in (2, 3):
+            seeds = land.starting_solutions(50, n_relays, rng, name='Relay_Gap_J')
+            seeds_ok &= np.all(land.value_at(seeds.reshape(-1, 2), 'Relay_Gap_J') <= threshold)
+            seeds_ok &= np.all(problem.penalties(seeds.reshape(-1, n_relays, 2)) == 0)
+
+        gap = np.asarray(land.metric('Relay_Gap_J'))[land.feasible]
+        print(f"{n_cells} komórek x {len(LANDSCAPE_METRICS)} metryk ({os.path.getsize(land.maps.filename) / 1e6:.2f} MB)")
+        print(f"Wektorowo: {t_build:.2f} s (ponowne otwarcie {t_open * 1000:.1f} ms), "
+              f"punkt po punkcie (szacunek): {t_point:.2f} s")
+        print(f"Energia w poprawnych komórkach: {np.nanmin(np.asarray(energy)[land.feasible]):.4e} .. "
+              f"{np.nanmax(np.asarray(energy)[land.feasible]):.4e} J, najmniejsza strata relaya {gap.min():.3e} J")
+        print(f"Zgodność z fitness_function: {same}, odczyt w punktach: {lookup}, populacja startowa: {seeds_ok}")
+
+        plot_landscape(land, 'Relay_Gap_J', output_path=os.path.join(tmp, "landscape.png"), dpi=80, sensors=sensors)
+        if same and lookup and seeds_ok and t_build < t_point:
+            print(">> SUKCES: Krajobraz jednego relaya z jednego przebiegu wektorowego, mapy w pamięci mapowanej.")
@@ -0,0 +1,139 @@
+import numpy as np
+from src.physics import WBANPhysics, RX_SENSITIVITY
+
+# ==================================================================================
+# ROUTING WIELOSKOKOWY (MULTI-HOP) NA PEŁNYM GRAFIE SENSORY + RELAYE + HUB
+# Węzły: [0..S-1] sensory, [S..S+R-1] relaye, [S+R] hub (ujście).
+# Waga krawędzi i -> j = energia nadania pakietu przez węzeł i na odległość d(i, j)
+# (wykładnik n nadawcy). Najkrótsze drogi do huba liczymy jednocześnie dla
+# wszystkich źródeł wektorowym Bellmanem-Fordem na macierzach gęstych,
+# opcjonalnie dla całej populacji naraz (wymiar wiodący P).
+# ==================================================================================
+
+MAX_HOPS = 4                # Maksymalna liczba skoków sensor -> hub
+SENSOR_FORWARDING = True    # Czy sensory mogą przekazywać pakiety innych sensorów
+
+
+def build_energy_graph(node_pos, node_n, sink, packet_size_bits, forwarders=None, distance=None):
+    """
+    node_pos (..., N, 2) [cm], node_n (..., N) wykładniki nadawców, sink - indeks huba.
+    forwarders (N,) bool - które węzły mogą być pośrednikami (hub zawsze jest ujściem).
+    distance - funkcja macierzy odległości [m] (domyślnie WBANPhysics.distance_matrix_m).
+    Zwraca (W, M): energie [J/pakiet] i marginesy [dB] krawędzi (..., N, N), inf = brak krawędzi.
+    """
+    dist = (distance or WBANPhysics.distance_matrix_m)(node_pos, node_pos)
+    pl = WBANPhysics.path_loss_dB_array(dist, np.asarray(node_n)[..., :, None])
+    W = WBANPhysics.energy_from_path_loss(pl, packet_size_bits)
+    M = np.maximum(0, -RX_SENSITIVITY - pl)
+
+    n_nodes = W.shape[-1]
+    blocked = np.eye(n_nodes, dtype=bool)
+    blocked[sink, :] = True                   # hub niczego nie nadaje dalej
+    if forwarders is not None:
+        receivers = np.asarray(forwarders, dtype=bool).copy()
+        receivers[sink] = True
+        blocked[:, ~receivers] = True         # do nie-pośredników nic nie wysyłamy
+    W = np.where(blocked, np.inf, W)
+    return W, M
+
+
+def shortest_paths_to_sink(W, sink, max_hops=MAX_HOPS):
+    """
+    Bellman-Ford z ograniczeniem liczby skoków, wektorowo dla wszystkich źródeł.
+    Zwraca (cost (..., N), next_hop (..., H, N)), H = max_hops: next_hop[..., h, i] to następny
+    węzeł najtańszej drogi z i o co najwyżej h + 1 skokach (poziom h-1 liczony z kosztów poziomu h-1).
+    Jeden wskaźnik na węzeł nie wystarcza - najlepsza droga z węzła zależy od pozostałych skoków;
+    przejście po poziomach H-1, H-2, ..., 0 (walk_paths) ma <= H skoków i koszt równy `cost`.
+    Przy remisie wygrywa bezpośrednie łącze do huba.
+    """
+    cost = W[..., :, sink].copy()
+    next_hop = np.full(cost.shape, sink, dtype=np.int64)
+    cost[..., sink] = 0.0
+    levels = [next_hop]
+
+    for _ in range(max_hops - 1):
+        candidates = W + cost[..., None, :]
+        best = np.argmin(candidates, axis=-1)
+        best_cost = np.take_along_axis(candidates, best[..., None], axis=-1)[..., 0]
+        improved = best_cost < cost
+        cost = np.where(improved, best_cost, cost)
+        next_hop = np.where(improved, best, next_hop)
+        next_hop[..., sink] = sink
+        levels.append(next_hop)
+
+    return cost, np.stack(levels, axis=-2)
+
+
+def walk_paths(next_hop, M, sources, sink, max_hops=MAX_HOPS):
+    """
+    Przechodzi drogi źródło -> hub dla wszystkich źródeł naraz; skok t używa poziomu
+    next_hop[..., H-1-t, :] (tablice z shortest_paths_to_sink), więc każda droga kończy się w hubie.
+    Zwraca (hops (..., S), min_margin (..., S), visits (..., S, N) - węzły pośrednie drogi).
+    """
+    lead = next_hop.shape[:-2]
+    n_levels, n_nodes = next_hop.shape[-2:]
+    nh = next_hop.reshape(-1, n_levels, n_nodes)
+    Mb = np.broadcast_to(M, lead + (n_nodes, n_nodes)).reshape(-1, n_nodes, n_nodes)
+    n_batch, n_src = nh.shape[0], len(sources)
+
+    b = np.arange(n_batch)[:, None]
+    s = np.arange(n_src)[None, :]
+    cur = np.tile(np.asarray(sources, dtype=np.int64), (n_batch, 1))
+    hops = np.zeros((n_batch, n_src), dtype=np.int64)
+    margin = np.full((n_batch, n_src), np.inf)
+    visits = np.zeros((n_batch, n_src, n_nodes), dtype=bool)
+
+    for step in range(min(max_hops, n_levels)):
+        active = cur != sink
+        if not np.any(active):
+            break
+        nxt = nh[b, n_levels - 1 - step, cur]
+        margin = np.where(active, np.minimum(margin, Mb[b, cur, nxt]), margin)
+        hops += active
+        cur = np.where(active, nxt, cur)
+        visits[b, s, cur] |= active & (cur != sink)
+
+    return (hops.reshape(lead + (n_src,)), margin.reshape(lead + (n_src,)),
+            visits.reshape(lead + (n_src, n_nodes)))
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    # 1. Graf testowy: 0 -> 1 -> 2 -> hub(3) tańsze niż każde krótsze obejście
+    inf = np.inf
+    W = np.array([[inf, 1.0, 9.0, 10.0],
+                  [inf, inf, 1.0, 8.0],
+                  [inf, inf, inf, 1.0],
+                  [inf, inf, inf, inf]])
+    M = np.full((4, 4), 30.0)
+    cost, nxt = shortest_paths_to_sink(W, sink=3)
+    hops, margin, visits = walk_paths(nxt, M, sources=[0, 1], sink=3)
+    print(f"Koszt: {cost}, next: {nxt}, skoki: {hops}")
+
+    # 2. Wersja wsadowa (populacja 2 rozwiązań) zgodna z pojedynczą
+    pos = np.array([[21.0, 109.0], [20.0, 80.0], [40.0, 54.0]])
+    n = np.array([3.11, 3.35, 3.11])
+    Wg, _ = build_energy_graph(pos, n, sink=2, packet_size_bits=1500)
+    Wb, _ = build_energy_graph(np.stack([pos, pos]), np.stack([n, n]), sink=2, packet_size_bits=1500)
+    same = np.allclose(shortest_paths_to_sink(Wb, sink=2)[0][1], shortest_paths_to_sink(Wg, sink=2)[0])
+
+    # 3. Losowe grafy: droga z tablic poziomów ma <= MAX_HOPS skoków i koszt równy kosztowi DP
+    rng = np.random.default_rng(0)
+    consistent = True
+    for _ in range(200):
+        Wr = rng.uniform(1.0, 10.0, (9, 9)) ** 3
+        np.fill_diagonal(Wr, np.inf)
+        Wr[8, :] = np.inf
+        c, nx = shortest_paths_to_sink(Wr, sink=8)
+        h, _, _ = walk_paths(nx, np.zeros((9, 9)), sources=np.arange(8), sink=8)
+        for src in range(8):
+            node, walked = src, 0.0
+            for step in range(MAX_HOPS):
+                if node == 8:
+                    break
+                walked, node = walked + Wr[node, nx[MAX_HOPS - 1 - step, node]], nx[MAX_HOPS - 1 - step, node]
+            consistent &= node == 8 and np.isclose(walked, c[src]) and h[src] <= MAX_HOPS
+    print(f"Losowe grafy: drogi zgodne z kosztem DP i w limicie skoków: {consistent}")
+
+    if list(nxt[-1]) == [1, 2, 3, 3] and list(hops) == [3, 2] and cost[0] == 3.0 and same and consistent:
+        print(">> SUKCES: Bellman-Ford znalazł drogę wieloskokową, wersja wsadowa zgodna.")
@@ -0,0 +1,31 @@
+import importlib
+
+# ==================================================================================
+# REJESTR ALGORYTMÓW (LENIWY IMPORT MEALPY)
+# mealpy ciągnie za sobą scipy/pandas/matplotlib (~2 s przy zimnym starcie),
+# więc moduł ładujemy dopiero przy pierwszym użyciu algorytmu.
+# ==================================================================================
+
+# TYLKO 3 ZATWIERDZONE: nazwa -> (moduł mealpy, klasa)
+ALGORITHMS = {
+    'GA':  ('mealpy.evolutionary_based.GA', 'BaseGA'),
+    'PSO': ('mealpy.swarm_based.PSO', 'OriginalPSO'),
+    'GWO': ('mealpy.swarm_based.GWO', 'OriginalGWO')
+}
+
+
+def get_algorithm(name):
+    """Zwraca klasę optymalizatora mealpy dla nazwy z ALGORITHMS."""
+    module_name, class_name = ALGORITHMS[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def build_problem_dict(problem, obj_func=None):
+    """Słownik problemu w formacie mealpy dla WBANOptimizationProblem."""
+    from mealpy import FloatVar
+    return {
+        "obj_func": obj_func or problem.fitness_function,
+        "bounds": FloatVar(lb=problem.lb, ub=problem.ub),
+        "minmax": problem.minmax,
+        "log_to": None
+    }
@@ -7,6 +7,7 @@ import numpy as np
 # 1. Parametry Radia (wzorowane na Nordic nRF52840 - typowy chip IoT/WBAN)
 VOLTAGE = 3.0           # V
 BIT_RATE = 1_000_000    # 1 Mbps
+PACKET_SIZE_BITS = 1500 # Rozmiar pakietu (jedna definicja dla fitness.py i mac.py)
 RX_SENSITIVITY = -96.0  # dBm (Bardzo czułe radio)
 SYSTEM_MARGIN = 10.0    # dB (Margines na zaniki sygnału)
 
@@ -14,6 +15,18 @@ SYSTEM_MARGIN = 10.0    # dB (Margines na zaniki sygnału)
 TX_POWER_MIN = -40.0    # Tryb super-low power
 TX_POWER_MAX = 4.0      # Maksymalna moc
 
+# Model prądu nadajnika (nRF52840): I(mA) = 3.0 + 0.1 * (Tx_dBm + 40)
+CURRENT_BASE_MA = 3.0
+CURRENT_SLOPE_MA_PER_DB = 0.1
+
+# Odbiornik i zasilanie węzłów (relaye/sensory przekazujące pakiety płacą też za odbiór)
+RX_CURRENT_MA = 4.6                           # nRF52840 RX @ 1 Mbps (DC/DC)
+BATTERY_CAPACITY_J = 0.225 * 3600 * VOLTAGE   # CR2032: 225 mAh @ 3 V = 2430 J
+
+# Punkt odniesienia modelu Path Loss
+D0_M = 0.1       # 10 cm reference
+PL_D0_DB = 35.0  # dB @ 2.4GHz
+
 # 2. Parametry modelu propagacji IEEE 802.15.6 (CM3)
 # [Chavez et al. 2013]
 IEEE_802_15_6_PARAMS = {
@@ -23,6 +36,23 @@ IEEE_802_15_6_PARAMS = {
     'General': {'n': 3.11, 'sigma': 5.9}
 }
 
+# 3. Kontekst fizyczny: stałe modelu radia jako słownik (do analizy wrażliwości).
+# Funkcje wektorowe przyjmują opcjonalny `ctx`; wartości mogą być tablicami
+# (np. kształt (K, 1, 1) = K próbek parametrów liczonych naraz).
+PHYSICS_CONSTANTS = ('VOLTAGE', 'BIT_RATE', 'RX_SENSITIVITY', 'SYSTEM_MARGIN', 'TX_POWER_MIN', 'TX_POWER_MAX',
+                     'CURRENT_BASE_MA', 'CURRENT_SLOPE_MA_PER_DB', 'D0_M', 'PL_D0_DB')
+
+
+def physics_context(**overrides):
+    """Słownik stałych fizycznych (wartości z modułu) z nadpisaniami."""
+    unknown = set(overrides) - set(PHYSICS_CONSTANTS)
+    if unknown:
+        raise ValueError(f"Nieznane stałe fizyczne: {sorted(unknown)} (dostępne: {PHYSICS_CONSTANTS})")
+    ctx = {name: globals()[name] for name in PHYSICS_CONSTANTS}
+    ctx.update(overrides)
+    return ctx
+
+
 class WBANPhysics:
     
     @staticmethod
@@ -42,8 +72,8 @@ class WBANPhysics:
         """
         Log-Normal Shadowing Path Loss
         """
-        d0 = 0.1  # 10 cm reference
-        PL_d0 = 35.0 # dB @ 2.4GHz
+        d0 = D0_M
+        PL_d0 = PL_D0_DB
         
         params = WBANPhysics.get_path_loss_params(location_type)
         n = params['n']
@@ -78,7 +108,7 @@ class WBANPhysics:
         #   0 dBm -> ~5.0 mA
         #  +4 dBm -> ~7.5 mA
         # Wzór: I(mA) = 3.0 + 0.1 * (Tx_dBm + 40)
-        current_mA = 3.0 + 0.1 * (tx_power_dBm + 40.0)
+        current_mA = CURRENT_BASE_MA + CURRENT_SLOPE_MA_PER_DB * (tx_power_dBm - TX_POWER_MIN)
         current_A = current_mA / 1000.0
         
         # 5. Czas lotu pakietu
@@ -90,6 +120,70 @@ class WBANPhysics:
         
         return energy_J
 
+    # ------------------------------------------------------------------
+    # WERSJE WEKTOROWE (macierze linków zamiast pętli po parach punktów)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def distance_matrix_m(points_a, points_b):
+        """
+        Macierz odległości [m] między punktami (..., A, 2) i (..., B, 2) w [cm].
+        Minimalny dystans 1 cm, jak w calculate_distance_m.
+        """
+        a = np.asarray(points_a, dtype=float)
+        b = np.asarray(points_b, dtype=float)
+        diff = a[..., :, None, :] - b[..., None, :, :]
+        dist_cm = np.sqrt(np.sum(diff * diff, axis=-1))
+        return np.maximum(dist_cm / 100.0, 0.01)
+
+    @staticmethod
+    def path_loss_dB_array(distance_m, n, ctx=None):
+        """Log-Normal Shadowing Path Loss dla tablic odległości i wykładników n."""
+        c = physics_context() if ctx is None else ctx
+        distance_m = np.asarray(distance_m, dtype=float)
+        ratio = np.maximum(distance_m, c['D0_M']) / c['D0_M']
+        return np.where(distance_m <= c['D0_M'], c['PL_D0_DB'], c['PL_D0_DB'] + 10 * n * np.log10(ratio))
+
+    @staticmethod
+    def energy_from_path_loss(pl_dB, packet_size_bits=1500, ctx=None):
+        """Energia [J] na pakiet dla tablicy tłumień (ten sam model co calculate_energy_consumption)."""
+        c = physics_context() if ctx is None else ctx
+        required_tx_dBm = c['RX_SENSITIVITY'] + pl_dB + c['SYSTEM_MARGIN']
+        tx_power_dBm = np.clip(required_tx_dBm, c['TX_POWER_MIN'], c['TX_POWER_MAX'])
+        current_A = (c['CURRENT_BASE_MA'] + c['CURRENT_SLOPE_MA_PER_DB'] * (tx_power_dBm - c['TX_POWER_MIN'])) / 1000.0
+        return c['VOLTAGE'] * current_A * (packet_size_bits / c['BIT_RATE'])
+
+    @staticmethod
+    def energy_rx(packet_size_bits=1500):
+        """Energia [J] odbioru jednego pakietu (stały prąd RX, niezależny od odległości)."""
+        return VOLTAGE * (RX_CURRENT_MA / 1000.0) * (packet_size_bits / BIT_RATE)
+
+    # ------------------------------------------------------------------
+    # PROGI ANALITYCZNE (odwrócenie modelu energii / zasięgu)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def max_range_m(n):
+        """Odległość [m], przy której wymagana moc osiąga TX_POWER_MAX (dalej łącze traci margines)."""
+        pl_max = TX_POWER_MAX - RX_SENSITIVITY - SYSTEM_MARGIN
+        return D0_M * 10 ** ((pl_max - PL_D0_DB) / (10 * np.asarray(n, dtype=float)))
+
+    @staticmethod
+    def max_distance_for_energy_m(energy_J, n, packet_size_bits=1500):
+        """
+        Największa odległość [m], na której energia pakietu nie przekracza `energy_J`.
+        -inf gdy nawet minimalna moc (TX_POWER_MIN) jest droższa, inf gdy budżet >= energii przy TX_POWER_MAX.
+        """
+        energy_J = np.asarray(energy_J, dtype=float)
+        n = np.asarray(n, dtype=float)
+        current_mA = energy_J / (VOLTAGE * packet_size_bits / BIT_RATE) * 1000.0
+        tx_dBm = TX_POWER_MIN + (current_mA - CURRENT_BASE_MA) / CURRENT_SLOPE_MA_PER_DB
+        pl_dB = np.minimum(tx_dBm, TX_POWER_MAX) - RX_SENSITIVITY - SYSTEM_MARGIN
+        dist = D0_M * 10 ** (np.maximum(pl_dB - PL_D0_DB, 0.0) / (10 * n))
+
+        dist = np.where(tx_dBm < TX_POWER_MIN, -np.inf, dist)
+        return np.where(tx_dBm >= TX_POWER_MAX, np.inf, dist)
+
 # --- TEST WERYFIKACYJNY ---
 if __name__ == "__main__":
     print("--- WBAN Physics Test (v2 - High Sensitivity) ---")
@@ -0,0 +1,201 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+# ==================================================================================
+# PIPELINE WYKRESÓW Z JAWNYM GRAFEM ZALEŻNOŚCI
+# Źródło (CSV / pliki) -> Agregat (DataFrame, cache na dysku) -> Wykres (PNG)
+#
+# Każdy węzeł ma klucz = hash(treść wejść + kod modułu z funkcją). Agregaty trzymamy
+# w cache_dir pod kluczem, a w manifeście zapisujemy klucz, z którym powstał
+# każdy wykres. Rysujemy tylko wykresy, których klucz się zmienił.
+# Kod całego modułu (a nie tylko funkcji) - zmiana pomocników (styl, wspólne opcje
+# wykresów) też unieważnia wyniki. Źródło bez żadnego pliku wejściowego (loader
+# zwraca wtedy dane zastępcze, np. losowe) nie jest cache'owane ani zapisywane w manifeście.
+# ==================================================================================
+
+MANIFEST_FILE = 'manifest.json'
+
+
+def _hash_bytes(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _hash_file(path):
+    if not os.path.exists(path):
+        return 'missing'
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+_MODULE_SOURCES = {}
+
+
+def _func_fingerprint(func):
+    """Kod modułu funkcji (z pomocnikami) wchodzi do klucza - zmiana logiki unieważnia cache."""
+    module = inspect.getmodule(func)
+    if module is not None:
+        if module.__name__ not in _MODULE_SOURCES:
+            try:
+                _MODULE_SOURCES[module.__name__] = inspect.getsource(module)
+            except (OSError, TypeError):
+                _MODULE_SOURCES[module.__name__] = None
+        if _MODULE_SOURCES[module.__name__] is not None:
+            return _MODULE_SOURCES[module.__name__] + func.__qualname__
+    try:
+        return inspect.getsource(func)
+    except (OSError, TypeError):
+        return func.__qualname__
+
+
+def _render(func, path, inputs, initializer):
+    if initializer is not None:
+        initializer()
+    func(path, *inputs)
+    return path
+
+
+class PlotPipeline:
+    """
+    Minimalny, przyrostowy system budowania wykresów.
+
+    Przykład:
+        pipe = PlotPipeline(output_dir='FIGS', style=setup_style)
+        pipe.source('exp', ['WBAN_Experiment_Results.csv'], load_exp)
+        pipe.aggregate('means', mean_by_scenario, deps=['exp'])
+        pipe.figure('Fig1.png', draw_fig1, deps=['means'])
+        pipe.run()
+    """
+
+    def __init__(self, output_dir, cache_dir=None, style=None):
+        self.output_dir = output_dir
+        self.cache_dir = cache_dir or os.path.join(output_dir, '.cache')
+        self.style = style
+        self.nodes = {}
+        self.figures = []
+        self._keys = {}
+        self._values = {}
+
+    # --- Deklaracja grafu ---
+    def source(self, name, paths, loader):
+        """Węzeł źródłowy: `loader()` czyta pliki `paths` (klucz = hash ich treści)."""
+        self.nodes[name] = {'kind': 'source', 'paths': list(paths), 'func': loader, 'deps': []}
+
+    def aggregate(self, name, func, deps):
+        """Węzeł pośredni: `func(*wartości_deps)` -> obiekt (cache'owany na dysku)."""
+        self.nodes[name] = {'kind': 'aggregate', 'func': func, 'deps': list(deps)}
+
+    def figure(self, filename, func, deps):
+        """Wykres: `func(ścieżka_png, *wartości_deps)` rysuje i zapisuje plik."""
+        self.figures.append({'filename': filename, 'func': func, 'deps': list(deps)})
+
+    # --- Klucze i wartości ---
+    def key(self, name):
+        if name not in self._keys:
+            node = self.nodes[name]
+            if node['kind'] == 'source':
+                parts = [_hash_file(p) for p in node['paths']]
+            else:
+                parts = [self.key(d) for d in node['deps']]
+            self._keys[name] = _hash_bytes(name, _func_fingerprint(node['func']), *parts)
+        return self._keys[name]
+
+    def is_placeholder(self, name):
+        """Czy węzeł zależy od źródła bez żadnego pliku (dane zastępcze - bez cache i manifestu)."""
+        node = self.nodes[name]
+        if node['kind'] == 'source':
+            return all(_hash_file(p) == 'missing' for p in node['paths'])
+        return any(self.is_placeholder(d) for d in node['deps'])
+
+    def value(self, name):
+        if name in self._values:
+            return self._values[name]
+
+        node = self.nodes[name]
+        if node['kind'] == 'source':
+            result = node['func']()
+        elif self.is_placeholder(name):
+            result = node['func'](*[self.value(d) for d in node['deps']])
+        else:
+            cache_path = os.path.join(self.cache_dir, f"{name}-{self.key(name)[:16]}.pkl")
+            if os.path.exists(cache_path):
+                with open(cache_path, 'rb') as f:
+                    result = pickle.load(f)
+            else:
+                result = node['func'](*[self.value(d) for d in node['deps']])
+                os.makedirs(self.cache_dir, exist_ok=True)
+                with open(cache_path, 'wb') as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._values[name] = result
+        return result
+
+    def figure_key(self, fig):
+        style = _func_fingerprint(self.style) if self.style is not None else ''
+        return _hash_bytes(fig['filename'], _func_fingerprint(fig['func']), style,
+                           *[self.key(d) for d in fig['deps']])
+
+    # --- Budowanie ---
+    def _load_manifest(self):
+        path = os.path.join(self.cache_dir, MANIFEST_FILE)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {}
+
+    def _save_manifest(self, manifest):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+
+    def stale_figures(self, force=False):
+        manifest = self._load_manifest()
+        stale = []
+        for fig in self.figures:
+            path = os.path.join(self.output_dir, fig['filename'])
+            if force or manifest.get(fig['filename']) != self.figure_key(fig) or not os.path.exists(path):
+                stale.append(fig)
+        return stale
+
+    def run(self, force=False, workers=None):
+        """
+        Rysuje tylko nieaktualne wykresy (równolegle w puli procesów).
+        workers=1 -> rysowanie w bieżącym procesie.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        stale = self.stale_figures(force)
+        manifest = self._load_manifest()
+        if not stale:
+            print("[PIPELINE] Wszystkie wykresy aktualne.")
+            return []
+
+        jobs = []
+        for fig in stale:
+            path = os.path.join(self.output_dir, fig['filename'])
+            inputs = [self.value(d) for d in fig['deps']]
+            jobs.append((fig, path, inputs))
+
+        if workers == 1 or len(jobs) == 1:
+            for fig, path, inputs in jobs:
+                _render(fig['func'], path, inputs, self.style)
+                print(f"[GENERATED] {path}")
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_render, fig['func'], path, inputs, self.style)
+                           for fig, path, inputs in jobs]
+                for fut in futures:
+                    print(f"[GENERATED] {fut.result()}")
+
+        for fig, _, _ in jobs:
+            if not any(self.is_placeholder(d) for d in fig['deps']):
+                manifest[fig['filename']] = self.figure_key(fig)
+        self._save_manifest(manifest)
+        return [path for _, path, _ in jobs]
@@ -0,0 +1,158 @@
+import itertools
+import numpy as np
+
+# ==================================================================================
+# RACING / SUCCESSIVE HALVING DLA KONFIGURACJI ALGORYTMÓW
+# Zamiast stałej liczby prób dla każdej konfiguracji:
+#   1. każda żywa konfiguracja dostaje próby do poziomu n_r (n_0, 2*n_0, 4*n_0...),
+#   2. konfiguracje statystycznie gorsze od lidera (test Manna-Whitneya) odpadają,
+#   3. z pozostałych przechodzi dalej co najwyżej 1/eta najlepszych.
+# Budżet liczymy w wywołaniach funkcji celu (epoch * pop_size na próbę).
+# ==================================================================================
+
+ALPHA = 0.05          # Poziom istotności przy eliminacji
+ETA = 2               # Współczynnik redukcji (successive halving)
+MIN_TRIALS = 3        # Próby na konfigurację w pierwszej rundzie (tania runda - dalej halving)
+RUNG0_MAX_SHARE = 0.5  # Maks. udział pierwszej rundy w budżecie (więcej = brak adaptacyjnego przydziału)
+MAX_TRIALS = 30       # Górny limit prób na konfigurację (jak N_TRIALS)
+SUCCESS_THRESHOLD = 100.0  # Fitness < 100 = brak kary
+
+
+def trial_cost(config):
+    """Koszt jednej próby = liczba wywołań funkcji celu."""
+    return config['epoch'] * config['pop_size']
+
+
+def expand_grid(algorithms, epochs, pop_sizes, algo_params=None):
+    """
+    Iloczyn kartezjański siatki hiperparametrów.
+    `algo_params` to słownik: algorytm -> lista słowników parametrów mealpy.
+    """
+    algo_params = algo_params or {}
+    configs = []
+    for algo, epoch, pop_size in itertools.product(algorithms, epochs, pop_sizes):
+        for params in algo_params.get(algo, [{}]):
+            suffix = ''.join(f"_{k}{v}" for k, v in sorted(params.items()))
+            configs.append({
+                'name': f"E{epoch}_P{pop_size}{suffix}",
+                'algorithm': algo,
+                'epoch': epoch,
+                'pop_size': pop_size,
+                'params': dict(params)
+            })
+    return configs
+
+
+def _score(fitness):
+    """Mediana fitness (odporna na próby z karą 800/1000)."""
+    return float(np.median(fitness))
+
+
+def race(configs, run_trial, budget, min_trials=MIN_TRIALS, max_trials=MAX_TRIALS, eta=ETA, alpha=ALPHA,
+         max_rung0_share=RUNG0_MAX_SHARE):
+    """
+    Przeprowadza wyścig konfiguracji w ramach budżetu `budget` (wywołania funkcji celu).
+    Próby dobierane są po kolei (round-robin) między konfiguracjami, a pełna pierwsza runda
+    (min_trials prób każdej konfiguracji) musi zmieścić się w RUNG0_MAX_SHARE budżetu -
+    inaczej prawie cały budżet idzie na równy przydział i wyścig niczego nie oszczędza.
+
+    run_trial(config, trial_idx) -> wiersz wyniku (dict) z kluczem 'Fitness_Cost'.
+    Zwraca (wiersze_wyników, ślad_alokacji).
+    """
+    from scipy.stats import mannwhitneyu
+
+    required = min_trials * sum(trial_cost(cfg) for cfg in configs)
+    if required > max_rung0_share * budget:
+        raise ValueError(f"Pierwsza runda ({min_trials} prób x {len(configs)} konfiguracji = {required} "
+                         f"wywołań funkcji celu) przekracza {max_rung0_share:.0%} budżetu {budget} - "
+                         f"zmniejsz siatkę lub min_trials")
+
+    results = []
+    trace = []
+    fitness = {i: [] for i in range(len(configs))}
+    alive = list(range(len(configs)))
+    spent = 0
+    target = min_trials
+    rung = 0
+
+    while alive:
+        # 1. Dobieramy próby do poziomu `target` po jednej na konfigurację w kolejce
+        #    (round-robin), żeby brak budżetu nie odciął konfiguracji z końca listy
+        ran_any = False
+        progress = True
+        while progress:
+            progress = False
+            for idx in alive:
+                cfg = configs[idx]
+                if len(fitness[idx]) < target and spent + trial_cost(cfg) <= budget:
+                    row = run_trial(cfg, len(fitness[idx]))
+                    fitness[idx].append(row['Fitness_Cost'])
+                    results.append(row)
+                    spent += trial_cost(cfg)
+                    ran_any = progress = True
+
+        # 2. Eliminacja konfiguracji statystycznie gorszych od lidera
+        scores = {idx: _score(fitness[idx]) for idx in alive if fitness[idx]}
+        if not scores:
+            break
+        leader = min(scores, key=scores.get)
+        p_values = {}
+        for idx in alive:
+            if idx == leader or len(fitness[idx]) < 2:
+                p_values[idx] = 1.0
+                continue
+            # H1: konfiguracja idx daje większy (gorszy) fitness niż lider
+            p_values[idx] = mannwhitneyu(fitness[idx], fitness[leader], alternative='greater').pvalue
+        survivors = [idx for idx in alive if idx in scores and p_values[idx] >= alpha]
+
+        # 3. Successive halving: dalej co najwyżej 1/eta najlepszych
+        survivors.sort(key=scores.get)
+        survivors = survivors[:max(1, int(np.ceil(len(alive) / eta)))]
+
+        for idx in alive:
+            cfg = configs[idx]
+            f = np.array(fitness[idx])
+            trace.append({
+                'Rung': rung,
+                'Config_Pack': cfg['name'],
+                'Algorithm': cfg['algorithm'],
+                'Epoch': cfg['epoch'],
+                'Pop_Size': cfg['pop_size'],
+                'Trials': len(f),
+                'Median_Fitness': float(np.median(f)) if len(f) else float('nan'),
+                'Success_Rate': float(np.mean(f < SUCCESS_THRESHOLD)) if len(f) else float('nan'),
+                'P_Value_vs_Leader': p_values.get(idx, float('nan')),
+                'Status': 'alive' if idx in survivors else 'eliminated',
+                'Budget_Spent': spent
+            })
+
+        if not ran_any:
+            break
+        alive = survivors
+        target = min(target * eta, max_trials)
+        rung += 1
+
+    return results, trace
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    configs = expand_grid(['A', 'B'], epochs=[10, 20], pop_sizes=[10])
+    quality = {'A': 1.0, 'B': 3.0}
+
+    def fake_trial(cfg, i):
+        return {'Fitness_Cost': quality[cfg['algorithm']] - 0.01 * cfg['epoch'] + rng.normal(0, 0.1)}
+
+    rows, trace = race(configs, fake_trial, budget=4000, max_trials=10)
+    winners = {t['Config_Pack'] + '/' + t['Algorithm'] for t in trace if t['Rung'] == trace[-1]['Rung'] and t['Status'] == 'alive'}
+    print(f"Prób: {len(rows)}, rund: {trace[-1]['Rung'] + 1}, zwycięzcy: {winners}")
+    first_rung = [t['Trials'] for t in trace if t['Rung'] == 0]
+    # Pierwsza runda 3 x 300 x 2 = 1800 wywołań: 45% z 4000, 60% z 3000 -> błąd
+    try:
+        race(configs, fake_trial, budget=3000)
+        too_small = False
+    except ValueError:
+        too_small = True
+    if winners == {'E20_P10/A'} and min(first_rung) == MIN_TRIALS and too_small:
+        print(">> SUKCES: Racing wybrał najlepszą konfigurację.")
@@ -0,0 +1,86 @@
+import os
+import numpy as np
+
+# ==================================================================================
+# BUFOR WYNIKÓW (TABLICA STRUKTURALNA, ZAPIS KAWAŁKAMI)
+# Zamiast listy słowników: stała, typowana tablica `chunk_size` wierszy
+# wypełniana w miejscu. Po zapełnieniu kawałek jest dopisywany do CSV,
+# więc pamięć nie rośnie z liczbą prób. Format CSV jak z DataFrame.to_csv.
+# ==================================================================================
+
+CHUNK_SIZE = 10_000  # Wierszy w pamięci przed zrzutem na dysk
+
+
+class ResultsBuffer:
+
+    def __init__(self, path, fields, chunk_size=CHUNK_SIZE):
+        """
+        path   - docelowy plik CSV (nadpisywany przy pierwszym zrzucie),
+        fields - lista (nazwa, typ) jak dla np.dtype, np. [('Trial_ID', 'i8'), ('Algorithm', 'U8')].
+        """
+        self.path = path
+        self.dtype = np.dtype(fields)
+        self.data = np.zeros(chunk_size, dtype=self.dtype)
+        self.fill = 0        # Wiersze w bieżącym kawałku
+        self.n_rows = 0      # Wiersze dodane łącznie
+        self._started = False
+
+    def __len__(self):
+        return self.n_rows
+
+    def append(self, **row):
+        """Dodaje wiersz (wszystkie pola wymagane); zrzuca kawałek, gdy bufor pełny."""
+        values = tuple(row[name] for name in self.dtype.names)
+        for name, value in zip(self.dtype.names, values):
+            if isinstance(value, str) and len(value) > self.dtype[name].itemsize // 4:
+                raise ValueError(f"Wartość '{value}' nie mieści się w polu {name} ({self.dtype[name]})")
+        self.data[self.fill] = values
+        self.fill += 1
+        self.n_rows += 1
+        if self.fill == len(self.data):
+            self.flush()
+
+    def flush(self):
+        """Dopisuje zapełnioną część bufora do CSV (nagłówek tylko przy pierwszym zrzucie)."""
+        if self.fill == 0 and self._started:
+            return
+        import pandas as pd
+
+        mode = 'a' if self._started else 'w'
+        pd.DataFrame(self.data[:self.fill]).to_csv(self.path, mode=mode, header=not self._started, index=False)
+        self._started = True
+        self.fill = 0
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import tempfile
+    import pandas as pd
+
+    fields = [('Scenario_Sensors', 'i8'), ('Algorithm', 'U8'), ('Fitness_Cost', 'f8'), ('Is_Success', '?')]
+    rows = [{'Scenario_Sensors': 6 + i % 3, 'Algorithm': ['GA', 'PSO', 'GWO'][i % 3],
+             'Fitness_Cost': 800.0 if i % 7 == 0 else 4.5 + i * 1e-3, 'Is_Success': i % 7 != 0}
+            for i in range(2500)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = os.path.join(tmp, 'ref.csv')
+        buffered = os.path.join(tmp, 'buf.csv')
+        pd.DataFrame(rows).to_csv(reference, index=False)
+
+        with ResultsBuffer(buffered, fields, chunk_size=1000) as buf:
+            for row in rows:
+                buf.append(**row)
+
+        same = open(reference).read() == open(buffered).read()
+        print(f"Wierszy: {len(buf)}, bufor: {buf.data.nbytes} B, CSV identyczny: {same}")
+        if same:
+            print(">> SUKCES: Bufor strukturalny zapisuje ten sam CSV przy stałej pamięci.")
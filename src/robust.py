@@ -0,0 +1,206 @@
+import copy
+import numpy as np
+
+from src.fitness import WBANOptimizationProblem, ZONE_EXPONENTS, PACKET_SIZE_BITS
+from src.physics import WBANPhysics, RX_SENSITIVITY
+from src.body_model import BodyModel, ALLOWED_ZONES
+
+# ==================================================================================
+# ODPORNA FUNKCJA CELU: K WARIANTÓW CIAŁA (ROZMIAR + POSTAWA) W JEDNYM PRZEBIEGU
+# Rozwiązanie (relaye) jest zapisane w układzie nominalnej mapy ciała. Wariant k
+# to przekształcenie afiniczne per strefa: skala ciała (sx, sy) względem huba
+# i przesunięcie kończyn (ARM/LEG) o kilka cm - punkt zachowuje strefę, więc
+# relay na przedramieniu zostaje na przedramieniu innego pacjenta.
+# Sensory, hub i relaye są mapowane do wszystkich wariantów naraz: tablice
+# łączy mają kształt (K, P, S, R), a routing/metryki/funkcja celu to te same
+# metody WBANOptimizationProblem (broadcasting po osi wariantów).
+# Agregacja po K: 'worst' (maksimum), 'cvar' (średnia z ułamka alpha najgorszych)
+# albo 'mean'. Wariant 0 to ciało nominalne. Ograniczenia (na ciele, odstępy)
+# sprawdzane są w układzie nominalnym.
+# ==================================================================================
+
+N_VARIANTS = 50
+SIZE_SD = 0.08            # Odchylenie skali ciała (wzrost / obwód)
+SIZE_LIMITS = (0.8, 1.2)
+POSTURE_SHIFT_CM = 3.0    # Odchylenie przesunięcia kończyn (postawa)
+POSTURE_ZONES = ('ARM_LEFT', 'LEG_LEFT')
+AGGREGATIONS = ('worst', 'cvar', 'mean')
+CVAR_ALPHA = 0.2
+
+
+def body_variants(n_variants=N_VARIANTS, seed=0, size_sd=SIZE_SD, posture_shift_cm=POSTURE_SHIFT_CM):
+    """
+    Losowe warianty ciała: skala (K, 2) i przesunięcie per strefa (K, Z + 1, 2);
+    ostatni wiersz stref = punkty poza ciałem (bez przesunięcia). Wariant 0 = nominalny.
+    """
+    rng = np.random.default_rng(seed)
+    n_zones = len(ALLOWED_ZONES)
+    scale = np.clip(rng.normal(1.0, size_sd, (n_variants, 2)), *SIZE_LIMITS)
+    shift = np.zeros((n_variants, n_zones + 1, 2))
+    limbs = [i for i, name in enumerate(ALLOWED_ZONES) if name in POSTURE_ZONES]
+    shift[:, limbs] = rng.normal(0.0, posture_shift_cm, (n_variants, len(limbs), 2))
+    scale[0], shift[0] = 1.0, 0.0
+    return scale, shift
+
+
+class RobustPlacementProblem:
+
+    def __init__(self, n_relays=2, custom_sensors=None, n_variants=N_VARIANTS, aggregation='cvar', alpha=CVAR_ALPHA,
+                 variant_seed=0, size_sd=SIZE_SD, posture_shift_cm=POSTURE_SHIFT_CM, **problem_kwargs):
+        """problem_kwargs (routing, delay_model, hub_pos, ...) trafiają do nominalnego WBANOptimizationProblem."""
+        if aggregation not in AGGREGATIONS:
+            raise ValueError(f"Nieznana agregacja: {aggregation} (dostępne: {AGGREGATIONS})")
+        self.nominal = WBANOptimizationProblem(n_relays=n_relays, custom_sensors=custom_sensors, **problem_kwargs)
+        if self.nominal.routing == 'capacitated':
+            raise ValueError("Tryb odporny nie obsługuje routingu 'capacitated' (przydział per rozwiązanie)")
+        if self.nominal.distance_model != 'euclidean':
+            raise ValueError("Tryb odporny wymaga modelu odległości 'euclidean' (pole geodezyjne jest nominalne)")
+        self.aggregation = aggregation
+        self.alpha = alpha
+
+        self.n_relays = n_relays
+        self.problem_size = self.nominal.problem_size
+        self.lb = self.nominal.lb
+        self.ub = self.nominal.ub
+        self.minmax = "min"
+        self.log_to = None
+
+        self.scale, shift = body_variants(n_variants, variant_seed, size_sd, posture_shift_cm)
+        # Hub jest punktem odniesienia: zostaje w miejscu w każdym wariancie (odległości się nie zmieniają)
+        hub_zone = BodyModel.get_zone_indices(self.nominal.hub_pos)
+        self.shift = shift - shift[:, hub_zone][:, None, :]
+
+        # Widok "zespołu": ten sam problem z sensorami i łączami direct dla K wariantów (K, 1, S, ...)
+        sensors_k = self.map_points(self.nominal.sensor_pos)                                   # (K, S, 2)
+        dist_dir = WBANPhysics.distance_matrix_m(sensors_k, self.nominal.hub_pos[None, :])[..., 0]
+        pl_dir = WBANPhysics.path_loss_dB_array(dist_dir, self.nominal.sensor_n)
+        self.ensemble = copy.copy(self.nominal)
+        self.ensemble.sensor_pos = sensors_k[:, None]
+        self.ensemble.e_direct = WBANPhysics.energy_from_path_loss(pl_dir, PACKET_SIZE_BITS)[:, None]
+        self.ensemble.margin_direct = np.maximum(0, -RX_SENSITIVITY - pl_dir)[:, None]
+
+    @property
+    def n_variants(self):
+        return len(self.scale)
+
+    def map_points(self, points):
+        """Punkty (..., 2) z mapy nominalnej -> (K, ..., 2) we wszystkich wariantach."""
+        points = np.asarray(points, dtype=float)
+        zones = BodyModel.get_zone_indices(points)          # -1 (poza ciałem) -> ostatni wiersz przesunięć
+        extra = (1,) * (points.ndim - 1)
+        scale = self.scale.reshape(len(self.scale), *extra, 2)
+        hub = self.nominal.hub_pos
+        return hub + scale * (points - hub) + self.shift[:, zones]
+
+    def variant_fitness(self, relays):
+        """Funkcja celu (K, P) poprawnych rozwiązań (P, R, 2) we wszystkich wariantach naraz."""
+        relays = np.asarray(relays, dtype=float)
+        relays_k = self.map_points(relays)                                                    # (K, P, R, 2)
+        relay_n = np.broadcast_to(ZONE_EXPONENTS[BodyModel.get_zone_indices(relays)], relays_k.shape[:-1])
+        ens = self.ensemble
+
+        dist_h1 = WBANPhysics.distance_matrix_m(ens.sensor_pos, relays_k)                      # (K, P, S, R)
+        pl_h1 = WBANPhysics.path_loss_dB_array(dist_h1, ens.sensor_n[:, None])
+        dist_h2 = WBANPhysics.distance_matrix_m(relays_k, ens.hub_pos[None, :])[..., 0]         # (K, P, R)
+        pl_h2 = WBANPhysics.path_loss_dB_array(dist_h2, relay_n)
+        tables = {
+            'relay_n': relay_n,
+            'e_hop1': WBANPhysics.energy_from_path_loss(pl_h1, PACKET_SIZE_BITS),
+            'margin_hop1': np.maximum(0, -RX_SENSITIVITY - pl_h1),
+            'e_hop2': WBANPhysics.energy_from_path_loss(pl_h2, PACKET_SIZE_BITS),
+            'margin_hop2': np.maximum(0, -RX_SENSITIVITY - pl_h2)
+        }
+        if ens.routing == 'multihop':
+            _, metrics = ens.multihop_routes(relays_k, tables)
+        else:
+            metrics = ens.network_metrics(tables, ens.route(tables))
+        return ens.objective(metrics)
+
+    def aggregate(self, costs):
+        """Agregacja po osi wariantów (K, ...) -> (...)."""
+        if self.aggregation == 'worst':
+            return np.max(costs, axis=0)
+        if self.aggregation == 'mean':
+            return np.mean(costs, axis=0)
+        n_tail = max(1, int(np.ceil(self.alpha * len(costs))))
+        return np.mean(np.sort(costs, axis=0)[-n_tail:], axis=0)
+
+    def evaluate_population(self, population):
+        population = np.asarray(population, dtype=float)
+        relays = population.reshape(len(population), -1, 2)
+        fitness = self.nominal.penalties(relays)
+        ok = fitness == 0.0
+        if np.any(ok):
+            fitness[ok] = self.aggregate(self.variant_fitness(relays[ok]))
+        return fitness
+
+    def fitness_function(self, solution_vector):
+        return float(self.evaluate_population(np.asarray(solution_vector, dtype=float)[None, :])[0])
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import time
+    from src.optimizers import get_algorithm, build_problem_dict
+    from src.scenarios import get_sensor_placement
+
+    sensors = get_sensor_placement(15, seed=15)
+    rng = np.random.default_rng(0)
+    population = BodyModel.get_random_valid_positions(2 * 400, rng).reshape(400, 4)
+
+    ok_all = True
+    for routing in ('greedy', 'multihop'):
+        nominal = WBANOptimizationProblem(n_relays=2, custom_sensors=sensors, routing=routing, delay_model='csma')
+        # Jeden wariant = ciało nominalne -> wynik identyczny z evaluate_population
+        single = RobustPlacementProblem(n_relays=2, custom_sensors=sensors, n_variants=1, routing=routing,
+                                        delay_model='csma')
+        same = np.allclose(single.evaluate_population(population), nominal.evaluate_population(population),
+                           rtol=1e-12, atol=0)
+        # Wariant k policzony wsadowo = problem zbudowany wprost na zmapowanej geometrii
+        robust = RobustPlacementProblem(n_relays=2, custom_sensors=sensors, routing=routing, delay_model='csma')
+        relays = population.reshape(-1, 2, 2)[nominal.penalties(population.reshape(-1, 2, 2)) == 0][:50]
+        k = 7
+        direct = WBANOptimizationProblem(
+            n_relays=2, routing=routing, delay_model='csma',
+            custom_sensors=[{'name': s['name'], 'pos': p, 'data_rate': s['data_rate']}
+                            for s, p in zip(sensors, robust.map_points(nominal.sensor_pos)[k])])
+        tables = direct.link_tables(robust.map_points(relays)[k])
+        tables['relay_n'] = ZONE_EXPONENTS[BodyModel.get_zone_indices(relays)]
+        tables['e_hop2'] = WBANPhysics.energy_from_path_loss(WBANPhysics.path_loss_dB_array(
+            direct.distance_matrix_m(robust.map_points(relays)[k], direct.hub_pos[None, :])[..., 0],
+            tables['relay_n']), PACKET_SIZE_BITS)
+        tables['margin_hop2'] = np.maximum(0, -RX_SENSITIVITY - WBANPhysics.path_loss_dB_array(
+            direct.distance_matrix_m(robust.map_points(relays)[k], direct.hub_pos[None, :])[..., 0],
+            tables['relay_n']))
+        if routing == 'multihop':
+            _, m = direct.multihop_routes(robust.map_points(relays)[k], tables)
+        else:
+            m = direct.network_metrics(tables, direct.route(tables))
+        variant_ok = np.allclose(robust.variant_fitness(relays)[k], direct.objective(m), rtol=1e-12, atol=0)
+        print(f"[{routing}] K=1 zgodne z nominalnym: {same}, wariant {k} zgodny z geometrią wprost: {variant_ok}")
+        ok_all &= same and variant_ok
+
+    # Koszt: jedno rozwiązanie, K = 50 wariantów vs skalarna fitness_function
+    nominal = WBANOptimizationProblem(n_relays=2, custom_sensors=sensors)
+    robust = RobustPlacementProblem(n_relays=2, custom_sensors=sensors, aggregation='cvar')
+    x = relays[0].ravel()
+    for f in (nominal.fitness_function, robust.fitness_function):
+        f(x)
+    t0 = time.perf_counter()
+    for _ in range(300):
+        nominal.fitness_function(x)
+    t_scalar = (time.perf_counter() - t0) / 300
+    t0 = time.perf_counter()
+    for _ in range(300):
+        robust.fitness_function(x)
+    t_robust = (time.perf_counter() - t0) / 300
+    print(f"fitness_function: skalarna {t_scalar * 1e6:.0f} us, odporna K={robust.n_variants} {t_robust * 1e6:.0f} us")
+
+    # Optimum nominalne vs odporne (CVaR 20%) ocenione na tych samych wariantach
+    res_nom = get_algorithm('GA')(epoch=40, pop_size=30).solve(build_problem_dict(nominal), seed=1)
+    res_rob = get_algorithm('GA')(epoch=40, pop_size=30).solve(build_problem_dict(robust), seed=1)
+    print(f"Optimum nominalne: CVaR {robust.fitness_function(res_nom.solution):.5f}, "
+          f"odporne: CVaR {res_rob.target.fitness:.5f}")
+
+    if ok_all and t_robust < 5 * t_scalar:
+        print(">> SUKCES: K wariantów ciała w jednym przebiegu wektorowym, zgodność z modelem skalarnym.")
@@ -0,0 +1,110 @@
+import os
+import numpy as np
+from src.body_model import BodyModel
+from src.fitness import FIXED_SENSORS
+
+# ==================================================================================
+# GENERATOR SCENARIUSZY (ROZMIESZCZENIE SENSORÓW) + CACHE NA DYSKU
+# Jeden scenariusz = n_sensors sensorów: najpierw bazowe FIXED_SENSORS,
+# reszta losowana (ważona polem stref) z numpy.random.Generator.
+# Plik scenariuszy to jedna tablica strukturalna .npy (wiersz = scenariusz),
+# którą każdy worker otwiera przez mmap i czyta po indeksie bez kopiowania.
+# ==================================================================================
+
+SCENARIO_CACHE_DIR = "WBAN_Scenarios"
+DEFAULT_DATA_RATE = 100
+
+
+def scenario_dtype(n_sensors):
+    return np.dtype([('pos', np.float64, (n_sensors, 2)),
+                     ('data_rate', np.float64, (n_sensors,))])
+
+
+def generate_scenarios(n_scenarios, n_sensors, seed=42):
+    """
+    Generuje n_scenarios układów po n_sensors sensorów w jednym wektorowym przebiegu.
+    Zwraca tablicę strukturalną o polach 'pos' (N, S, 2) i 'data_rate' (N, S).
+    """
+    rng = np.random.default_rng(seed)
+    scenarios = np.zeros(n_scenarios, dtype=scenario_dtype(n_sensors))
+
+    # Kopiujemy bazowe sensory
+    n_base = min(len(FIXED_SENSORS), n_sensors)
+    for i, s in enumerate(FIXED_SENSORS[:n_base]):
+        scenarios['pos'][:, i] = s['pos']
+        scenarios['data_rate'][:, i] = s['data_rate']
+
+    # Dolosowujemy resztę
+    n_random = n_sensors - n_base
+    if n_random > 0:
+        positions = BodyModel.get_random_valid_positions(n_scenarios * n_random, rng)
+        scenarios['pos'][:, n_base:] = positions.reshape(n_scenarios, n_random, 2)
+        scenarios['data_rate'][:, n_base:] = DEFAULT_DATA_RATE
+    return scenarios
+
+
+def scenario_to_sensors(scenario):
+    """Zamienia wiersz pliku scenariuszy na listę słowników dla WBANOptimizationProblem."""
+    sensors = []
+    for i, (pos, rate) in enumerate(zip(scenario['pos'], scenario['data_rate'])):
+        name = FIXED_SENSORS[i]['name'] if i < len(FIXED_SENSORS) else f'S_{i}'
+        sensors.append({'name': name, 'pos': np.array(pos), 'data_rate': float(rate)})
+    return sensors
+
+
+def get_sensor_placement(n_sensors, seed=42):
+    """Pojedynczy, powtarzalny scenariusz (wspólny dla skryptów badawczych)."""
+    return scenario_to_sensors(generate_scenarios(1, n_sensors, seed)[0])
+
+
+def scenario_file_path(n_scenarios, n_sensors, seed, cache_dir=SCENARIO_CACHE_DIR):
+    return os.path.join(cache_dir, f"scenarios_{n_sensors}s_{n_scenarios}n_seed{seed}.npy")
+
+
+def build_scenario_file(n_scenarios, n_sensors, seed=42, cache_dir=SCENARIO_CACHE_DIR):
+    """
+    Zwraca ścieżkę do pliku scenariuszy; generuje go tylko, jeśli nie istnieje.
+    Zapis przez plik tymczasowy + os.replace, więc równoległe procesy nie widzą
+    niedopisanego pliku.
+    """
+    path = scenario_file_path(n_scenarios, n_sensors, seed, cache_dir)
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, generate_scenarios(n_scenarios, n_sensors, seed))
+        os.replace(tmp_path, path)
+    return path
+
+
+def open_scenario_file(path):
+    """Otwiera plik scenariuszy przez mmap (tylko do odczytu)."""
+    return np.load(path, mmap_mode='r')
+
+
+def load_scenario(path, index):
+    """Scenariusz nr `index` z pliku jako lista sensorów."""
+    return scenario_to_sensors(open_scenario_file(path)[index])
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    t0 = time.perf_counter()
+    batch = generate_scenarios(10_000, 20, seed=1)
+    t_gen = time.perf_counter() - t0
+    print(f"Wygenerowano {len(batch)} scenariuszy x 20 sensorów w {t_gen*1000:.1f} ms")
+
+    valid = all(BodyModel.is_valid_position(x, y) for x, y in batch['pos'][:100].reshape(-1, 2))
+    same = np.array_equal(batch, generate_scenarios(10_000, 20, seed=1))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_scenario_file(10_000, 20, seed=1, cache_dir=tmp)
+        sensors = load_scenario(path, 1234)
+        print(f"Plik: {os.path.getsize(path) / 1e6:.1f} MB, scenariusz 1234 -> {len(sensors)} sensorów")
+        same_file = np.array_equal(open_scenario_file(path)[1234], batch[1234])
+
+    if valid and same and same_file:
+        print(">> SUKCES: Scenariusze poprawne i powtarzalne.")
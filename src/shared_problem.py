@@ -0,0 +1,136 @@
+import pickle
+from multiprocessing import shared_memory
+import numpy as np
+
+from src.fitness import WBANOptimizationProblem, STATIC_FIELDS
+
+# ==================================================================================
+# DANE PROBLEMU W PAMIĘCI WSPÓŁDZIELONEJ (PROCESY ROBOCZE BEZ KOPIOWANIA)
+# Proces główny pakuje tablice statyczne problemu (STATIC_FIELDS: pozycje,
+# wykładniki i przepływności sensorów, tablice łączy direct, zasięgi) w jeden
+# blok multiprocessing.shared_memory. Do procesów trafia tylko "uchwyt":
+# nazwa bloku, układ tablic (offset, kształt) i ustawienia problemu - kilkaset
+# bajtów zamiast listy słowników sensorów. Worker dołącza do bloku raz
+# (cache per proces) i buduje WBANOptimizationProblem na widokach tylko do
+# odczytu - bez przeliczania stref i łączy direct. Pole geodezyjne
+# (distance_model='geodesic') i tak jest mapowanym plikiem (src/geodesic.py).
+# ==================================================================================
+
+_ATTACHED = {}  # nazwa bloku -> (SharedMemory, problem) w bieżącym procesie
+
+
+def problem_config(problem):
+    """Ustawienia konstruktora odtwarzające problem (bez danych sensorów)."""
+    return {
+        'n_relays': problem.n_relays,
+        'routing': problem.routing,
+        'relay_capacity': dict(problem.relay_capacity),
+        'pruning': problem.pruning,
+        'delay_model': problem.delay_model,
+        'hub_pos': problem.hub_pos.tolist(),
+        'distance_model': problem.distance_model
+    }
+
+
+class SharedProblem:
+    """Właściciel bloku pamięci współdzielonej (proces główny); zwalnia go przy zamknięciu."""
+
+    def __init__(self, problem):
+        arrays = {name: np.ascontiguousarray(getattr(problem, name), dtype=np.float64) for name in STATIC_FIELDS}
+        layout, offset = {}, 0
+        for name, arr in arrays.items():
+            layout[name] = (offset, arr.shape)
+            offset += arr.nbytes
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, arr in arrays.items():
+            start, shape = layout[name]
+            np.ndarray(shape, dtype=np.float64, buffer=self.shm.buf, offset=start)[...] = arr
+        self.handle = {'shm_name': self.shm.name, 'layout': layout, 'config': problem_config(problem)}
+
+    def close(self):
+        """Zwalnia blok; problem z attach_problem w tym procesie przestaje być ważny."""
+        if self.shm is not None:
+            attached = _ATTACHED.pop(self.shm.name, None)
+            if attached is not None:
+                attached[0].close()
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_problem(handle):
+    """Problem zbudowany na pamięci współdzielonej (jeden raz na proces i blok)."""
+    entry = _ATTACHED.get(handle['shm_name'])
+    if entry is None:
+        shm = shared_memory.SharedMemory(name=handle['shm_name'])
+        static = {}
+        for name, (start, shape) in handle['layout'].items():
+            view = np.ndarray(shape, dtype=np.float64, buffer=shm.buf, offset=start)
+            view.flags.writeable = False
+            static[name] = view
+        entry = (shm, WBANOptimizationProblem(static=static, **handle['config']))
+        _ATTACHED[handle['shm_name']] = entry
+    return entry[1]
+
+
+def detach_all():
+    """Odłącza bloki w bieżącym procesie - zwrócone wcześniej problemy nie mogą być już używane."""
+    for shm, _ in _ATTACHED.values():
+        shm.close()
+    _ATTACHED.clear()
+
+
+def evaluate_chunk(handle, population):
+    """Zadanie dla puli procesów: funkcja celu fragmentu populacji."""
+    return attach_problem(handle).evaluate_population(population)
+
+
+def parallel_evaluate(shared, population, pool, n_chunks=None):
+    """Ocena populacji (N, 2R) w puli (concurrent.futures/multiprocessing) - do zadań idzie tylko uchwyt."""
+    n_chunks = n_chunks or getattr(pool, '_max_workers', None) or 1
+    chunks = np.array_split(np.asarray(population, dtype=float), n_chunks)
+    futures = [pool.submit(evaluate_chunk, shared.handle, chunk) for chunk in chunks if len(chunk)]
+    return np.concatenate([f.result() for f in futures])
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from src.body_model import BodyModel
+    from src.scenarios import get_sensor_placement
+
+    sensors = get_sensor_placement(40, seed=40)
+    problem = WBANOptimizationProblem(n_relays=3, custom_sensors=sensors, routing='capacitated')
+    rng = np.random.default_rng(0)
+    population = BodyModel.get_random_valid_positions(3 * 600, rng).reshape(600, 6)
+    reference = problem.evaluate_population(population)
+
+    with SharedProblem(problem) as shared:
+        size_problem = len(pickle.dumps(problem))
+        size_handle = len(pickle.dumps(shared.handle))
+
+        t0 = time.perf_counter()
+        for _ in range(20):
+            WBANOptimizationProblem(n_relays=3, custom_sensors=sensors, routing='capacitated')
+        t_build = (time.perf_counter() - t0) / 20
+        t0 = time.perf_counter()
+        local = attach_problem(shared.handle)
+        t_attach = time.perf_counter() - t0
+
+        local_fitness = local.evaluate_population(population)
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            parallel = parallel_evaluate(shared, population, pool, n_chunks=6)
+
+    print(f"Zadanie: uchwyt {size_handle} B vs pickle problemu {size_problem} B")
+    print(f"Budowa problemu: {t_build * 1000:.2f} ms, dołączenie do bloku: {t_attach * 1000:.2f} ms")
+    same = np.array_equal(parallel, reference) and np.array_equal(local_fitness, reference)
+    print(f"Zgodność z evaluate_population: {same}")
+    if same and size_handle < size_problem:
+        print(">> SUKCES: Dane problemu współdzielone bez kopiowania, wynik identyczny.")
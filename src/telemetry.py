@@ -0,0 +1,213 @@
+import json
+import os
+import socket
+import sys
+import time
+import numpy as np
+
+# ==================================================================================
+# TELEMETRIA NA ŻYWO (JSON-LINES) DLA DŁUGICH PRZEGLĄDÓW
+# Każdy proces (runner, worker kolejki) dopisuje zdarzenia jako pojedyncze linie JSON:
+#   {"ts": ..., "source": "host:pid", "event": "epoch" | "trial" | "queue" | ..., "rss_mb": ..., ...}
+# (bez /proc, np. macOS: "rss_peak_mb" - szczyt pamięci z getrusage zamiast bieżącej)
+# Cel: plik (dopisywanie O_APPEND - wiele procesów w jednym pliku) albo "udp://host:port"
+# (datagram na linię, odbiór: monitor_telemetry.py --listen). Zdarzenia tego samego
+# rodzaju i klucza są ograniczone do jednego na MIN_INTERVAL_S, więc koszt jest
+# stały niezależnie od liczby epok. Agregacja (summarize) wskazuje procesy wolniejsze
+# od mediany (STRAGGLER) i milczące (SILENT).
+# ==================================================================================
+
+TELEMETRY_FILE = "WBAN_Telemetry.jsonl"
+MIN_INTERVAL_S = 2.0     # Maks. jedno zdarzenie danego rodzaju/klucza na tyle sekund
+STRAGGLER_RATIO = 0.5    # Wolniej niż ułamek mediany ewaluacji/s -> STRAGGLER
+SILENT_AFTER_S = 60.0    # Brak zdarzeń dłużej niż tyle sekund -> SILENT
+
+
+def memory_fields():
+    """
+    Pamięć procesu [MB]: {'rss_mb': bieżąca} z /proc (Linux), inaczej {'rss_peak_mb': szczyt}
+    z getrusage - ru_maxrss jest w KiB na Linuksie, ale w bajtach na macOS.
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return {'rss_mb': round(int(line.split()[1]) / 1024.0, 1)}
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'rss_peak_mb': round(peak / (1024.0 ** 2 if sys.platform == 'darwin' else 1024.0), 1)}
+
+
+class Telemetry:
+
+    def __init__(self, target=None, min_interval_s=MIN_INTERVAL_S, source=None):
+        """target: ścieżka pliku, 'udp://host:port' albo None (telemetria wyłączona)."""
+        self.target = target
+        self.min_interval_s = min_interval_s
+        self.source = source or f"{socket.gethostname()}:{os.getpid()}"
+        self._last = {}
+        self._file = None
+        self._sock = None
+        if target is None:
+            return
+        if target.startswith('udp://'):
+            host, _, port = target[len('udp://'):].rpartition(':')
+            self._addr = (host or '127.0.0.1', int(port))
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        else:
+            self._file = open(target, 'a', buffering=1)
+
+    @property
+    def enabled(self):
+        return self.target is not None
+
+    def emit(self, event, key=None, force=False, **fields):
+        """
+        Zapisuje zdarzenie, jeśli od poprzedniego (event, key) minęło min_interval_s
+        (force=True - zawsze). Zwraca True, gdy zdarzenie zostało wysłane.
+        """
+        if not self.enabled:
+            return False
+        now = time.time()
+        if not force and now - self._last.get((event, key), -np.inf) < self.min_interval_s:
+            return False
+        self._last[(event, key)] = now
+
+        record = {'ts': round(now, 3), 'source': self.source, 'event': event, **memory_fields(), **fields}
+        line = json.dumps(record, default=float) + "\n"
+        if self._sock is not None:
+            self._sock.sendto(line.encode(), self._addr)
+        else:
+            self._file.write(line)
+        return True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._sock is not None:
+            self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_telemetry(model, telemetry, trial, **labels):
+    """
+    Podpina do modelu mealpy zdarzenia 'epoch' (ograniczone częstotliwościowo):
+    epoka, epoki/s i ewaluacje/s od poprzedniego zdarzenia, bieżące najlepsze.
+    Ostatnia epoka wysyłana zawsze.
+    """
+    if not telemetry.enabled:
+        return
+    original_step = model.track_optimize_step
+    last = {'t': time.time(), 'epoch': 0, 'nfe': 0}
+
+    def track_optimize_step(pop=None, epoch=None, runtime=None):
+        original_step(pop, epoch, runtime)
+        now = time.time()
+        dt = max(now - last['t'], 1e-9)
+        fields = dict(trial=trial, epoch=epoch, epochs=model.epoch,
+                      epochs_per_s=(epoch - last['epoch']) / dt,
+                      evals_per_s=(model.nfe_counter - last['nfe']) / dt,
+                      best=float(model.g_best.target.fitness), **labels)
+        if telemetry.emit('epoch', key=trial, force=epoch == model.epoch, **fields):
+            last.update(t=now, epoch=epoch, nfe=model.nfe_counter)
+
+    model.track_optimize_step = track_optimize_step
+
+
+# ------------------------------------------------------------------
+# ODCZYT I AGREGACJA
+# ------------------------------------------------------------------
+
+def read_events(path, offset=0):
+    """Zdarzenia z pliku od pozycji `offset` (tylko pełne linie). Zwraca (zdarzenia, nowy offset)."""
+    events = []
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return events, offset
+    end = data.rfind(b"\n") + 1
+    for line in data[:end].splitlines():
+        try:
+            events.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return events, offset + end
+
+
+def summarize(events, now=None):
+    """
+    Stan per proces (source) z ostatnich zdarzeń: tabela pandas z kolumnami
+    Source, Last_Seen_s, Trials_Done, Trial, Epoch, Evals_per_s, Best, RSS_MB, RSS_Peak_MB, Queue, Status
+    (RSS_Peak_MB - procesy bez /proc, które raportują tylko szczyt pamięci).
+    """
+    import pandas as pd
+
+    now = time.time() if now is None else now
+    state = {}
+    for e in events:
+        s = state.setdefault(e['source'], {'Source': e['source'], 'Trials_Done': 0, 'Trial': None, 'Epoch': None,
+                                           'Evals_per_s': np.nan, 'Best': np.nan, 'Queue': None})
+        s['Last_Seen_s'] = now - e['ts']
+        s['RSS_MB'] = e.get('rss_mb', np.nan)
+        s['RSS_Peak_MB'] = e.get('rss_peak_mb', np.nan)
+        if e['event'] == 'epoch':
+            s.update(Trial=e['trial'], Epoch=f"{e['epoch']}/{e['epochs']}", Evals_per_s=e['evals_per_s'])
+            s['Best'] = np.nanmin([s['Best'], e['best']])
+        elif e['event'] == 'trial':
+            s['Trials_Done'] += 1
+            s['Best'] = np.nanmin([s['Best'], e['fitness']])
+        elif e['event'] == 'queue':
+            s['Queue'] = f"{e['pending']} oczek. / {e['running']} w toku / {e['done']} gotowe"
+
+    table = pd.DataFrame(list(state.values()), columns=['Source', 'Last_Seen_s', 'Trials_Done', 'Trial', 'Epoch',
+                                                        'Evals_per_s', 'Best', 'RSS_MB', 'RSS_Peak_MB', 'Queue'])
+    median_rate = table['Evals_per_s'].median()
+    status = np.where(table['Last_Seen_s'] > SILENT_AFTER_S, 'SILENT',
+                      np.where(table['Evals_per_s'] < STRAGGLER_RATIO * median_rate, 'STRAGGLER', 'OK'))
+    return table.assign(Status=status)
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import tempfile
+    from src.optimizers import get_algorithm, build_problem_dict
+    from src.fitness import WBANOptimizationProblem
+    from src.scenarios import get_sensor_placement
+
+    problem = WBANOptimizationProblem(n_relays=2, custom_sensors=get_sensor_placement(8, seed=8))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, TELEMETRY_FILE)
+        with Telemetry(path, min_interval_s=0.05) as tel:
+            model = get_algorithm('GA')(epoch=200, pop_size=20)
+            attach_telemetry(model, tel, trial='GA:1', algorithm='GA')
+            t0 = time.time()
+            res = model.solve(build_problem_dict(problem), seed=1)
+            tel.emit('trial', force=True, trial='GA:1', fitness=float(res.target.fitness),
+                     time_s=time.time() - t0)
+        # Drugi proces z ułamkiem przepustowości pierwszego
+        with Telemetry(path, source='node-b:1') as other:
+            other.emit('epoch', trial='PSO:1', epoch=5, epochs=200, epochs_per_s=1.0, evals_per_s=1.0, best=9.9)
+
+        events, offset = read_events(path)
+        with open(path, 'a') as f:
+            f.write('{"ts": 1, "sou')  # niedokończona linia piszącego procesu
+        more, offset_after = read_events(path, offset)
+        table = summarize(events, now=time.time())
+        print(table.drop(columns=['Queue']).round(2).to_string(index=False))
+
+        n_epoch = sum(e['event'] == 'epoch' for e in events if e['source'] != 'node-b:1')
+        last = [e for e in events if e['event'] == 'epoch'][-2]
+        print(f"Zdarzeń 'epoch': {n_epoch} na 200 epok, ostatnia epoka: {last['epoch']}")
+        if (1 < n_epoch < 200 and last['epoch'] == 200 and not more and offset_after == offset
+                and list(table['Status']) == ['OK', 'STRAGGLER']):
+            print(">> SUKCES: Telemetria ograniczona częstotliwościowo, agregacja wskazuje maruderów.")
@@ -0,0 +1,186 @@
+import hashlib
+import importlib.metadata
+import json
+import os
+import time
+import numpy as np
+
+from src import physics, fitness, body_model, mac, multihop, geodesic
+from src.optimizers import ALGORITHMS, get_algorithm, build_problem_dict
+from src.convergence import attach_eval_counter, history_curves
+from src.telemetry import attach_telemetry
+
+# ==================================================================================
+# CACHE PRÓB ADRESOWANY TREŚCIĄ (WSPÓLNY DLA SKRYPTÓW BADAWCZYCH)
+# Klucz próby = SHA-256 z kanonicznego JSON-a:
+#   układ sensorów + hub + ustawienia problemu, stałe fizyczne i wagi (moduły src),
+#   algorytm (klasa mealpy + wersja), hiperparametry, ziarno.
+# Wynik solve (rozwiązanie, fitness, czas, krzywe) to jeden plik JSON
+# WBAN_Cache/<2 znaki>/<klucz>.json, zapisywany atomowo (tmp + os.replace),
+# więc cache może współdzielić wiele procesów i maszyn (np. workery kolejki).
+# Zmiana dowolnej stałej modelu daje nowy klucz - stare wyniki nie są używane.
+# ==================================================================================
+
+CACHE_DIR = "WBAN_Cache"
+CACHE_VERSION = 1  # Podbić przy zmianie semantyki wyniku (nie wynikającej ze stałych)
+
+# Moduły, których stałe (nazwy WIELKIMI LITERAMI) wpływają na wartość funkcji celu
+MODEL_MODULES = (physics, fitness, body_model, mac, multihop, geodesic)
+
+
+def _jsonable(value):
+    """Konwersja typów numpy dla json.dumps."""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Nieobsługiwany typ w kluczu cache: {type(value).__name__}")
+
+
+def model_constants():
+    """Stałe modułowe modelu (liczby, napisy, słowniki, tablice) - część klucza."""
+    constants = {}
+    for module in MODEL_MODULES:
+        for name, value in vars(module).items():
+            if name.isupper() and isinstance(value, (int, float, str, tuple, list, dict, np.ndarray)):
+                constants[f"{module.__name__}.{name}"] = value
+    return constants
+
+
+def problem_fingerprint(problem):
+    """Wszystko, co określa funkcję celu konkretnej instancji WBANOptimizationProblem."""
+    return {
+        'sensor_pos': problem.sensor_pos,
+        'data_rates': problem.data_rates,
+        'hub_pos': problem.hub_pos,
+        'n_relays': problem.n_relays,
+        'bounds': [problem.lb, problem.ub],
+        'routing': problem.routing,
+        'relay_capacity': problem.relay_capacity,
+        'delay_model': problem.delay_model,
+        'distance_model': problem.distance_model,
+        'constants': model_constants()
+    }
+
+
+def trial_key(problem, algorithm, hyperparams, seed, extra=None):
+    """
+    Klucz próby (hex SHA-256). `extra` - dodatkowe składniki (np. inna funkcja celu
+    niż problem.fitness_function), żeby różne warianty nie dzieliły wyników.
+    """
+    payload = {
+        'version': CACHE_VERSION,
+        'problem': problem_fingerprint(problem),
+        'algorithm': [algorithm, *ALGORITHMS[algorithm], importlib.metadata.version('mealpy')],
+        'hyperparams': hyperparams,
+        'seed': seed,
+        'extra': extra
+    }
+    text = json.dumps(payload, sort_keys=True, default=_jsonable)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class TrialCache:
+
+    def __init__(self, directory=CACHE_DIR, enabled=True):
+        self.directory = directory
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Wynik zapisany pod kluczem albo None."""
+        if not self.enabled:
+            return None
+        try:
+            with open(self.path(key)) as f:
+                result = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        if not self.enabled:
+            return
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(result, f, default=_jsonable)
+        os.replace(tmp_path, path)
+
+
+def cached_solve(problem, algorithm, hyperparams, seed, cache=None, problem_dict=None, extra=None,
+                 telemetry=None, trial=None):
+    """
+    Jedno uruchomienie mealpy z cache. `hyperparams` trafiają do konstruktora
+    algorytmu (epoch, pop_size, ...), `seed` do solve - próba jest powtarzalna.
+    Zwraca słownik: solution, fitness, time_s (czas pierwotnego obliczenia), curves.
+    `telemetry` (src/telemetry.py) dostaje zdarzenia 'epoch' i 'trial' z etykietą `trial`.
+    """
+    trial = trial or f"{algorithm}:{seed}"
+    key = trial_key(problem, algorithm, hyperparams, seed, extra) if cache is not None else None
+    if key is not None:
+        result = cache.get(key)
+        if result is not None:
+            if telemetry is not None:
+                telemetry.emit('trial', force=True, trial=trial, algorithm=algorithm, fitness=result['fitness'],
+                               time_s=0.0, cached=True)
+            return result
+
+    model = get_algorithm(algorithm)(**hyperparams)
+    eval_counts = attach_eval_counter(model)
+    if telemetry is not None:
+        attach_telemetry(model, telemetry, trial, algorithm=algorithm)
+    t0 = time.time()
+    res = model.solve(problem_dict or build_problem_dict(problem), seed=seed)
+    t_exec = time.time() - t0
+
+    result = {
+        'solution': [float(v) for v in res.solution],
+        'fitness': float(res.target.fitness),
+        'time_s': t_exec,
+        'curves': history_curves(model, eval_counts)
+    }
+    if key is not None:
+        cache.put(key, result)
+    if telemetry is not None:
+        telemetry.emit('trial', force=True, trial=trial, algorithm=algorithm, fitness=result['fitness'],
+                       time_s=t_exec, cached=False)
+    return result
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import tempfile
+    from src.scenarios import get_sensor_placement
+
+    problem = fitness.WBANOptimizationProblem(n_relays=2, custom_sensors=get_sensor_placement(8, seed=8))
+    params = {'epoch': 10, 'pop_size': 10}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TrialCache(tmp)
+        first = cached_solve(problem, 'GA', params, seed=3, cache=cache)
+        t0 = time.time()
+        again = cached_solve(problem, 'GA', params, seed=3, cache=cache)
+        t_hit = time.time() - t0
+        fresh = cached_solve(problem, 'GA', params, seed=3)
+
+        # Ten sam problem zbudowany od nowa -> ten sam klucz; zmiana wagi -> inny klucz
+        same_key = trial_key(problem, 'GA', params, 3) == trial_key(
+            fitness.WBANOptimizationProblem(n_relays=2, custom_sensors=get_sensor_placement(8, seed=8)),
+            'GA', params, 3)
+        key_before = trial_key(problem, 'GA', params, 3)
+        fitness.WEIGHTS['energy'] += 0.1
+        changed = trial_key(problem, 'GA', params, 3) != key_before
+        fitness.WEIGHTS['energy'] -= 0.1
+
+        print(f"Fitness: {first['fitness']:.6f} (cache: {again['fitness']:.6f}, ponownie: {fresh['fitness']:.6f})")
+        print(f"Trafienia: {cache.hits}, chybienia: {cache.misses}, odczyt z cache: {t_hit*1000:.2f} ms")
+        if again == first and fresh['solution'] == first['solution'] and same_key and changed:
+            print(">> SUKCES: Próby powtarzalne, powtórka z cache, zmiana stałych unieważnia klucz.")
@@ -1,12 +1,11 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import numpy as np
 from src.body_model import ALLOWED_ZONES, LANDMARKS
 from src.fitness import FIXED_SENSORS, HUB_POS
 from src.physics import WBANPhysics
 
 # --- KONFIGURACJA STYLU IEEE / NAUKOWEGO ---
-plt.rcParams.update({
+# matplotlib ładujemy dopiero przy pierwszym rysowaniu (szybki start workerów)
+IEEE_STYLE = {
     'font.family': 'serif',          # Czcionka szeryfowa (jak w LaTeX/Word)
     'font.size': 11,
     'axes.labelsize': 12,
@@ -17,12 +16,24 @@ plt.rcParams.update({
     'figure.dpi': 300,               # Wysoka rozdzielczość do druku
     'lines.linewidth': 1.5,
     'lines.markersize': 8
-})
+}
+
+_plt = None
+
+def get_pyplot():
+    """Leniwy import matplotlib.pyplot + jednorazowe ustawienie stylu."""
+    global _plt
+    if _plt is None:
+        import matplotlib.pyplot as plt
+        plt.rcParams.update(IEEE_STYLE)
+        _plt = plt
+    return _plt
 
 def plot_convergence(history, algorithm_name="PSO"):
     """
     Rysuje wykres zbieżności w stylu naukowym.
     """
+    plt = get_pyplot()
     global_bests = history.list_global_best_fit
     epochs = range(1, len(global_bests) + 1)
 
@@ -44,104 +55,233 @@ def plot_convergence(history, algorithm_name="PSO"):
     print(f"[INFO] Wykres zbieżności zapisano jako: {filename}")
     plt.close()
 
-def plot_body_simulation(relays_pos, active_paths=None, title="WBAN Topology Optimization"):
-    """
-    Rysuje mapę ciała i topologię sieci w stylu naukowym.
-    """
-    fig, ax = plt.subplots(figsize=(7, 10)) # Format pionowy
-    
-    # 1. Rysuj Strefy (Tło) - Używamy odcieni szarości dla czytelności w druku
-    # 'type': color
-    zone_colors = {'LOS': '#f0f0f0', 'NLOS': '#e0e0e0', 'Torso': '#d0d0d0'}
-    
-    # Dodajemy legendę stref ręcznie, żeby uniknąć duplikatów
-    added_zone_labels = set()
+# Style elementów topologii (wspólne dla mapy, animacji i arkusza miniatur)
+ZONE_COLORS = {'LOS': '#f0f0f0', 'NLOS': '#e0e0e0', 'Torso': '#d0d0d0'}
+PATH_STYLES = {
+    'Direct': {'linestyle': ':', 'color': '#444444', 'linewidth': 1.0, 'label': 'Direct Path'},  # Kropkowana
+    'Relay':  {'linestyle': '-', 'color': 'black', 'linewidth': 1.5, 'label': 'Relayed Path'}    # Ciągła
+}
+SENSOR_LABEL_LIMIT = 30  # Powyżej tej liczby sensorów pomijamy podpisy (tekst jest najdroższy)
 
+
+def draw_body_zones(ax, zone_names=True):
+    """Tło: strefy ciała (odcienie szarości dla czytelności w druku), legenda bez duplikatów."""
+    import matplotlib.patches as patches
+    added_zone_labels = set()
     for name, data in ALLOWED_ZONES.items():
         b = data['bounds']
         width = b[1] - b[0]
         height = b[3] - b[2]
-        
-        z_type = data['type']
-        label = f"Zone: {z_type}"
-        
-        # Logika unikania duplikatów w legendzie
-        if label in added_zone_labels:
-            lbl_arg = "_nolegend_"
-        else:
-            lbl_arg = label
-            added_zone_labels.add(label)
-
-        rect = patches.Rectangle((b[0], b[2]), width, height, 
-                                 linewidth=0.5, edgecolor='gray', 
-                                 facecolor=zone_colors.get(z_type, 'white'), 
-                                 alpha=0.6, label=lbl_arg)
-        ax.add_patch(rect)
-        
-        # Nazwa strefy na wykresie (mała czcionka)
-        ax.text(b[0] + width/2, b[2] + height/2, name.replace("_", "\n"), 
-                ha='center', va='center', fontsize=6, color='#555555')
-
-    # 2. Rysuj Hub (Sink)
-    ax.scatter(HUB_POS[0], HUB_POS[1], c='black', s=150, marker='P', label='HUB (Sink)', zorder=10)
-    
-    # 3. Rysuj Sensory
-    added_sensor_label = False
-    for s in FIXED_SENSORS:
-        pos = s['pos']
-        lbl = 'Medical Sensor' if not added_sensor_label else "_nolegend_"
-        ax.scatter(pos[0], pos[1], c='white', s=80, marker='o', edgecolors='black', linewidth=1.5, zorder=9, label=lbl)
-        added_sensor_label = True
-        # Podpis sensora
-        ax.text(pos[0]+3, pos[1], s['name'].replace("_", " "), fontsize=8, color='black', verticalalignment='center')
-
-    # 4. Rysuj Relaye (Cluster Heads)
-    for i, pos in enumerate(relays_pos):
-        lbl = 'Optimized Relay (CH)' if i == 0 else "_nolegend_"
-        ax.scatter(pos[0], pos[1], c='black', s=120, marker='^', zorder=11, label=lbl)
-        ax.text(pos[0]+3, pos[1], f"CH-{i+1}", fontsize=9, fontweight='bold', color='black', verticalalignment='center')
-
-    # 5. Rysuj Połączenia (Active Paths)
-    if active_paths:
-        added_direct = False
-        added_relay = False
-        
-        for path in active_paths:
-            p_from = path['from']
-            p_to = path['to']
-            p_type = path['type']
-            
-            if p_type == 'Direct':
-                style = ':' # Kropkowana dla Direct
-                color = '#444444'
-                width = 1.0
-                lbl = 'Direct Path' if not added_direct else "_nolegend_"
-                if not added_direct: added_direct = True
-            else:
-                style = '-' # Ciągła dla Relay
-                color = 'black'
-                width = 1.5
-                lbl = 'Relayed Path' if not added_relay else "_nolegend_"
-                if not added_relay: added_relay = True
-            
-            ax.plot([p_from[0], p_to[0]], [p_from[1], p_to[1]], 
-                    linestyle=style, color=color, linewidth=width, alpha=0.7, zorder=5, label=lbl)
+        label = f"Zone: {data['type']}"
+        lbl_arg = "_nolegend_" if label in added_zone_labels else label
+        added_zone_labels.add(label)
+
+        ax.add_patch(patches.Rectangle((b[0], b[2]), width, height, linewidth=0.5, edgecolor='gray',
+                                       facecolor=ZONE_COLORS.get(data['type'], 'white'), alpha=0.6, label=lbl_arg))
+        if zone_names:
+            # Nazwa strefy na wykresie (mała czcionka)
+            ax.text(b[0] + width/2, b[2] + height/2, name.replace("_", "\n"),
+                    ha='center', va='center', fontsize=6, color='#555555')
 
-    # Konfiguracja osi
     ax.set_xlim(0, 100)
     ax.set_ylim(0, 180)
     ax.set_aspect('equal')
+
+
+def path_segments(active_paths):
+    """Trasy z get_routing_details -> {'Direct': (N, 2, 2), 'Relay': (M, 2, 2)} dla LineCollection."""
+    segments = {kind: [] for kind in PATH_STYLES}
+    for path in active_paths or []:
+        segments['Direct' if path['type'] == 'Direct' else 'Relay'].append((path['from'], path['to']))
+    return {kind: np.array(seg, dtype=float).reshape(-1, 2, 2) for kind, seg in segments.items()}
+
+
+class TopologyRenderer:
+    """
+    Topologia w kilku artystach matplotlib: jedna LineCollection na typ ścieżki
+    i po jednym scatterze na hub, sensory i relaye. draw() tylko podmienia dane
+    (segmenty, offsety), więc ta sama figura służy do kolejnych klatek.
+    """
+
+    def __init__(self, ax=None, sensors=None, labels=True, figsize=(7, 10), marker_scale=1.0):
+        plt = get_pyplot()
+        from matplotlib.collections import LineCollection
+        if ax is None:
+            self.fig, ax = plt.subplots(figsize=figsize)  # Format pionowy
+        else:
+            self.fig = ax.figure
+        self.ax = ax
+        self.labels = labels
+        self.sensors = FIXED_SENSORS if sensors is None else sensors
+
+        draw_body_zones(ax, zone_names=labels)
+        k = marker_scale
+        self.hub = ax.scatter([], [], c='black', s=150 * k, marker='P', label='HUB (Sink)', zorder=10)
+        self.sensor_dots = ax.scatter([], [], c='white', s=80 * k, marker='o', edgecolors='black',
+                                      linewidth=1.5 * np.sqrt(k), zorder=9, label='Medical Sensor')
+        self.relay_dots = ax.scatter([], [], c='black', s=120 * k, marker='^', zorder=11, label='Optimized Relay (CH)')
+        self.lines = {}
+        for kind, style in PATH_STYLES.items():
+            self.lines[kind] = LineCollection([], alpha=0.7, zorder=5, **style)
+            ax.add_collection(self.lines[kind])
+        self.title = ax.set_title("", pad=15 if labels else 4, fontsize=None if labels else 8)
+        self._texts = []
+
+    def draw(self, relays_pos, active_paths=None, hub_pos=None, title=None, sensor_pos=None):
+        """sensor_pos - położenia sensorów klatki (problem.sensor_pos); domyślnie z listy self.sensors."""
+        hub_pos = HUB_POS if hub_pos is None else hub_pos
+        relays = np.asarray(relays_pos, dtype=float).reshape(-1, 2)
+        if sensor_pos is None:
+            sensor_pos = [s['pos'] for s in self.sensors]
+        sensor_pos = np.asarray(sensor_pos, dtype=float).reshape(-1, 2)
+
+        self.hub.set_offsets(np.asarray(hub_pos, dtype=float).reshape(1, 2))
+        self.sensor_dots.set_offsets(sensor_pos)
+        self.relay_dots.set_offsets(relays)
+        for kind, segments in path_segments(active_paths).items():
+            self.lines[kind].set_segments(segments)
+        if title is not None:
+            self.title.set_text(title)
+
+        for text in self._texts:
+            text.remove()
+        self._texts = []
+        if self.labels and len(sensor_pos) <= SENSOR_LABEL_LIMIT:
+            # Podpisy sensorów (nazwy z self.sensors, jeśli pasują do klatki) i relayów
+            names = [s['name'] for s in self.sensors] if len(self.sensors) == len(sensor_pos) else []
+            for name, pos in zip(names, sensor_pos):
+                self._texts.append(self.ax.text(pos[0]+3, pos[1], name.replace("_", " "), fontsize=8,
+                                                color='black', verticalalignment='center'))
+            for i, pos in enumerate(relays):
+                self._texts.append(self.ax.text(pos[0]+3, pos[1], f"CH-{i+1}", fontsize=9, fontweight='bold',
+                                                color='black', verticalalignment='center'))
+        return [self.hub, self.sensor_dots, self.relay_dots, *self.lines.values(), self.title, *self._texts]
+
+
+def plot_body_simulation(relays_pos, active_paths=None, title="WBAN Topology Optimization", hub_pos=None,
+                         sensors=None, output_path="simulation_result_IEEE.png", dpi=300, sensor_pos=None):
+    """
+    Rysuje mapę ciała i topologię sieci w stylu naukowym.
+    hub_pos - położenie huba, jeśli inne niż HUB_POS (wspólna optymalizacja hub + relaye).
+    sensors - lista sensorów (słowniki jak FIXED_SENSORS), domyślnie FIXED_SENSORS.
+    sensor_pos - położenia sensorów (np. problem.sensor_pos lub frame['sensor_pos']) - mają
+                 pierwszeństwo przed `sensors`, jak w render_animation.
+    """
+    plt = get_pyplot()
+    renderer = TopologyRenderer(sensors=sensors)
+    ax = renderer.ax
+    renderer.draw(relays_pos, active_paths, hub_pos=hub_pos, title=title, sensor_pos=sensor_pos)
+
+    # Konfiguracja osi
     ax.set_xlabel("Body Width X [cm]")
     ax.set_ylabel("Body Height Y [cm]")
-    ax.set_title(title, pad=15)
-    
-    # Legenda na dole, pozioma
-    ax.legend(loc='lower center', bbox_to_anchor=(0.5, -0.15), ncol=2, frameon=False, fontsize=9)
-    
+
+    # Legenda na dole, pozioma (tylko typy ścieżek obecne na mapie)
+    handles, labels = ax.get_legend_handles_labels()
+    shown = [(h, l) for h, l in zip(handles, labels)
+             if not any(l == style['label'] and len(renderer.lines[k].get_segments()) == 0
+                        for k, style in PATH_STYLES.items())]
+    ax.legend(*zip(*shown), loc='lower center', bbox_to_anchor=(0.5, -0.15), ncol=2, frameon=False, fontsize=9)
+
     # Grid
     ax.grid(True, linestyle=':', alpha=0.6)
-    
-    output_path = "simulation_result_IEEE.png"
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+
+    plt.savefig(output_path, dpi=dpi, bbox_inches='tight')
     print(f"[INFO] Mapa topologii zapisana jako: {output_path}")
-    plt.close()
\ No newline at end of file
+    plt.close(renderer.fig)
+
+
+# ==============================================================================
+# WIELE ROZWIĄZAŃ: KLATKI, ANIMACJA, ARKUSZ MINIATUR
+# ==============================================================================
+def solution_frame(problem, solution_vector, title=None):
+    """Klatka (relaye, trasy, sensory, hub, tytuł) dla rozwiązania problemu."""
+    return {
+        'relays': np.asarray(solution_vector, dtype=float).reshape(-1, 2),
+        'paths': problem.get_routing_details(solution_vector),
+        'sensor_pos': problem.sensor_pos,
+        'hub_pos': problem.hub_pos,
+        'title': title
+    }
+
+
+def epoch_frames(problem, model, every=1):
+    """Klatki z najlepszych rozwiązań kolejnych epok (model mealpy po solve)."""
+    bests = model.history.list_global_best
+    return [solution_frame(problem, agent.solution, f"Epoch {i} | fitness {agent.target.fitness:.4f}")
+            for i, agent in enumerate(bests) if i % every == 0 or i == len(bests) - 1]
+
+
+THUMBNAIL_MARKER_SCALE = 0.25  # Mniejsze markery w animacji i miniaturach
+
+
+def render_animation(frames, output_path="topology_evolution.gif", fps=5, dpi=100, sensors=None):
+    """
+    Animacja klatek na jednej, ponownie używanej figurze (.gif - Pillow, inne - ffmpeg).
+    Sensory rysowane z klatki ('sensor_pos'); `sensors` tylko dla klatek bez tego pola.
+    """
+    plt = get_pyplot()
+    from matplotlib.animation import FuncAnimation, PillowWriter, FFMpegWriter
+
+    renderer = TopologyRenderer(sensors=sensors, labels=False, figsize=(4, 6), marker_scale=THUMBNAIL_MARKER_SCALE)
+    anim = FuncAnimation(renderer.fig, lambda k: renderer.draw(frames[k]['relays'], frames[k]['paths'],
+                                                              frames[k].get('hub_pos'), frames[k].get('title'),
+                                                              frames[k].get('sensor_pos')),
+                         frames=len(frames), blit=False)
+    writer = PillowWriter(fps=fps) if output_path.endswith('.gif') else FFMpegWriter(fps=fps)
+    anim.save(output_path, writer=writer, dpi=dpi)
+    plt.close(renderer.fig)
+    print(f"[INFO] Animacja ({len(frames)} klatek) zapisana jako: {output_path}")
+
+
+def render_contact_sheet(frames, output_path="topology_contact_sheet.png", ncols=4, dpi=150, sensors=None):
+    """Siatka miniatur topologii (np. wyniki wielu prób) w jednej figurze; sensory z klatek jak w render_animation."""
+    plt = get_pyplot()
+    nrows = int(np.ceil(len(frames) / ncols))
+    fig, axes = plt.subplots(nrows, ncols, figsize=(2.2 * ncols, 3.6 * nrows), squeeze=False)
+    for ax, frame in zip(axes.ravel(), frames):
+        renderer = TopologyRenderer(ax, sensors=sensors, labels=False, marker_scale=THUMBNAIL_MARKER_SCALE)
+        renderer.draw(frame['relays'], frame['paths'], frame.get('hub_pos'), frame.get('title'),
+                      frame.get('sensor_pos'))
+        ax.set_xticks([])
+        ax.set_yticks([])
+    for ax in axes.ravel()[len(frames):]:
+        ax.set_axis_off()
+    fig.tight_layout()
+    fig.savefig(output_path, dpi=dpi)
+    plt.close(fig)
+    print(f"[INFO] Arkusz {len(frames)} topologii zapisany jako: {output_path}")
+
+
+# ==============================================================================
+# KRAJOBRAZ JEDNEGO RELAYA (src/landscape.py)
+# ==============================================================================
+def plot_landscape(landscape, metric='Energy_J', output_path="landscape_energy.png", dpi=300, sensors=None,
+                   hub_pos=None):
+    """Mapa cieplna metryki krajobrazu (komórki kolizyjne puste) na tle stref, z sensorami i hubem."""
+    plt = get_pyplot()
+    fig, ax = plt.subplots(figsize=(7, 10))
+    draw_body_zones(ax, zone_names=False)
+
+    values = np.asarray(landscape.metric(metric))[landscape.feasible]
+    vmin, vmax = (np.nanmin(values), np.nanmax(values)) if len(values) else (0.0, 1.0)
+    for zone_name in ALLOWED_ZONES:
+        image, extent = landscape.zone_image(zone_name, metric)
+        im = ax.imshow(image, extent=extent, origin='lower', cmap='viridis', vmin=vmin, vmax=vmax,
+                       interpolation='nearest', zorder=2)
+
+    sensors = FIXED_SENSORS if sensors is None else sensors
+    pos = np.array([s['pos'] for s in sensors], dtype=float)
+    hub = np.asarray(HUB_POS if hub_pos is None else hub_pos, dtype=float)
+    ax.scatter(pos[:, 0], pos[:, 1], c='white', s=40, marker='o', edgecolors='black', zorder=9,
+               label='Medical Sensor')
+    ax.scatter(*hub, c='black', s=150, marker='P', zorder=10, label='HUB (Sink)')
+    fig.colorbar(im, ax=ax, shrink=0.6, label=metric)
+    ax.set_title(f"Single-relay landscape: {metric}")
+    ax.set_xlabel("Body Width X [cm]")
+    ax.set_ylabel("Body Height Y [cm]")
+    ax.legend(loc='lower center', bbox_to_anchor=(0.5, -0.12), ncol=2, frameon=False, fontsize=9)
+
+    fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    print(f"[INFO] Mapa krajobrazu ({metric}) zapisana jako: {output_path}")
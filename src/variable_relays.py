@@ -0,0 +1,272 @@
+import numpy as np
+
+from src.fitness import WBANOptimizationProblem, ZONE_EXPONENTS, PACKET_SIZE_BITS
+from src.physics import WBANPhysics, RX_SENSITIVITY
+from src.body_model import BodyModel
+
+# ==================================================================================
+# ZMIENNA LICZBA RELAYÓW (BITY AKTYWACJI) ZE WSPÓLNYM CACHE ŁĄCZY PER RELAY
+# Wektor rozwiązania: [x1, y1, ..., xM, yM, a1, ..., aM]; relay i jest aktywny,
+# gdy a_i >= ACTIVATION_THRESHOLD. Kandydaci są grupowani po liczbie aktywnych
+# relayów k, a każda grupa liczona wsadowo problemem o n_relays = k (obciążenie
+# relayów liczone tylko po aktywnych - jak w osobnym przeglądzie dla k).
+# Łącza jednego relaya (kolumna hop1 dla wszystkich sensorów, hop2, wykładnik)
+# nie zależą od pozostałych relayów, więc są liczone raz na położenie i trzymane
+# w buforach indeksowanych słownikiem (x, y) -> wiersz. Przełączenie bitu
+# aktywacji albo skopiowanie relaya przez krzyżowanie nie kosztuje obliczeń.
+# Funkcja celu = koszt sieci + RELAY_COST * k (+ kara za niespełnione cele
+# energii / marginesu); archiwum trzyma najlepsze rozwiązanie dla każdego k,
+# więc kompromis "liczba relayów vs koszt" wychodzi z jednego uruchomienia.
+# ==================================================================================
+
+MAX_RELAYS = 4
+ACTIVATION_THRESHOLD = 0.5
+RELAY_COST = 0.05          # Koszt funkcji celu za każdy aktywny relay (sprzęt, montaż)
+PENALTY_TARGET = 100.0     # Kara za niespełniony cel (+ względne przekroczenie)
+RELAY_CACHE_SIZE = 200_000 # Maks. liczba zapamiętanych położeń (potem cache od nowa)
+
+
+class VariableRelayProblem:
+
+    def __init__(self, max_relays=MAX_RELAYS, custom_sensors=None, relay_cost=RELAY_COST, energy_target_J=None,
+                 margin_target_dB=None, **problem_kwargs):
+        """problem_kwargs (routing, delay_model, hub_pos, ...) trafiają do problemów dla każdego k."""
+        self.max_relays = max_relays
+        self.relay_cost = relay_cost
+        self.energy_target_J = energy_target_J
+        self.margin_target_dB = margin_target_dB
+        self.problems = {k: WBANOptimizationProblem(n_relays=k, custom_sensors=custom_sensors, **problem_kwargs)
+                         for k in range(max_relays + 1)}
+        self.base = self.problems[max_relays]
+
+        self.problem_size = 3 * max_relays
+        self.lb = [0.0, 0.0] * max_relays + [0.0] * max_relays
+        self.ub = [100.0, 180.0] * max_relays + [1.0] * max_relays
+        self.minmax = "min"
+        self.log_to = None
+
+        self.archive = {}  # k -> najlepsze rozwiązanie spełniające cele
+        self.hits = 0
+        self.misses = 0
+        self._clear_cache()
+
+    # ------------------------------------------------------------------
+    # CACHE ŁĄCZY PER RELAY
+    # ------------------------------------------------------------------
+
+    def _clear_cache(self):
+        n_s = len(self.base.sensor_pos)
+        self._index = {}
+        self._e_hop1 = np.empty((1024, n_s))
+        self._margin_hop1 = np.empty((1024, n_s))
+        self._hop2 = np.empty((1024, 3))  # e_hop2, margin_hop2, relay_n
+
+    def _grow(self, size):
+        capacity = len(self._e_hop1)
+        while capacity < size:
+            capacity *= 2
+        if capacity != len(self._e_hop1):
+            for name in ('_e_hop1', '_margin_hop1', '_hop2'):
+                old = getattr(self, name)
+                new = np.empty((capacity,) + old.shape[1:])
+                new[:len(old)] = old
+                setattr(self, name, new)
+
+    def relay_rows(self, points):
+        """Wiersze bufora dla relayów (N, 2); brakujące położenia liczone razem, wektorowo."""
+        keys = list(map(tuple, points.tolist()))
+        missing = list(dict.fromkeys(k for k in keys if k not in self._index))
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+        if missing:
+            if len(self._index) + len(missing) > RELAY_CACHE_SIZE:
+                self._clear_cache()
+                missing = list(dict.fromkeys(keys))
+            start = len(self._index)
+            self._grow(start + len(missing))
+            new = np.array(missing, dtype=float)
+            rows = slice(start, start + len(new))
+
+            pl_h1 = WBANPhysics.path_loss_dB_array(self.base.distance_matrix_m(self.base.sensor_pos, new),
+                                                   self.base.sensor_n[:, None])
+            self._e_hop1[rows] = WBANPhysics.energy_from_path_loss(pl_h1, PACKET_SIZE_BITS).T
+            self._margin_hop1[rows] = np.maximum(0, -RX_SENSITIVITY - pl_h1).T
+            relay_n = ZONE_EXPONENTS[BodyModel.get_zone_indices(new)]
+            pl_h2 = WBANPhysics.path_loss_dB_array(
+                self.base.distance_matrix_m(new, self.base.hub_pos[None, :])[:, 0], relay_n)
+            self._hop2[rows, 0] = WBANPhysics.energy_from_path_loss(pl_h2, PACKET_SIZE_BITS)
+            self._hop2[rows, 1] = np.maximum(0, -RX_SENSITIVITY - pl_h2)
+            self._hop2[rows, 2] = relay_n
+            self._index.update(zip(missing, range(start, start + len(new))))
+        return np.fromiter((self._index[k] for k in keys), dtype=np.int64, count=len(keys))
+
+    def link_tables(self, relays):
+        """Tablice łączy jak WBANOptimizationProblem.link_tables dla relayów (P, k, 2) - z cache."""
+        P, k = relays.shape[:2]
+        rows = self.relay_rows(relays.reshape(-1, 2)).reshape(P, k)
+        return {
+            'relay_n': self._hop2[rows, 2],
+            'e_hop1': self._e_hop1[rows].swapaxes(-1, -2),
+            'margin_hop1': self._margin_hop1[rows].swapaxes(-1, -2),
+            'e_hop2': self._hop2[rows, 0],
+            'margin_hop2': self._hop2[rows, 1]
+        }
+
+    # ------------------------------------------------------------------
+    # OCENA
+    # ------------------------------------------------------------------
+
+    def starting_solutions(self, pop_size, rng):
+        """
+        Populacja startowa: poprawne położenia wszystkich M relayów, liczba aktywnych
+        równomiernie 0..M (losowe starty prawie zawsze łamią ograniczenia dla k > 0,
+        więc GA zbiega wtedy do k = 0 i nie wypełnia archiwum).
+        """
+        M = self.max_relays
+        chosen, n_chosen = [], 0
+        while n_chosen < pop_size:
+            relays = BodyModel.get_random_valid_positions(4 * pop_size * M, rng).reshape(-1, M, 2)
+            feasible = relays[self.base.penalties(relays) == 0]
+            chosen.append(feasible)
+            n_chosen += len(feasible)
+        positions = np.vstack(chosen)[:pop_size].reshape(pop_size, 2 * M)
+        counts = np.arange(pop_size) % (M + 1)
+        ranks = np.argsort(rng.random((pop_size, M)), axis=1)
+        bits = np.where(ranks < counts[:, None], 0.75, 0.25)
+        return np.hstack([positions, bits])
+
+    def decode_solution(self, solution_vector):
+        """Aktywne relaye (k, 2) w kolejności slotów."""
+        v = np.asarray(solution_vector, dtype=float)
+        positions = v[:2 * self.max_relays].reshape(-1, 2)
+        return positions[v[2 * self.max_relays:] >= ACTIVATION_THRESHOLD]
+
+    def _metrics(self, problem, relays):
+        k = relays.shape[1]
+        if problem.routing == 'multihop':
+            relay_n = ZONE_EXPONENTS[BodyModel.get_zone_indices(relays)]
+            return problem.multihop_routes(relays, {'relay_n': relay_n})[1]
+        if k == 0:
+            tables = {'e_hop1': np.zeros((len(relays), len(problem.sensor_pos), 1)),
+                      'margin_hop1': np.zeros((len(relays), len(problem.sensor_pos), 1)),
+                      'e_hop2': np.zeros((len(relays), 1)), 'margin_hop2': np.zeros((len(relays), 1))}
+            return problem.network_metrics(tables, np.full((len(relays), len(problem.sensor_pos)), -1))
+        tables = self.link_tables(relays)
+        return problem.network_metrics(tables, problem.route(tables))
+
+    def target_penalty(self, metrics):
+        """Kara za niespełnione cele (0, gdy spełnione lub brak celów)."""
+        violation = np.zeros(np.shape(metrics['energy'])[:-1])
+        if self.energy_target_J is not None:
+            violation += np.maximum(0.0, np.sum(metrics['energy'], axis=-1) / self.energy_target_J - 1.0)
+        if self.margin_target_dB is not None:
+            min_margin = np.min(metrics['margin'], axis=-1)
+            violation += np.maximum(0.0, (self.margin_target_dB - min_margin) / self.margin_target_dB)
+        return np.where(violation > 0, PENALTY_TARGET + violation, 0.0)
+
+    def evaluate_population(self, population):
+        population = np.asarray(population, dtype=float)
+        M = self.max_relays
+        positions = population[:, :2 * M].reshape(len(population), M, 2)
+        active = population[:, 2 * M:] >= ACTIVATION_THRESHOLD
+        counts = active.sum(axis=1)
+        # Aktywne relaye na początek (kolejność slotów zachowana)
+        order = np.argsort(~active, axis=1, kind='stable')
+        compact = np.take_along_axis(positions, order[..., None], axis=1)
+
+        fitness = np.empty(len(population))
+        for k in np.unique(counts):
+            rows = np.nonzero(counts == k)[0]
+            problem = self.problems[k]
+            relays = compact[rows, :k]
+            fit = problem.penalties(relays)
+            ok = fit == 0.0
+            if np.any(ok):
+                metrics = self._metrics(problem, relays[ok])
+                cost = problem.objective(metrics)
+                penalty = self.target_penalty(metrics)
+                fit[ok] = cost + self.relay_cost * k + penalty
+                self._update_archive(k, population[rows[ok]], cost, metrics, penalty == 0)
+            fitness[rows] = fit
+        return fitness
+
+    def fitness_function(self, solution_vector):
+        return float(self.evaluate_population(np.asarray(solution_vector, dtype=float)[None, :])[0])
+
+    def _update_archive(self, k, solutions, cost, metrics, meets):
+        if not np.any(meets):
+            return
+        i = int(np.argmin(np.where(meets, cost, np.inf)))
+        if k not in self.archive or cost[i] < self.archive[k]['Cost']:
+            self.archive[k] = {
+                'Relays': int(k),
+                'Cost': float(cost[i]),
+                'Energy_J': float(np.sum(metrics['energy'][i])),
+                'Min_Margin_dB': float(np.min(metrics['margin'][i])),
+                'solution': solutions[i].copy()
+            }
+
+    def tradeoff(self):
+        """Najlepsze znalezione rozwiązanie dla każdej liczby relayów (spełniające cele), rosnąco po k."""
+        return [self.archive[k] for k in sorted(self.archive)]
+
+
+# --- TEST WERYFIKACYJNY ---
+if __name__ == "__main__":
+    import time
+    from src.optimizers import get_algorithm, build_problem_dict
+    from src.scenarios import get_sensor_placement
+    from src.fitness import HOP_DELAY_S
+
+    sensors = get_sensor_placement(15, seed=15)
+    rng = np.random.default_rng(0)
+    M = 3
+    population = np.hstack([BodyModel.get_random_valid_positions(M * 600, rng).reshape(600, 2 * M),
+                            rng.random((600, M))])
+
+    ok_all = True
+    for routing in ('greedy', 'capacitated', 'multihop'):
+        var = VariableRelayProblem(max_relays=M, custom_sensors=sensors, relay_cost=0.0, routing=routing)
+        fit = var.evaluate_population(population)
+        # Odniesienie: każdy kandydat osobno, problem o n_relays = liczba aktywnych relayów
+        # (k = 0: wszystkie łącza direct - wprost z tablic problemu; multihop k = 0 pomijamy)
+        p0 = var.problems[0]
+        direct_only = p0.objective({'energy': p0.e_direct * p0.data_rates, 'margin': p0.margin_direct,
+                                    'delay': np.full(len(sensors), HOP_DELAY_S), 'relay_usage': np.zeros(0)})
+        decoded = list(map(var.decode_solution, population))
+        ref = np.array([var.problems[len(r)].fitness_function(r.ravel()) if len(r) else direct_only
+                        for r in decoded])
+        check = np.array([len(r) > 0 or routing != 'multihop' for r in decoded])
+        same = np.allclose(fit[check], ref[check], rtol=1e-12, atol=0)
+        print(f"[{routing}] zgodne z osobnymi problemami dla k: {same}")
+        ok_all &= same
+
+    # Cache: te same relaye z innymi bitami aktywacji nie są liczone ponownie
+    problem = VariableRelayProblem(max_relays=4, custom_sensors=sensors)
+    start = problem.starting_solutions(400, rng)
+    t0 = time.perf_counter()
+    problem.evaluate_population(start)
+    t_cold = time.perf_counter() - t0
+    flipped = start.copy()
+    flipped[:, 8:] = rng.random((400, 4))
+    t0 = time.perf_counter()
+    problem.evaluate_population(flipped)
+    t_warm = time.perf_counter() - t0
+    print(f"Populacja 400: pierwsza ocena {t_cold * 1e3:.1f} ms, po zmianie bitów {t_warm * 1e3:.1f} ms")
+
+    # Jedno uruchomienie GA -> kompromis liczba relayów / koszt
+    problem = VariableRelayProblem(max_relays=4, custom_sensors=sensors)
+    t0 = time.time()
+    res = get_algorithm('GA')(epoch=60, pop_size=40).solve(build_problem_dict(problem), seed=1,
+                                                          starting_solutions=problem.starting_solutions(40, rng))
+    t_run = time.time() - t0
+    print(f"GA: {t_run:.2f} s, najlepsze: {len(problem.decode_solution(res.solution))} relayów, "
+          f"fitness {res.target.fitness:.5f}")
+    print(f"Cache relayów: {problem.hits} trafień, {problem.misses} obliczeń "
+          f"({problem.hits / max(problem.hits + problem.misses, 1):.0%} trafień)")
+    for entry in problem.tradeoff():
+        print(f"   k={entry['Relays']}: koszt {entry['Cost']:.5f}, energia {entry['Energy_J']:.3e} J, "
+              f"margines {entry['Min_Margin_dB']:.1f} dB")
+
+    if ok_all and problem.hits > 0 and len(problem.tradeoff()) == problem.max_relays + 1:
+        print(">> SUKCES: Liczba relayów w przestrzeni poszukiwań, łącza relayów współdzielone przez cache.")
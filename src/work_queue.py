@@ -0,0 +1,260 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+# ==================================================================================
+# KOLEJKA ZADAŃ W SQLITE (WIELE WORKERÓW, WIELE MASZYN NA WSPÓLNYM DYSKU)
+# Każda próba badania to wiersz tabeli `tasks`:
+#   pending -> running (atomowe przejęcie w transakcji BEGIN IMMEDIATE)
+#           -> done (wynik JSON) | pending (ponowienie) | failed (po MAX_ATTEMPTS)
+# Worker wysyła heartbeat w tle; zadania bez heartbeatu dłużej niż STALE_AFTER_S
+# wracają do kolejki. Wynik przyjmujemy tylko od workera, który nadal jest
+# właścicielem zadania (spóźniony worker nie nadpisze cudzego wyniku).
+# Uwaga: przy dysku sieciowym (NFS) SQLite wymaga poprawnie działających blokad
+# fcntl; dlatego nie używamy trybu WAL (wymaga pamięci współdzielonej hosta).
+# ==================================================================================
+
+HEARTBEAT_S = 10.0        # Co ile sekund worker potwierdza, że żyje
+STALE_AFTER_S = 60.0      # Po tylu sekundach ciszy zadanie wraca do kolejki
+MAX_ATTEMPTS = 3          # Po tylu nieudanych próbach zadanie jest 'failed'
+BUSY_TIMEOUT_S = 30.0     # Czekanie na blokadę bazy
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id        INTEGER PRIMARY KEY,
+    key       TEXT UNIQUE NOT NULL,
+    payload   TEXT NOT NULL,
+    status    TEXT NOT NULL DEFAULT 'pending',
+    worker    TEXT,
+    attempts  INTEGER NOT NULL DEFAULT 0,
+    heartbeat REAL,
+    result    TEXT,
+    error     TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks(status, id);
+"""
+
+
+def worker_name():
+    """Identyfikator workera: host + PID (unikalny w obrębie klastra)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _write(self, sql, params=()):
+        """Pojedyncza instrukcja zapisu we własnej transakcji; zwraca liczbę zmienionych wierszy."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = self.conn.execute(sql, params)
+            self.conn.execute("COMMIT")
+            return cur.rowcount
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    # ------------------------------------------------------------------
+    # PRODUCENT
+    # ------------------------------------------------------------------
+
+    def enqueue(self, tasks):
+        """
+        Dodaje zadania (lista słowników z unikalnym 'key'). Idempotentne:
+        ponowne rozwinięcie tego samego przeglądu nie duplikuje zadań.
+        """
+        rows = [(t['key'], json.dumps(t)) for t in tasks]
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = self.conn.total_changes
+            self.conn.executemany("INSERT OR IGNORE INTO tasks (key, payload) VALUES (?, ?)", rows)
+            added = self.conn.total_changes - before
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    # ------------------------------------------------------------------
+    # WORKER
+    # ------------------------------------------------------------------
+
+    def claim(self, worker):
+        """Atomowo przejmuje najstarsze oczekujące zadanie. Zwraca (id, payload) lub None."""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT id, payload FROM tasks WHERE status = 'pending' ORDER BY id LIMIT 1").fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE tasks SET status = 'running', worker = ?, attempts = attempts + 1, heartbeat = ? "
+                "WHERE id = ?", (worker, time.time(), row[0]))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return row[0], json.loads(row[1])
+
+    def heartbeat(self, task_id, worker):
+        """Odświeża znacznik czasu; False, jeśli zadanie przejął już ktoś inny."""
+        return self._write("UPDATE tasks SET heartbeat = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                           (time.time(), task_id, worker)) == 1
+
+    def complete(self, task_id, worker, result):
+        """Zapisuje wynik; ignorowany, jeśli worker nie jest już właścicielem zadania."""
+        return self._write("UPDATE tasks SET status = 'done', result = ?, error = NULL "
+                           "WHERE id = ? AND worker = ? AND status = 'running'",
+                           (json.dumps(result), task_id, worker)) == 1
+
+    def fail(self, task_id, worker, error, max_attempts=MAX_ATTEMPTS):
+        """Błąd zadania: ponowienie lub status 'failed' po max_attempts próbach."""
+        return self._write("UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                           "worker = NULL, error = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                           (max_attempts, str(error), task_id, worker)) == 1
+
+    def requeue_stale(self, stale_after=STALE_AFTER_S, max_attempts=MAX_ATTEMPTS):
+        """
+        Zadania bez heartbeatu dłużej niż `stale_after` [s] wracają do kolejki, a po max_attempts
+        próbach dostają status 'failed' (zadanie zabijające workera - OOM, segfault - nie krąży bez końca).
+        """
+        return self._write("UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                           "worker = NULL, error = COALESCE(error, 'brak heartbeatu') "
+                           "WHERE status = 'running' AND heartbeat < ?", (max_attempts, time.time() - stale_after))
+
+    # ------------------------------------------------------------------
+    # STAN I WYNIKI
+    # ------------------------------------------------------------------
+
+    def progress(self):
+        """Liczba zadań w każdym stanie."""
+        counts = dict(self.conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+        return {status: counts.get(status, 0) for status in ('pending', 'running', 'done', 'failed')}
+
+    def results(self):
+        """Pary (payload, wynik) zakończonych zadań w kolejności dodania."""
+        rows = self.conn.execute("SELECT payload, result FROM tasks WHERE status = 'done' ORDER BY id")
+        return [(json.loads(p), json.loads(r)) for p, r in rows]
+
+
+class Heartbeat:
+    """Wątek w tle wysyłający heartbeat zadania (własne połączenie SQLite) podczas obliczeń."""
+
+    def __init__(self, path, task_id, worker, interval=HEARTBEAT_S):
+        self.path, self.task_id, self.worker, self.interval = path, task_id, worker, interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        queue = WorkQueue(self.path)
+        try:
+            while not self._stop.wait(self.interval):
+                queue.heartbeat(self.task_id, self.worker)
+        finally:
+            queue.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(path, handler, worker=None, idle_exit=True, poll_s=1.0, stale_after=STALE_AFTER_S,
+               heartbeat_s=HEARTBEAT_S, max_tasks=None, telemetry=None):
+    """
+    Pętla workera: przejmij zadanie -> handler(payload) -> zapisz wynik.
+    Przy pustej kolejce najpierw odzyskuje zadania porzucone przez martwe workery;
+    kończy pracę, gdy nic nie zostało (idle_exit) albo po max_tasks zadaniach.
+    `telemetry` (src/telemetry.py) dostaje stan kolejki ('queue') i błędy zadań ('task_failed').
+    Zwraca liczbę zakończonych zadań.
+    """
+    worker = worker or worker_name()
+    queue = WorkQueue(path)
+    done = 0
+    try:
+        while max_tasks is None or done < max_tasks:
+            claimed = queue.claim(worker)
+            if claimed is None:
+                if queue.requeue_stale(stale_after):
+                    continue
+                if idle_exit and queue.progress()['running'] == 0:
+                    break
+                time.sleep(poll_s)
+                continue
+
+            task_id, payload = claimed
+            try:
+                with Heartbeat(path, task_id, worker, heartbeat_s):
+                    result = handler(payload)
+            except Exception as exc:
+                queue.fail(task_id, worker, repr(exc))
+                if telemetry is not None:
+                    telemetry.emit('task_failed', force=True, worker=worker, task_id=task_id, error=repr(exc))
+                continue
+            if queue.complete(task_id, worker, result):
+                done += 1
+            if telemetry is not None and telemetry.enabled:
+                telemetry.emit('queue', worker=worker, tasks_done=done, **queue.progress())
+        if telemetry is not None and telemetry.enabled:
+            telemetry.emit('queue', force=True, worker=worker, tasks_done=done, **queue.progress())
+    finally:
+        queue.close()
+    return done
+
+
+# --- TEST WERYFIKACYJNY ---
+def _square(payload):
+    return {'value': payload['x'] ** 2, 'worker': worker_name()}
+
+
+if __name__ == "__main__":
+    import tempfile
+    from multiprocessing import Process
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'queue.sqlite')
+        queue = WorkQueue(path)
+        queue.enqueue([{'key': f"x{i}", 'x': i} for i in range(200)])
+        added_again = queue.enqueue([{'key': 'x0', 'x': 0}])
+
+        # Zadanie porzucone przez "martwego" workera (brak heartbeatu)
+        dead_id, _ = queue.claim('dead-worker')
+        queue.conn.execute("UPDATE tasks SET heartbeat = 0 WHERE id = ?", (dead_id,))
+
+        workers = [Process(target=run_worker, args=(path, _square), kwargs={'stale_after': 5.0})
+                   for _ in range(4)]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+
+        results = queue.results()
+        values = sorted(r['value'] for _, r in results)
+        used = {r['worker'] for _, r in results}
+        print(f"Stan: {queue.progress()}, workerów: {len(used)}, duplikat dodany: {added_again}")
+        late = queue.complete(dead_id, 'dead-worker', {'value': -1})
+
+        # Zadanie, które za każdym razem zabija workera: po MAX_ATTEMPTS próbach -> 'failed'
+        queue.enqueue([{'key': 'poison'}])
+        for attempt in range(MAX_ATTEMPTS):
+            poison_id, _ = queue.claim(f"killed-{attempt}")
+            queue.conn.execute("UPDATE tasks SET heartbeat = 0 WHERE id = ?", (poison_id,))
+            queue.requeue_stale(stale_after=5.0)
+        poison_failed = queue.progress()['failed'] == 1 and queue.claim('next') is None
+        if values == sorted(i * i for i in range(200)) and not late and added_again == 0 and poison_failed:
+            print(">> SUKCES: Każde zadanie wykonane dokładnie raz, porzucone zadanie odzyskane.")
+        queue.close()